@@ -0,0 +1,3 @@
+"""
+性能基准测试模块，每个脚本可以通过 python -m game_guide_scraper.benchmarks.<脚本名> 单独运行。
+"""
\ No newline at end of file
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+图片下载器性能基准测试
+
+在本地启动一个多线程HTTP图片服务器（每个请求模拟固定的网络延迟），
+比较逐张下载与不同并发线程数下批量下载同一组图片的耗时。
+
+用法:
+    python -m game_guide_scraper.benchmarks.bench_downloader
+    python -m game_guide_scraper.benchmarks.bench_downloader --images 200 --latency 0.05 --workers 1 4 8 16
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from game_guide_scraper.downloader.downloader import ImageDownloader
+
+
+def start_image_server(latency, image_size):
+    """
+    启动本地图片服务器
+
+    参数:
+        latency: 每个请求的模拟延迟（秒）
+        image_size: 每张图片的字节数
+
+    返回:
+        (服务器对象, 服务器根URL)
+    """
+    payload = os.urandom(image_size)
+
+    class ImageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    class ImageServer(ThreadingHTTPServer):
+        # 默认的监听队列只有5，并发连接多时会触发重传，影响测试结果
+        request_queue_size = 128
+        daemon_threads = True
+
+    server = ImageServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench_workers(image_count, worker_counts, latency=0.05, image_size=64 * 1024, host_limit=None):
+    """
+    比较不同并发线程数下的批量下载耗时
+
+    参数:
+        image_count: 图片数量
+        worker_counts: 并发线程数列表
+        latency: 每个请求的模拟延迟（秒）
+        image_size: 每张图片的字节数
+        host_limit: 主机并发上限，为None时等于线程数
+
+    返回:
+        每个线程数的结果列表，包含workers、seconds和downloaded
+    """
+    server, base_url = start_image_server(latency, image_size)
+    results = []
+    try:
+        for workers in worker_counts:
+            output_dir = tempfile.mkdtemp(prefix='bench_images_')
+            try:
+                downloader = ImageDownloader(output_dir, delay=0, max_workers=workers, host_limit=host_limit)
+                images = [{'type': 'image', 'url': f"{base_url}/{i}.jpg"} for i in range(image_count)]
+                start = time.perf_counter()
+                result = downloader.download_all_images(images, skip_existing=False)
+                elapsed = time.perf_counter() - start
+                results.append({'workers': workers, 'seconds': elapsed, 'downloaded': len(result)})
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+    finally:
+        server.shutdown()
+    return results
+
+
+def main():
+    """运行图片下载器基准测试并输出结果"""
+    parser = argparse.ArgumentParser(description='图片下载器性能基准测试')
+    parser.add_argument('--images', type=int, default=100, help='图片数量')
+    parser.add_argument('--latency', type=float, default=0.05, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--size', type=int, default=64 * 1024, help='每张图片的字节数')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16], help='并发线程数列表')
+    parser.add_argument('--host-limit', type=int, default=None, help='主机并发上限，默认等于线程数')
+    args = parser.parse_args()
+
+    # 基准测试关注耗时，屏蔽下载器逐张输出的进度信息
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = bench_workers(args.images, args.workers, args.latency, args.size, args.host_limit)
+
+    baseline = results[0]['seconds'] if results else None
+    print(f"图片下载测试：{args.images} 张图片，每个请求延迟 {args.latency * 1000:.0f} ms，每张 {args.size // 1024} KB")
+    print(f"{'线程数':>6} {'耗时(s)':>10} {'图片/秒':>10} {'加速比':>8} {'成功数':>8}")
+    for row in results:
+        speedup = baseline / row['seconds'] if row['seconds'] else float('nan')
+        print(f"{row['workers']:>6} {row['seconds']:>10.2f} {args.images / row['seconds']:>10.1f} "
+              f"{speedup:>8.1f} {row['downloaded']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Markdown生成器性能基准测试
+
+构造包含各种内容元素的合成文档（默认一百万个元素，以文字和图片为主），比较旧版逐个元素
+按type字符串比较的if/elif分支渲染字典元素与ContentRenderer查表渲染解析器产生的ContentItem元素
+的耗时，并检查两者输出一致：
+
+    整体渲染：旧版把片段追加到列表后统一拼接，ContentRenderer.render同样一次拼接
+    流式写入：旧版逐个片段产出（片段和换行符分别经过两层生成器），ContentRenderer.iter_markdown
+              每渲染一批元素产出一块；两者都逐块写入内存中的输出流（MarkdownGenerator.write_markdown的用法）
+
+用法:
+    python -m game_guide_scraper.benchmarks.bench_generator
+    python -m game_guide_scraper.benchmarks.bench_generator --items 200000 --rounds 3
+"""
+
+import argparse
+import gc
+import io
+import os
+import time
+
+from game_guide_scraper.generator.markdown_generator import _iter_joined
+from game_guide_scraper.generator.renderer import ContentRenderer
+from game_guide_scraper.parser.items import content_items
+
+
+def build_items(count):
+    """
+    构造合成内容元素列表，元素类型的比例接近真实攻略（大部分是文字和图片）
+
+    参数:
+        count: 元素数
+    """
+    pattern = [
+        lambda i: {'type': 'text', 'value': f'第{i // 40 + 1}页：区域{i // 40 + 1}'} if i % 40 == 0
+        else {'type': 'text', 'value': f'沿着道路前进，第{i}处可以找到宝箱。'},
+        lambda i: {'type': 'image', 'url': f'https://img1.gamersky.com/{i}.jpg', 'alt': ''},
+        lambda i: {'type': 'text', 'value': f'击败精英怪后获得第{i}件装备。'},
+        lambda i: {'type': 'image', 'url': f'https://img1.gamersky.com/{i}.jpg', 'alt': f'图{i}'},
+        lambda i: {'type': 'text', 'value': ''},
+        lambda i: {'type': 'heading', 'level': 3, 'value': f'要点{i}'},
+        lambda i: {'type': 'text', 'value': f'第{i}段说明。'},
+        lambda i: {'type': 'image', 'url': f'https://img1.gamersky.com/{i}.jpg', 'alt': ''},
+        lambda i: {'type': 'list', 'ordered': i % 2 == 0, 'items': ['先清理小怪', '再挑战头目']},
+        lambda i: {'type': 'quote', 'value': '踏平坎坷成大道\n斗罢艰险又出发'},
+    ]
+    return [pattern[i % len(pattern)](i) for i in range(count)]
+
+
+def build_page_title_map(items):
+    """根据"第X页："格式的文字构造页面标题映射"""
+    return {item['value']: {'id': f"page-{index}"} for index, item in enumerate(items)
+            if item['type'] == 'text' and item['value'].startswith('第') and '页：' in item['value']}
+
+
+def legacy_render(content_list, image_path_mapping, page_title_map):
+    """
+    旧版渲染方式：每个元素依次比较type字符串，片段追加到列表后统一拼接
+
+    参数:
+        content_list: 内容元素列表
+        image_path_mapping: 图片URL到本地路径的映射字典
+        page_title_map: 页面标题映射字典
+    """
+    markdown = []
+
+    for item in content_list:
+        item_type = item.get('type', '')
+
+        if item_type == 'text':
+            value = item.get('value', '')
+            if value:
+                if value in page_title_map:
+                    page_info = page_title_map[value]
+                    markdown.append(f"\n## {value} <a id=\"{page_info['id']}\"></a>\n")
+                else:
+                    markdown.append(f"{value}\n")
+
+        elif item_type == 'image':
+            url = item.get('url', '')
+            alt = item.get('alt', '')
+
+            if url:
+                if url in image_path_mapping:
+                    local_path = image_path_mapping[url]
+                    rel_path = os.path.basename(local_path)
+                    markdown.append(f"![{alt}](images/{rel_path})\n")
+                else:
+                    markdown.append(f"![{alt}]({url})\n")
+
+        elif item_type == 'heading':
+            level = item.get('level', 3)
+            value = item.get('value', '')
+            id_str = item.get('id', '')
+
+            if value:
+                heading_prefix = '#' * (level + 2)
+
+                if id_str:
+                    markdown.append(f"{heading_prefix} {value} <a id=\"{id_str}\"></a>\n")
+                else:
+                    markdown.append(f"{heading_prefix} {value}\n")
+
+        elif item_type == 'list':
+            items = item.get('items', [])
+            ordered = item.get('ordered', False)
+
+            if items:
+                markdown.append("\n")
+                for i, list_item in enumerate(items):
+                    if ordered:
+                        markdown.append(f"{i + 1}. {list_item}\n")
+                    else:
+                        markdown.append(f"- {list_item}\n")
+                markdown.append("\n")
+
+        elif item_type == 'table':
+            headers = item.get('headers', [])
+            rows = item.get('rows', [])
+
+            if headers and rows:
+                markdown.append("| " + " | ".join(headers) + " |\n")
+                markdown.append("| " + " | ".join(["---"] * len(headers)) + " |\n")
+                for row in rows:
+                    markdown.append("| " + " | ".join(row) + " |\n")
+                markdown.append("\n")
+
+        elif item_type == 'code':
+            value = item.get('value', '')
+            language = item.get('language', '')
+
+            if value:
+                if language:
+                    markdown.append(f"```{language}\n{value}\n```\n")
+                else:
+                    markdown.append(f"```\n{value}\n```\n")
+
+        elif item_type == 'quote':
+            value = item.get('value', '')
+
+            if value:
+                lines = value.split('\n')
+                for line in lines:
+                    markdown.append(f"> {line}\n")
+                markdown.append("\n")
+
+    return '\n'.join(markdown)
+
+
+def legacy_fragments(content_list, image_path_mapping, page_title_map):
+    """
+    旧版流式渲染的片段生成器：分支与legacy_render相同，每个片段单独产出
+
+    参数:
+        content_list: 内容元素列表
+        image_path_mapping: 图片URL到本地路径的映射字典
+        page_title_map: 页面标题映射字典
+    """
+    for item in content_list:
+        item_type = item.get('type', '')
+
+        if item_type == 'text':
+            value = item.get('value', '')
+            if value:
+                if value in page_title_map:
+                    page_info = page_title_map[value]
+                    yield f"\n## {value} <a id=\"{page_info['id']}\"></a>\n"
+                else:
+                    yield f"{value}\n"
+
+        elif item_type == 'image':
+            url = item.get('url', '')
+            alt = item.get('alt', '')
+
+            if url:
+                if url in image_path_mapping:
+                    local_path = image_path_mapping[url]
+                    rel_path = os.path.basename(local_path)
+                    yield f"![{alt}](images/{rel_path})\n"
+                else:
+                    yield f"![{alt}]({url})\n"
+
+        elif item_type == 'heading':
+            level = item.get('level', 3)
+            value = item.get('value', '')
+            id_str = item.get('id', '')
+
+            if value:
+                heading_prefix = '#' * (level + 2)
+
+                if id_str:
+                    yield f"{heading_prefix} {value} <a id=\"{id_str}\"></a>\n"
+                else:
+                    yield f"{heading_prefix} {value}\n"
+
+        elif item_type == 'list':
+            items = item.get('items', [])
+            ordered = item.get('ordered', False)
+
+            if items:
+                yield "\n"
+                for i, list_item in enumerate(items):
+                    if ordered:
+                        yield f"{i + 1}. {list_item}\n"
+                    else:
+                        yield f"- {list_item}\n"
+                yield "\n"
+
+        elif item_type == 'table':
+            headers = item.get('headers', [])
+            rows = item.get('rows', [])
+
+            if headers and rows:
+                yield "| " + " | ".join(headers) + " |\n"
+                yield "| " + " | ".join(["---"] * len(headers)) + " |\n"
+                for row in rows:
+                    yield "| " + " | ".join(row) + " |\n"
+                yield "\n"
+
+        elif item_type == 'code':
+            value = item.get('value', '')
+            language = item.get('language', '')
+
+            if value:
+                if language:
+                    yield f"```{language}\n{value}\n```\n"
+                else:
+                    yield f"```\n{value}\n```\n"
+
+        elif item_type == 'quote':
+            value = item.get('value', '')
+
+            if value:
+                lines = value.split('\n')
+                for line in lines:
+                    yield f"> {line}\n"
+                yield "\n"
+
+
+def legacy_stream(content_list, image_path_mapping, page_title_map):
+    """
+    旧版流式写入：片段之间的换行符由_iter_joined单独产出，逐块写入输出流
+
+    参数:
+        content_list: 内容元素列表
+        image_path_mapping: 图片URL到本地路径的映射字典
+        page_title_map: 页面标题映射字典
+    """
+    sink = io.StringIO()
+    for chunk in _iter_joined(legacy_fragments(content_list, image_path_mapping, page_title_map)):
+        sink.write(chunk)
+    return sink.getvalue()
+
+
+def renderer_stream(content_list, image_path_mapping, page_title_map):
+    """
+    使用ContentRenderer.iter_markdown逐块写入输出流
+
+    参数:
+        content_list: 内容元素列表
+        image_path_mapping: 图片URL到本地路径的映射字典
+        page_title_map: 页面标题映射字典
+    """
+    renderer = ContentRenderer(image_path_mapping, heading_offset=2, page_title_map=page_title_map)
+    sink = io.StringIO()
+    for chunk in renderer.iter_markdown(content_list):
+        sink.write(chunk)
+    return sink.getvalue()
+
+
+def renderer_render(content_list, image_path_mapping, page_title_map):
+    """
+    使用ContentRenderer查表渲染
+
+    参数:
+        content_list: 内容元素列表
+        image_path_mapping: 图片URL到本地路径的映射字典
+        page_title_map: 页面标题映射字典
+    """
+    renderer = ContentRenderer(image_path_mapping, heading_offset=2, page_title_map=page_title_map)
+    return renderer.render(content_list)
+
+
+def time_calls(calls, rounds, *args):
+    """
+    交替运行多个渲染调用，返回每个调用的最短耗时（秒）和结果
+
+    与timeit相同，计时期间关闭垃圾回收，避免一次回收大量内容元素的耗时计入某个调用。
+
+    参数:
+        calls: (渲染函数, 内容元素列表)列表
+        rounds: 轮数
+        args: 渲染函数在内容元素列表之后的其余参数
+    """
+    best = [float('inf')] * len(calls)
+    results = [None] * len(calls)
+    for _ in range(rounds):
+        for index, (func, content_list) in enumerate(calls):
+            results[index] = None
+            gc.collect()
+            gc.disable()
+            try:
+                start = time.perf_counter()
+                results[index] = func(content_list, *args)
+                best[index] = min(best[index], time.perf_counter() - start)
+            finally:
+                gc.enable()
+    return best, results
+
+
+def main():
+    """运行Markdown生成器基准测试并输出结果"""
+    parser = argparse.ArgumentParser(description='Markdown生成器性能基准测试')
+    parser.add_argument('--items', type=int, default=1000000, help='合成文档的内容元素数')
+    parser.add_argument('--rounds', type=int, default=5, help='每项测试的轮数')
+    args = parser.parse_args()
+
+    items = build_items(args.items)
+    # 解析器产生的内容元素
+    typed_items = content_items(items)
+    page_title_map = build_page_title_map(items)
+    # 三分之二的图片已下载
+    image_path_mapping = {item['url']: f"output/images/{index}.jpg" for index, item in enumerate(items)
+                          if item['type'] == 'image' and index % 3}
+
+    print(f"内容元素数: {args.items}")
+    print(f"{'方式':<8} {'旧版分支(ms)':>14} {'查表渲染(ms)':>14} {'旧版(ns/元素)':>14} {'查表(ns/元素)':>14} "
+          f"{'加速比':>8} {'结果一致':>8}")
+    for name, legacy_func, renderer_func in (('整体渲染', legacy_render, renderer_render),
+                                             ('流式写入', legacy_stream, renderer_stream)):
+        (legacy, current), (legacy_output, current_output) = time_calls(
+            [(legacy_func, items), (renderer_func, typed_items)], args.rounds, image_path_mapping, page_title_map)
+        print(f"{name:<8} {legacy * 1000:>14.1f} {current * 1000:>14.1f} {legacy / args.items * 1e9:>14.1f} "
+              f"{current / args.items * 1e9:>14.1f} {legacy / current:>8.2f} "
+              f"{'是' if legacy_output == current_output else '否':>8}")
+
+if __name__ == '__main__':
+    main()
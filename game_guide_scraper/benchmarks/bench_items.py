@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+内容元素性能基准测试
+
+使用与Markdown生成器基准测试相同的合成内容元素（默认一百万个），比较字典形式和ContentItem形式的
+每个元素占用的内存（两者共享同一组字符串，只比较容器本身）和pickle后的大小（流式内容组织器和
+解析结果缓存的写入量）。
+
+用法:
+    python -m game_guide_scraper.benchmarks.bench_items
+    python -m game_guide_scraper.benchmarks.bench_items --items 200000
+"""
+
+import argparse
+import gc
+import pickle
+import tracemalloc
+
+from game_guide_scraper.benchmarks.bench_generator import build_items
+from game_guide_scraper.parser.items import content_item
+
+
+def measure(build):
+    """
+    返回构造内容元素列表新分配的内存（字节）和结果
+
+    参数:
+        build: 构造内容元素列表的函数
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated, result
+
+
+def main():
+    """运行内容元素基准测试并输出结果"""
+    parser = argparse.ArgumentParser(description='内容元素性能基准测试')
+    parser.add_argument('--items', type=int, default=1000000, help='内容元素数')
+    args = parser.parse_args()
+
+    items = build_items(args.items)
+    rows = []
+    for name, build in (('字典', lambda: [dict(item) for item in items]),
+                        ('ContentItem', lambda: [content_item(item) for item in items])):
+        allocated, result = measure(build)
+        pickled = len(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        rows.append((name, allocated, pickled, result))
+
+    print(f"内容元素数: {args.items}")
+    print(f"{'形式':<12} {'内存(字节/元素)':>16} {'pickle(字节/元素)':>18}")
+    for name, allocated, pickled, _ in rows:
+        print(f"{name:<12} {allocated / args.items:>16.1f} {pickled / args.items:>18.1f}")
+    print(f"结果一致: {'是' if rows[0][3] == rows[1][3] else '否'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+内容组织器性能基准测试
+
+构造指定数量的合成页面（每页一段文字和一张图片），比较旧版添加方式（逐个比较URL去重、
+每次添加后重新排序全部页面）与当前ContentOrganizer（URL索引去重、按页码二分插入）的耗时。
+页面可以按页码顺序添加（顺序抓取），也可以乱序添加（流水线模式）。
+旧版添加的总耗时随页数平方增长，只在不超过--legacy-max的规模上运行。
+
+用法:
+    python -m game_guide_scraper.benchmarks.bench_organizer
+    python -m game_guide_scraper.benchmarks.bench_organizer --pages 1000 10000 100000 --shuffle
+"""
+
+import argparse
+import logging
+import random
+import time
+
+from game_guide_scraper.organizer.organizer import ContentOrganizer
+
+
+def build_pages(count, shuffle=False, seed=0):
+    """
+    构造合成页面列表
+
+    参数:
+        count: 页面数
+        shuffle: 是否打乱添加顺序
+        seed: 打乱顺序使用的随机种子
+    """
+    pages = [{
+        'title': f'合成攻略 第{i}页',
+        'url': f'https://www.gamersky.com/handbook/202408/1803231_{i}.shtml',
+        'page_number': i,
+        'content': [
+            {'type': 'text', 'value': f'第{i}页：合成内容'},
+            {'type': 'image', 'url': f'https://img1.gamersky.com/{i}.jpg', 'alt': '',
+             'local_path': f'images/{i}.jpg'}
+        ]
+    } for i in range(1, count + 1)]
+    if shuffle:
+        random.Random(seed).shuffle(pages)
+    return pages
+
+
+def legacy_add_pages(pages):
+    """
+    旧版添加方式：逐个比较URL去重，追加后重新排序全部页面
+
+    参数:
+        pages: 页面列表
+
+    返回:
+        按页码排序的页面列表
+    """
+    stored = []
+    for page_content in pages:
+        if any(existing.get('url') == page_content['url'] for existing in stored):
+            continue
+        for item in page_content.get('content', []):
+            if item.get('type') == 'image' and 'local_path' in item:
+                item['relative_path'] = item['local_path'].rsplit('/', 1)[-1]
+        stored.append(page_content)
+        stored.sort(key=lambda p: p.get('page_number', 0))
+    return stored
+
+
+def organizer_add_pages(pages):
+    """
+    使用ContentOrganizer添加页面
+
+    参数:
+        pages: 页面列表
+
+    返回:
+        按页码排序的页面列表
+    """
+    organizer = ContentOrganizer()
+    for page_content in pages:
+        organizer.add_page_content(page_content)
+    return organizer.pages
+
+
+def time_call(func, pages, rounds):
+    """
+    多轮运行并返回最短耗时（秒）和最后一轮的结果
+
+    参数:
+        func: 添加函数
+        pages: 页面列表（每轮使用浅拷贝，避免上一轮的修改影响结果）
+        rounds: 轮数
+    """
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        batch = [dict(page) for page in pages]
+        start = time.perf_counter()
+        result = func(batch)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    """运行内容组织器基准测试并输出结果"""
+    parser = argparse.ArgumentParser(description='内容组织器性能基准测试')
+    parser.add_argument('--pages', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='页面数列表')
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='旧版添加方式运行的最大页面数（更大的规模耗时过长）')
+    parser.add_argument('--shuffle', action='store_true', help='乱序添加页面（模拟流水线模式）')
+    parser.add_argument('--rounds', type=int, default=3, help='每项测试的轮数')
+    args = parser.parse_args()
+
+    # 屏蔽每个页面的添加日志，只测量添加本身
+    logging.getLogger('game_guide_scraper.organizer.organizer').setLevel(logging.WARNING)
+
+    print(f"添加顺序: {'乱序' if args.shuffle else '按页码'}")
+    print(f"{'页面数':>10} {'旧版(ms)':>12} {'当前(ms)':>12} {'加速比':>8} {'每页(us)':>10} {'结果一致':>8}")
+    for count in args.pages:
+        pages = build_pages(count, args.shuffle)
+        current, current_pages = time_call(organizer_add_pages, pages, args.rounds)
+        if count <= args.legacy_max:
+            legacy, legacy_pages = time_call(legacy_add_pages, pages, 1)
+            identical = [page['url'] for page in legacy_pages] == [page['url'] for page in current_pages]
+            print(f"{count:>10} {legacy * 1000:>12.2f} {current * 1000:>12.2f} {legacy / current:>8.1f} "
+                  f"{current / count * 1e6:>10.2f} {'是' if identical else '否':>8}")
+        else:
+            print(f"{count:>10} {'-':>12} {current * 1000:>12.2f} {'-':>8} "
+                  f"{current / count * 1e6:>10.2f} {'-':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+解析器性能基准测试
+
+深层嵌套压力测试：构造逐层嵌套的div，比较旧版基于嵌套find_all的内容提取与
+单次遍历提取在不同嵌套深度下的耗时。深度翻倍时，线性算法耗时约翻倍（增长指数≈1），
+平方算法耗时约变为4倍（增长指数≈2）。
+
+无用元素移除测试：比较旧版逐个选择器调用soup.select的移除方式与单次遍历匹配器的耗时。
+
+用法:
+    python -m game_guide_scraper.benchmarks.bench_parser
+    python -m game_guide_scraper.benchmarks.bench_parser --depths 250 500 1000 2000
+"""
+
+import argparse
+import copy
+import math
+import time
+
+from game_guide_scraper.parser.parser import Parser
+
+
+def build_nested_html(depth):
+    """
+    构造深层嵌套的页面：每层div包含一个段落和下一层div，最内层包含一张图片
+
+    参数:
+        depth: 嵌套深度
+    """
+    opening = ''.join(f'<div><p>第{i}层的正文内容。</p>' for i in range(depth))
+    closing = '</div>' * depth
+    return (
+        '<html><head><title>嵌套测试</title></head><body><div class="Mid2L_con">'
+        + opening + '<img src="https://img1.gamersky.com/deep.jpg" alt="最内层图片">' + closing
+        + '</div></body></html>'
+    )
+
+
+def legacy_extract_content(parser, soup):
+    """
+    旧版内容提取实现（对每个匹配元素调用element.text和element.find），仅用于对比
+
+    参数:
+        parser: Parser对象
+        soup: BeautifulSoup对象
+    """
+    content = []
+    main_content = parser._find_main_content(soup)
+    if not main_content:
+        return content
+
+    for element in main_content.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'img', 'table', 'ul', 'ol']):
+        if not element.text.strip() and not element.find('img'):
+            continue
+        if element.name == 'img' or element.find('img'):
+            img_elements = [element] if element.name == 'img' else element.find_all('img')
+            for img in img_elements:
+                img_info = parser._extract_image_info(img)
+                if img_info:
+                    content.append(img_info)
+        elif element.name == 'table':
+            content.append({'type': 'table', 'value': str(element)})
+        elif element.name in ['ul', 'ol']:
+            list_items = [li.text.strip() for li in element.find_all('li')]
+            if list_items:
+                list_type = 'ordered_list' if element.name == 'ol' else 'unordered_list'
+                content.append({'type': list_type, 'value': list_items})
+        elif element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+            heading_text = element.text.strip()
+            if heading_text:
+                content.append({'type': 'heading', 'value': heading_text, 'level': int(element.name[1])})
+        elif element.name == 'p' or (element.name == 'div' and not element.find(['div', 'p'])):
+            text = element.text.strip()
+            if text and not parser._should_filter_text(text):
+                content.append({'type': 'text', 'value': text})
+    return content
+
+
+def time_call(func, rounds):
+    """
+    多次调用函数，返回最短耗时（秒）和最后一次的返回值
+
+    参数:
+        func: 无参数函数
+        rounds: 调用次数
+    """
+    best, result = None, None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_nesting(depths, rounds=3):
+    """
+    深层嵌套压力测试
+
+    参数:
+        depths: 嵌套深度列表（建议逐个翻倍）
+        rounds: 每个深度的测试轮数
+
+    返回:
+        每个深度的结果列表，包含depth、legacy、single_pass（秒）及两者输出的图片数量
+    """
+    parser = Parser()
+    results = []
+    for depth in depths:
+        soup = parser.make_soup(build_nested_html(depth))
+        legacy_time, legacy_content = time_call(lambda: legacy_extract_content(parser, soup), rounds)
+        single_time, single_content = time_call(lambda: parser.extract_content(soup), rounds)
+        results.append({
+            'depth': depth,
+            'legacy': legacy_time,
+            'single_pass': single_time,
+            'legacy_images': sum(1 for item in legacy_content if item['type'] == 'image'),
+            'single_pass_images': sum(1 for item in single_content if item['type'] == 'image'),
+        })
+    return results
+
+
+def build_boilerplate_html(sections):
+    """
+    构造包含大量广告、导航、脚本等无用元素的页面
+
+    参数:
+        sections: 正文段数，每段附带若干无用元素
+    """
+    body = []
+    for i in range(sections):
+        body.append(
+            f'<div class="section"><p>第{i}段：攻略正文内容。</p>'
+            f'<div class="adsbygoogle"><span>广告</span></div>'
+            f'<div class="share"><a href="#">分享</a></div>'
+            f'<ul><li>要点{i}</li></ul><script>var x{i} = {i};</script></div>'
+        )
+    return (
+        '<html><head><title>移除测试</title><style>p {}</style></head><body>'
+        '<div class="header"><div class="nav">导航</div></div>'
+        '<div class="Mid2L_con">' + ''.join(body) + '</div>'
+        '<div class="sidebar"><div class="related">相关</div></div>'
+        '<div class="footer">版权信息</div></body></html>'
+    )
+
+
+def legacy_remove_unwanted_elements(parser, soup):
+    """
+    旧版无用元素移除实现（每个选择器单独遍历一次整棵树），仅用于对比
+
+    参数:
+        parser: Parser对象
+        soup: BeautifulSoup对象
+    """
+    for selector in parser.filter_selectors:
+        for element in soup.select(selector):
+            element.decompose()
+
+
+def bench_removal(section_counts, rounds=3):
+    """
+    无用元素移除测试，每轮在新的文档副本上执行
+
+    参数:
+        section_counts: 正文段数列表
+        rounds: 每项测试的轮数
+
+    返回:
+        每个规模的结果列表，包含sections、legacy、single_pass（秒）及移除后的文档是否一致
+    """
+    parser = Parser()
+    results = []
+    for sections in section_counts:
+        original = parser.make_soup(build_boilerplate_html(sections))
+
+        def run(remove):
+            best, soup = None, None
+            for _ in range(rounds):
+                soup = copy.copy(original)
+                start = time.perf_counter()
+                remove(soup)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            return best, soup
+
+        legacy_time, legacy_soup = run(lambda soup: legacy_remove_unwanted_elements(parser, soup))
+        single_time, single_soup = run(parser._remove_unwanted_elements)
+        results.append({
+            'sections': sections,
+            'legacy': legacy_time,
+            'single_pass': single_time,
+            'identical': str(legacy_soup) == str(single_soup),
+        })
+    return results
+
+
+def growth_exponent(results, key):
+    """
+    根据相邻两个深度的耗时估算增长指数 log(t2/t1) / log(d2/d1)
+
+    参数:
+        results: bench_nesting的返回结果
+        key: 'legacy'或'single_pass'
+    """
+    exponents = []
+    for prev, curr in zip(results, results[1:]):
+        if prev[key] > 0 and curr[key] > 0:
+            exponents.append(math.log(curr[key] / prev[key]) / math.log(curr['depth'] / prev['depth']))
+    return sum(exponents) / len(exponents) if exponents else float('nan')
+
+
+def main():
+    """运行解析器基准测试并输出结果"""
+    parser = argparse.ArgumentParser(description='解析器性能基准测试')
+    parser.add_argument('--depths', type=int, nargs='+', default=[125, 250, 500, 1000],
+                        help='嵌套深度列表，建议逐个翻倍')
+    parser.add_argument('--sections', type=int, nargs='+', default=[100, 400, 1600],
+                        help='无用元素移除测试的正文段数列表')
+    parser.add_argument('--rounds', type=int, default=3, help='每项测试的轮数')
+    args = parser.parse_args()
+
+    print("深层嵌套压力测试（内容提取）")
+    print(f"{'深度':>8} {'旧版(ms)':>12} {'单次遍历(ms)':>14} {'旧版图片数':>10} {'单次遍历图片数':>14}")
+    results = bench_nesting(args.depths, args.rounds)
+    for row in results:
+        print(f"{row['depth']:>8} {row['legacy'] * 1000:>12.2f} {row['single_pass'] * 1000:>14.2f} "
+              f"{row['legacy_images']:>10} {row['single_pass_images']:>14}")
+    print(f"增长指数: 旧版 {growth_exponent(results, 'legacy'):.2f}，"
+          f"单次遍历 {growth_exponent(results, 'single_pass'):.2f}（1为线性，2为平方）")
+
+    print()
+    print("无用元素移除测试")
+    print(f"{'段数':>8} {'旧版(ms)':>12} {'单次遍历(ms)':>14} {'加速比':>8} {'结果一致':>8}")
+    for row in bench_removal(args.sections, args.rounds):
+        speedup = row['legacy'] / row['single_pass'] if row['single_pass'] else float('nan')
+        print(f"{row['sections']:>8} {row['legacy'] * 1000:>12.2f} {row['single_pass'] * 1000:>14.2f} "
+              f"{speedup:>8.1f} {'是' if row['identical'] else '否':>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,12 +8,32 @@
 """
 
 import os
+import json
 import time
 from game_guide_scraper.scraper.scraper import Scraper
+from game_guide_scraper.scraper.cache import PageCache
 from game_guide_scraper.parser.parser import Parser
+from game_guide_scraper.parser.parse_cache import ParseCache
 from game_guide_scraper.downloader.downloader import ImageDownloader
+from game_guide_scraper.downloader.store import ImageStore
+from game_guide_scraper.downloader.manifest import ImageManifest
+from game_guide_scraper.downloader.transcoder import ImageTranscoder
+from game_guide_scraper.downloader.source import ImageSourceSelector
 from game_guide_scraper.organizer.organizer import ContentOrganizer
+from game_guide_scraper.organizer.streaming import StreamingContentOrganizer
 from game_guide_scraper.generator.markdown_generator import MarkdownGenerator
+from game_guide_scraper.controller.pipeline import CrawlPipeline
+from game_guide_scraper.controller.image_queue import BackgroundImageQueue, DeadlineImageQueue
+from game_guide_scraper.controller.journal import CrawlJournal
+from game_guide_scraper.utils.rate_limiter import RateLimiter
+from game_guide_scraper.utils.http import build_session, pool_stats
+
+
+# 限时模式下推迟下载的图片报告文件名（位于输出目录中）
+DEFERRED_REPORT = 'deferred_images.json'
+
+# 顺序模式的抓取日志文件名（位于输出目录中）
+JOURNAL_FILE = '.crawl_journal.jsonl'
 
 
 class Controller:
@@ -30,24 +50,66 @@ class Controller:
         self.config = self._process_config(config or {})
         
         # 初始化各组件
+        # 页面抓取和图片下载共享同一个按主机限速的限速器
+        self.rate_limiter = RateLimiter(self.config['rate_limits'])
+        # 页面抓取和图片下载共享同一个带连接池的会话，复用keep-alive连接
+        self.session = self._build_session()
+        
+        if self.config['cache'] or self.config['offline']:
+            max_mb = self.config['cache_max_mb']
+            self.page_cache = PageCache(
+                cache_dir=self.config['cache_dir'],
+                ttl=self.config['cache_ttl'],
+                max_bytes=int(max_mb * 1024 * 1024) if max_mb else None
+            )
+        else:
+            self.page_cache = None
+        
         self.scraper = Scraper(
             user_agent=self.config['user_agent'],
             delay=self.config['delay'],
             max_retries=self.config['max_retries'],
-            retry_delay=self.config['retry_delay']
+            retry_delay=self.config['retry_delay'],
+            parser_backend=self.config['parser_backend'],
+            cache=self.page_cache,
+            offline=self.config['offline'],
+            rate_limiter=self.rate_limiter,
+            session=self.session
         )
         
-        self.parser = Parser()
-        self.content_organizer = ContentOrganizer()
+        self.parser = Parser(
+            backend=self.config['parser_backend'],
+            extra_filter_keywords=self._split_keywords(self.config['exclude_keywords']),
+            parse_cache=ParseCache(self.config['parse_cache_dir']) if self.config['parse_cache'] else None
+        )
+        if self.config['low_memory']:
+            self.content_organizer = StreamingContentOrganizer(self.config['spill_dir'])
+        else:
+            self.content_organizer = ContentOrganizer()
+        self.deadline = None  # 限时模式的截止时间（time.time()时间戳），在run中设置
+        self.journal = None  # 顺序模式的抓取日志（CrawlJournal对象），在run中打开
         
         # 如果配置了下载图片，则初始化图片下载器
         if self.config['download_images']:
             self.image_downloader = ImageDownloader(
                 output_dir=self.config['image_dir'],
-                delay=self.config['image_delay']
+                delay=self.config['image_delay'],
+                rate_limiter=self.rate_limiter,
+                max_workers=self.config['image_workers'],
+                host_limit=self.config['image_host_limit'],
+                session=self.session,
+                store=ImageStore(self.config['image_store']) if self.config['image_store'] else None,
+                manifest=self._build_manifest(),
+                source_selector=self._build_source_selector()
+            )
+            self.image_transcoder = ImageTranscoder(
+                quality=self.config['image_quality'],
+                webp=self.config['image_format'] == 'webp',
+                workers=self.config['transcode_workers']
             )
         else:
             self.image_downloader = None
+            self.image_transcoder = None
             
     def _process_config(self, user_config):
         """
@@ -71,23 +133,68 @@ class Controller:
             'delay': 1.0,  # 请求间隔时间（秒）
             'max_retries': 3,  # 最大重试次数
             'retry_delay': 2.0,  # 重试间隔时间（秒）
+            'deadline': None,  # 限时模式的时间预算（秒）：先抓取页面文本，再按优先级下载图片，到时推迟其余图片
+            # 按主机名的限速规则，如{'www.gamersky.com': {'rate': 1, 'burst': 2}, 'img*.gamersky.com': {'rate': 5, 'burst': 10}}
+            # rate为每秒请求数，burst为允许连续发送的请求数；没有匹配规则的主机使用delay/image_delay
+            'rate_limits': None,
+            
+            # 页面缓存配置
+            'cache': True,  # 是否将抓取的页面缓存到磁盘
+            'cache_dir': None,  # 页面缓存目录，如果为None则使用output_dir/.cache/pages
+            'cache_ttl': 7 * 24 * 3600,  # 缓存有效期（秒），过期后通过条件请求重新验证，None表示永不过期
+            'cache_max_mb': 200,  # 缓存大小上限（MB），超过时淘汰最久未访问的页面，None表示不限制
+            'offline': False,  # 离线模式，只从缓存读取页面
+            'parse_cache': True,  # 是否缓存页面解析结果，HTML和解析规则不变时不再重新解析
+            'parse_cache_dir': None,  # 解析结果缓存目录，如果为None则使用output_dir/.cache/parsed
             
             # 图片配置
             'download_images': True,  # 是否下载图片
             'image_dir': None,  # 图片保存目录，如果为None则使用output_dir/images
             'image_delay': 0.5,  # 图片下载间隔时间（秒）
             'skip_existing_images': True,  # 是否跳过已存在的图片文件
+            'image_workers': 4,  # 每个页面并发下载图片的线程数，1表示逐张下载
+            'image_host_limit': None,  # 每个图片主机同时进行的最大下载数，None表示等于image_workers
+            'image_store': None,  # 内容寻址图片库目录，可在多个攻略之间共享，None表示不使用
+            'image_manifest': True,  # 是否使用图片清单（image_dir/.manifest.sqlite3）判断图片是否已下载
+            'journal': True,  # 顺序模式下是否记录抓取日志（output_dir/.crawl_journal.jsonl），中断后可以继续抓取
+            'resume': True,  # 是否从上次中断时的抓取日志继续，False表示重新开始
+            'start_page': 1,  # 从第几页开始输出（之前的页面只用于查找下一页链接）
+            'max_pages': 0,  # 最多输出的页面数，0表示不限制
+            'background_images': True,  # 顺序模式下是否在后台线程中下载图片，抓取页面时不等待图片下载
+            'image_quality': 'original',  # 图片质量：original（不转码）、high、medium或low，需要安装Pillow
+            'image_format': 'auto',  # 转码输出格式：auto（保持JPEG/PNG）或webp
+            'transcode_workers': None,  # 图片转码进程数，None表示CPU核数
+            'thumbnail_min_size': 480,  # 缩略图最长边小于该值（像素）时下载原图，0表示不检查
+            'image_budget_mb': None,  # 图片流量预算（MB），超出时原图改为下载缩略图，None表示不限制
+            
+            # 并发配置
+            'pipeline': False,  # 是否使用流水线模式（抓取、解析、图片下载、组织分阶段并行）
+            'jobs': 1,  # 每个阶段的默认工作线程数，大于1时自动启用流水线模式
+            'fetch_jobs': None,  # 按页面索引抓取时的并发数，None表示使用jobs
+            'parse_jobs': None,  # 解析阶段工作线程数，None表示使用jobs
+            'image_jobs': None,  # 图片下载阶段工作线程数，None表示使用jobs
+            'queue_size': None,  # 阶段间队列容量，None表示jobs的2倍
+            
+            # 输出配置
+            'low_memory': False,  # 是否将页面内容写入磁盘临时文件，内存占用不随攻略长度增长
+            'spill_dir': None,  # low_memory模式的临时文件目录，None表示系统临时目录
             
             # 进度报告配置
             'show_progress_bar': True,  # 是否显示进度条
             'log_file': None,  # 日志文件路径
             'progress_callback': None,  # 进度回调函数
             
+            # 解析配置
+            'parser_backend': 'html.parser',  # HTML解析后端：html.parser、lxml或auto（自动选择最快的可用后端）
+            'exclude_keywords': None,  # 额外的文本过滤关键词，逗号分隔的字符串或列表
+            
             # 高级配置
             'timeout': 30,  # 请求超时时间（秒）
             'encoding': 'utf-8',  # 网页编码
-            'headers': {},  # 额外的HTTP请求头
+            'headers': {},  # 额外的HTTP请求头（字典或JSON字符串）
             'proxies': None,  # 代理设置
+            'pool_connections': 10,  # 缓存的主机连接池数量
+            'pool_maxsize': None,  # 每个主机保持的最大连接数，None表示按并发线程数自动计算
         }
         
         # 合并用户配置和默认配置
@@ -96,6 +203,10 @@ class Controller:
         # 处理依赖配置
         if config['image_dir'] is None:
             config['image_dir'] = os.path.join(config['output_dir'], 'images')
+        if config['cache_dir'] is None:
+            config['cache_dir'] = os.path.join(config['output_dir'], '.cache', 'pages')
+        if config['parse_cache_dir'] is None:
+            config['parse_cache_dir'] = os.path.join(config['output_dir'], '.cache', 'parsed')
             
         # 验证必要的配置
         if config['start_url'] is None:
@@ -103,9 +214,88 @@ class Controller:
             
         return config
     
+    def _build_session(self):
+        """
+        根据配置构建共享的HTTP会话
+        
+        返回:
+            requests.Session对象
+        """
+        headers = self.config['headers'] or {}
+        if isinstance(headers, str):
+            try:
+                headers = json.loads(headers)
+            except ValueError:
+                print(f"警告: 无法解析请求头配置，已忽略: {headers}")
+                headers = {}
+        
+        # 连接池至少能容纳同时访问同一主机的线程数
+        pool_maxsize = self.config['pool_maxsize']
+        if not pool_maxsize:
+            pool_maxsize = max(
+                10,
+                self.config['image_host_limit'] or 0,
+                (self.config['image_workers'] or 1) * (self.config['image_jobs'] or self.config['jobs'] or 1),
+                self.config['fetch_jobs'] or self.config['jobs'] or 1
+            )
+        
+        return build_session(
+            user_agent=self.config['user_agent'],
+            headers=headers,
+            pool_connections=self.config['pool_connections'],
+            pool_maxsize=pool_maxsize,
+            proxies=self.config['proxies']
+        )
+    
+    def _build_manifest(self):
+        """
+        根据配置打开图片清单
+        
+        返回:
+            ImageManifest对象，未启用或无法打开时返回None
+        """
+        if not self.config['image_manifest']:
+            return None
+        try:
+            return ImageManifest(os.path.join(self.config['image_dir'], '.manifest.sqlite3'))
+        except Exception as e:
+            print(f"警告: 无法打开图片清单，将逐个检查图片文件: {e}")
+            return None
+    
+    def _build_source_selector(self):
+        """
+        根据图片质量和流量预算构建图片来源选择器
+        
+        返回:
+            ImageSourceSelector对象
+        """
+        budget_mb = self.config['image_budget_mb']
+        return ImageSourceSelector(
+            quality=self.config['image_quality'],
+            min_dimension=self.config['thumbnail_min_size'],
+            byte_budget=int(budget_mb * 1024 * 1024) if budget_mb is not None else None
+        )
+    
+    def _split_keywords(self, keywords):
+        """
+        将关键词配置转换为列表
+        
+        参数:
+            keywords: 逗号分隔的字符串、列表或None
+            
+        返回:
+            去除空白后的关键词列表
+        """
+        if not keywords:
+            return []
+        if isinstance(keywords, str):
+            keywords = keywords.replace('，', ',').split(',')
+        return [keyword.strip() for keyword in keywords if keyword and keyword.strip()]
+    
     def run(self):
         """运行爬虫，协调各组件完成抓取和生成过程"""
         start_time = time.time()
+        self.deadline = start_time + self.config['deadline'] if self.config['deadline'] else None
         self.report_progress("开始运行爬虫")
         
         # 输出配置信息
@@ -134,135 +324,54 @@ class Controller:
             self.report_progress("错误: 未指定起始URL", 0)
             return
         
-        # 初始化页码计数器和统计信息
-        page_number = 1
-        total_pages_processed = 0
-        total_images_processed = 0
-        failed_pages = []
-        failed_images = []
+        # 顺序模式下打开抓取日志，日志中已有的页面不再抓取和解析
+        if self.config['journal'] and not self._use_pipeline():
+            first_page, end_page = self._page_range()
+            self.journal = CrawlJournal(
+                os.path.join(self.config['output_dir'], JOURNAL_FILE),
+                url,
+                start_page=first_page,
+                end_page=end_page,
+                download_images=bool(self.config['download_images']),
+                resume=self.config['resume']
+            )
+        
+        # 初始化统计信息
+        stats = {
+            'pages_processed': 0,
+            'images_processed': 0,
+            'failed_pages': [],
+            'failed_images': [],
+            'deferred_images': [],
+            'finished': False,  # 是否抓取到了最后一页（或页码范围的末尾）
+        }
         
         # 抓取和处理页面
-        while url:
-            # 检查预览模式限制
-            if self.config.get('preview', False):
-                preview_pages = self.config.get('preview_pages', 3)
-                if total_pages_processed >= preview_pages:
-                    self.report_progress(f"预览模式：已抓取 {preview_pages} 页，停止抓取")
-                    break
-            
-            # 报告进度
-            self.report_progress(f"正在抓取第 {page_number} 页: {url}")
-            
+        if self._use_pipeline():
+            self.report_progress("使用流水线模式抓取")
+            CrawlPipeline(self).run(url, stats)
+        else:
+            image_queue = None
+            if self.image_downloader and self.deadline:
+                image_queue = DeadlineImageQueue(self, self.deadline)
+            elif self.image_downloader and self.config['background_images']:
+                image_queue = BackgroundImageQueue(self)
+            if image_queue:
+                image_queue.start()
             try:
-                # 抓取页面
-                html = self.scraper.fetch_page(url)
-                if not html:
-                    self.report_progress(f"无法抓取页面: {url}")
-                    failed_pages.append({'url': url, 'reason': '无法获取HTML内容'})
-                    if self.config.get('continue_on_error', True):
-                        # 如果配置了继续处理，则尝试获取下一页
-                        next_url = None
-                        try:
-                            next_url = self.scraper.get_next_page_url(html, url)
-                        except:
-                            pass
-                        
-                        if next_url and next_url != url:
-                            url = next_url
-                            page_number += 1
-                            continue
-                        else:
-                            break
-                    else:
-                        break
-                
-                # 解析内容
-                content = self.parser.parse_content(html)
-                if not content:
-                    self.report_progress(f"无法解析页面内容: {url}")
-                    failed_pages.append({'url': url, 'reason': '无法解析页面内容'})
-                    if not self.config.get('continue_on_error', True):
-                        break
-                    
-                    # 尝试获取下一页并继续
-                    next_url = self.scraper.get_next_page_url(html, url)
-                    if next_url and next_url != url:
-                        url = next_url
-                        page_number += 1
-                        continue
-                    else:
-                        break
-                
-                # 添加页面信息
-                content['url'] = url
-                content['page_number'] = page_number
-                
-                # 下载图片（如果需要）
-                if self.image_downloader:
-                    image_items = [item for item in content.get('content', []) if item.get('type') == 'image']
-                    if image_items:
-                        self.report_progress(f"正在下载第 {page_number} 页的图片 ({len(image_items)} 张)")
-                        skip_existing = self.config.get('skip_existing_images', True)
-                        download_results = self.image_downloader.download_all_images(image_items, skip_existing=skip_existing)
-                        
-                        # 统计图片下载结果
-                        successful_downloads = sum(1 for item in image_items if 'local_path' in item)
-                        total_images_processed += successful_downloads
-                        
-                        # 记录失败的图片
-                        for item in image_items:
-                            if item.get('type') == 'image' and 'url' in item and 'local_path' not in item:
-                                failed_images.append({'url': item['url'], 'page': url})
-                        
-                        if successful_downloads < len(image_items):
-                            self.report_progress(f"警告: 第 {page_number} 页有 {len(image_items) - successful_downloads} 张图片下载失败")
-                
-                # 添加到内容组织器
-                self.content_organizer.add_page_content(content)
-                
-                # 获取下一页URL
-                next_url = self.scraper.get_next_page_url(html, url)
-                
-                # 避免无限循环
-                if next_url == url:
-                    self.report_progress(f"检测到循环链接，停止抓取: {url}")
-                    break
-                
-                # 更新URL和页码
-                url = next_url
-                page_number += 1
-                total_pages_processed += 1
-                
-                # 计算并报告总体进度
-                # 由于我们不知道总页数，所以无法准确计算百分比
-                # 这里只报告已处理的页数
-                self.report_progress(f"已处理 {total_pages_processed} 个页面")
-                
-                # 如果没有下一页，结束循环
-                if not url:
-                    self.report_progress("已到达最后一页")
-                    
-            except Exception as e:
-                # 捕获所有异常，确保爬虫不会因为单个页面的错误而完全停止
-                self.report_progress(f"处理页面 {url} 时出错: {str(e)}")
-                failed_pages.append({'url': url, 'reason': str(e)})
-                
-                if self.config.get('continue_on_error', True):
-                    # 尝试获取下一页并继续
-                    try:
-                        next_url = self.scraper.get_next_page_url(html, url)
-                        if next_url and next_url != url:
-                            url = next_url
-                            page_number += 1
-                            continue
-                        else:
-                            break
-                    except:
-                        # 如果无法获取下一页，则停止抓取
-                        self.report_progress("无法获取下一页，停止抓取")
-                        break
-                else:
-                    break
+                self._crawl_sequential(url, stats, image_queue)
+            finally:
+                # 生成Markdown之前等待所有图片下载完成
+                if image_queue:
+                    image_queue.join(stats)
+        
+        # 记录限时模式下推迟下载的图片
+        self._write_deferred_report(stats['deferred_images'])
+        
+        total_pages_processed = stats['pages_processed']
+        total_images_processed = stats['images_processed']
+        failed_pages = stats['failed_pages']
+        failed_images = stats['failed_images']
         
         # 组织内容
         self.report_progress("正在组织内容...")
@@ -271,29 +380,54 @@ class Controller:
         # 收集图片映射
         image_mapping = {}
         if self.image_downloader:
-            # 从所有章节和小节中收集图片映射
+            # 从所有章节和小节中收集已下载的图片
+            image_items = []
             for chapter in organized_content.get('chapters', []):
                 for item in chapter.get('content', []):
                     if item.get('type') == 'image' and 'url' in item and 'local_path' in item:
-                        image_mapping[item['url']] = item['local_path']
+                        image_items.append(item)
                 
                 for section in chapter.get('sections', []):
                     for item in section.get('content', []):
                         if item.get('type') == 'image' and 'url' in item and 'local_path' in item:
-                            image_mapping[item['url']] = item['local_path']
-        
-        # 生成Markdown
-        self.report_progress("正在生成Markdown...")
-        markdown_generator = MarkdownGenerator(image_mapping)
-        markdown = markdown_generator.generate_markdown(organized_content)
+                            image_items.append(item)
+            
+            # 按图片质量转码，图片项的local_path会指向转码后的图片（限时模式下到达截止时间后跳过）
+            if self.deadline and time.time() >= self.deadline:
+                if self.image_transcoder.quality != 'original' and image_items:
+                    self.report_progress("已到达截止时间，跳过图片转码")
+            elif self.image_transcoder.quality != 'original' and image_items:
+                self.report_progress(f"正在转码图片（质量: {self.image_transcoder.quality}）...")
+                transcode_stats = self.image_transcoder.transcode(image_items)
+                if transcode_stats['bytes_before']:
+                    self.report_progress(
+                        f"图片转码: 转码 {transcode_stats['transcoded']} 张, 复用 {transcode_stats['reused']} 张, "
+                        f"保留原图 {transcode_stats['kept']} 张, "
+                        f"{transcode_stats['bytes_before'] / 1024:.1f} KB -> {transcode_stats['bytes_after'] / 1024:.1f} KB "
+                        f"(节省 {transcode_stats['saved_ratio']:.0%})"
+                    )
+            
+            for item in image_items:
+                image_mapping[item['url']] = item['local_path']
         
-        # 保存Markdown
+        # 生成Markdown，逐块写入输出文件
         output_file = os.path.join(
             self.config['output_dir'],
             self.config['output_file']
         )
-        self.report_progress(f"正在保存Markdown到 {output_file}...")
-        success = markdown_generator.save_markdown(markdown, output_file)
+        self.report_progress(f"正在生成Markdown并保存到 {output_file}...")
+        markdown_generator = MarkdownGenerator(image_mapping)
+        success = markdown_generator.write_markdown(organized_content, output_file)
+        self.content_organizer.close()
+        
+        # 抓取完整结束且保存成功后删除抓取日志，否则保留日志以便下次继续
+        if self.journal is not None:
+            if success and stats['finished']:
+                self.journal.discard()
+            else:
+                self.journal.close()
+                self.report_progress("抓取未完成，再次运行相同的命令将从中断处继续")
+            self.journal = None
         
         # 计算运行时间
         end_time = time.time()
@@ -316,7 +450,49 @@ class Controller:
             self.report_progress(f"下载图片数: {total_images_processed}")
             if failed_images:
                 self.report_progress(f"图片下载失败数: {len(failed_images)}")
+            if stats['deferred_images']:
+                self.report_progress(f"推迟下载的图片数: {len(stats['deferred_images'])}")
         
+        if self.config.get('verbose'):
+            filter_stats = self.parser.text_filter.stats()
+            self.report_progress(
+                f"文本过滤: {filter_stats['keywords']} 个关键词, 调用 {filter_stats['calls']} 次, "
+                f"过滤 {filter_stats['filtered']} 段, 平均耗时 {filter_stats['avg_time'] * 1e6:.1f} 微秒"
+            )
+            removed = self.parser.boilerplate.removed
+            if removed:
+                details = ', '.join(f"{selector} {count}" for selector, count in removed.most_common())
+                self.report_progress(f"移除无用元素: {details}")
+            session_stats = pool_stats(self.session)
+            if session_stats['requests']:
+                self.report_progress(
+                    f"连接池: 请求 {session_stats['requests']} 次, 复用连接 {session_stats['hits']} 次, "
+                    f"新建连接 {session_stats['misses']} 次"
+                )
+            if self.image_downloader and self.image_downloader.store is not None:
+                store_stats = self.image_downloader.store.stats()
+                links = store_stats['links']
+                self.report_progress(
+                    f"图片库: 已知URL命中 {store_stats['url_hits']} 次, 内容去重 {store_stats['dedup_hits']} 次, "
+                    f"硬链接 {links['hardlink']} / 符号链接 {links['symlink']} / 复制 {links['copy']}"
+                )
+            if self.image_downloader and self.image_downloader.source_selector.thumbnails:
+                source_stats = self.image_downloader.source_selector.stats()
+                self.report_progress(
+                    f"图片来源: 缩略图 {source_stats['thumbnails']} 张, 原图 {source_stats['originals']} 张 "
+                    f"(缩略图过小改用原图 {source_stats['upgraded']} 张, 超出预算改用缩略图 {source_stats['budget_limited']} 张)"
+                )
+            if self.page_cache is not None:
+                cache_stats = self.page_cache.stats()
+                self.report_progress(
+                    f"页面缓存: 命中 {cache_stats['hits']} 次, 重新验证 {cache_stats['revalidated']} 次, "
+                    f"未命中 {cache_stats['misses']} 次, 共 {cache_stats['entries']} 个页面 "
+                    f"({cache_stats['total_bytes'] / 1024:.1f} KB)"
+                )
+            if self.parser.parse_cache is not None:
+                parse_stats = self.parser.parse_cache.stats()
+                self.report_progress(f"解析缓存: 命中 {parse_stats['hits']} 次, 未命中 {parse_stats['misses']} 次")
+
         if failed_pages:
             self.report_progress(f"页面处理失败数: {len(failed_pages)}")
             for i, failed_page in enumerate(failed_pages[:10], 1):  # 只显示前10个失败页面
@@ -332,6 +508,7 @@ class Controller:
             'images_processed': total_images_processed,
             'failed_pages': failed_pages,
             'failed_images': failed_images,
+            'deferred_images': stats['deferred_images'],
             'run_time': run_time
         }
         
@@ -342,6 +519,283 @@ class Controller:
             
         return result_summary
     
+    def _use_pipeline(self):
+        """
+        判断是否使用流水线模式抓取
+        
+        返回:
+            配置了pipeline或jobs大于1且没有配置deadline时返回True
+        """
+        if self.config.get('deadline'):
+            # 限时模式需要先抓取全部文本再按优先级下载图片，使用顺序模式
+            return False
+        return bool(self.config.get('pipeline')) or (self.config.get('jobs') or 1) > 1
+    
+    def _write_deferred_report(self, deferred_images):
+        """
+        将推迟下载的图片写入输出目录中的报告，没有推迟的图片时删除上次运行留下的报告
+        
+        报告只供查看，不会被读取：再次运行时仍然重新处理全部页面（页面通常从页面缓存读取），
+        已下载的图片通过图片清单和已存在的文件跳过，因此实际只会下载上次推迟的图片，
+        并重新生成完整的Markdown。
+        
+        参数:
+            deferred_images: 推迟下载的图片列表
+        """
+        report_path = os.path.join(self.config['output_dir'], DEFERRED_REPORT)
+        if not deferred_images:
+            if os.path.exists(report_path):
+                os.remove(report_path)
+                self.report_progress("上次推迟下载的图片已全部处理")
+            return
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump({'deferred_images': deferred_images}, f, ensure_ascii=False, indent=2)
+        self.report_progress(f"推迟下载的图片已记录到 {report_path}；再次运行时会重新处理全部页面，"
+                             f"已下载的图片被跳过，只会下载推迟的图片")
+    
+    def _crawl_sequential(self, url, stats, image_queue=None):
+        """
+        顺序抓取模式：逐页抓取、解析、下载图片并添加到内容组织器
+        
+        参数:
+            url: 起始URL
+            stats: 统计信息字典，抓取过程中会被更新
+
+            image_queue: 后台图片下载队列（BackgroundImageQueue对象），为None时在抓取线程中逐页下载图片，
+                         否则页面的图片提交到队列，图片统计信息在队列join时合并到stats中
+        """
+        page_number = 1
+        failed_pages = stats['failed_pages']
+        first_page, last_page = self._page_range()
+        
+        # 从抓取日志恢复已完成的页面
+        if self.journal is not None and self.journal.pages:
+            url, page_number = self._restore_journal(stats, image_queue)
+            if not url:
+                self.report_progress("抓取日志中的页面已到达最后一页")
+                stats['finished'] = True
+        
+        while url:
+            # 限时模式下到达截止时间后停止抓取
+            if self.deadline and time.time() >= self.deadline:
+                self.report_progress(f"已到达截止时间，停止抓取: {url}")
+                break
+            
+            # 检查页码范围（--max-pages和预览模式）
+            if last_page is not None and page_number > last_page:
+                if self.config.get('preview', False):
+                    self.report_progress(f"预览模式：已抓取到第 {last_page} 页，停止抓取")
+                else:
+                    self.report_progress(f"已抓取到第 {last_page} 页，停止抓取")
+                stats['finished'] = True
+                break
+            
+            # 报告进度
+            self.report_progress(f"正在抓取第 {page_number} 页: {url}")
+            
+            page = None
+            try:
+                # 抓取页面
+                html = self.scraper.fetch_page(url)
+                if not html:
+                    # 没有HTML内容时无法得知下一页，只能停止抓取
+                    self.report_progress(f"无法抓取页面: {url}")
+                    failed_pages.append({'url': url, 'reason': '无法获取HTML内容'})
+                    break
+                
+                # 解析页面（标题、内容、下一页URL一次解析得到）
+                page = self.parser.parse_page(html, url, with_index=(page_number == 1))
+                
+                # 首页包含页面索引时报告总页数
+                if page and page.page_index:
+                    self.report_progress(f"发现页面索引，共 {len(page.page_index)} 页")
+                
+                if not page or not page.ok:
+                    self.report_progress(f"无法解析页面内容: {url}")
+                    failed_pages.append({'url': url, 'reason': '无法解析页面内容'})
+                    if not self.config.get('continue_on_error', True):
+                        break
+                    
+                    # 尝试获取下一页并继续
+                    next_url = page.next_url if page else None
+                    if next_url and next_url != url:
+                        url = next_url
+                        page_number += 1
+                        continue
+                    else:
+                        break
+                
+                # 获取下一页URL
+                next_url = page.next_url
+                
+                # 起始页之前的页面只用于查找下一页链接
+                if page_number < first_page:
+                    self.report_progress(f"跳过第 {page_number} 页")
+                    if not next_url or next_url == url:
+                        break
+                    url = next_url
+                    page_number += 1
+                    continue
+                
+                # 添加页面信息，并写入抓取日志
+                content = page.to_dict(page_number)
+                if self.journal is not None:
+                    self.journal.record_page(content, next_url)
+                
+                # 下载图片（如果需要）
+                self._process_page_images(content, stats, image_queue)
+                
+                # 添加到内容组织器
+                self.content_organizer.add_page_content(content)
+                
+                # 避免无限循环
+                if next_url == url:
+                    self.report_progress(f"检测到循环链接，停止抓取: {url}")
+                    break
+                
+                # 更新URL和页码
+                url = next_url
+                page_number += 1
+                stats['pages_processed'] += 1
+                
+                # 计算并报告总体进度
+                # 由于我们不知道总页数，所以无法准确计算百分比
+                # 这里只报告已处理的页数
+                self.report_progress(f"已处理 {stats['pages_processed']} 个页面")
+                
+                # 如果没有下一页，结束循环
+                if not url:
+                    self.report_progress("已到达最后一页")
+                    stats['finished'] = True
+                    
+            except Exception as e:
+                # 捕获所有异常，确保爬虫不会因为单个页面的错误而完全停止
+                self.report_progress(f"处理页面 {url} 时出错: {str(e)}")
+                failed_pages.append({'url': url, 'reason': str(e)})
+                
+                # 页面已经解析过时，直接使用解析得到的下一页URL继续
+                next_url = page.next_url if page else None
+                if self.config.get('continue_on_error', True) and next_url and next_url != url:
+                    url = next_url
+                    page_number += 1
+                    continue
+                
+                if self.config.get('continue_on_error', True):
+                    self.report_progress("无法获取下一页，停止抓取")
+                break
+    
+    def _page_range(self):
+        """
+        根据start_page、max_pages和预览模式计算要输出的页码范围
+        
+        返回:
+            (起始页码, 最后页码)，最后页码为None表示不限制
+        """
+        first_page = max(1, int(self.config.get('start_page') or 1))
+        limits = []
+        if self.config.get('max_pages'):
+            limits.append(first_page + int(self.config['max_pages']) - 1)
+        if self.config.get('preview', False):
+            limits.append(first_page + int(self.config.get('preview_pages', 3)) - 1)
+        return first_page, min(limits) if limits else None
+    
+    def _restore_journal(self, stats, image_queue):
+        """
+        将抓取日志中的页面添加到内容组织器，图片已处理完成的页面恢复图片结果，其余页面重新处理图片
+        
+        参数:
+            stats: 统计信息字典
+            image_queue: 后台图片下载队列，为None时在当前线程中下载图片
+            
+        返回:
+            (继续抓取的URL, 继续抓取的页码)，URL为None表示已抓取到最后一页
+        """
+        pages = self.journal.pages
+        self.report_progress(f"从抓取日志恢复 {len(pages)} 个页面（第 {pages[0]['page_number']}-{pages[-1]['page_number']} 页）")
+        
+        for record in pages:
+            content = record['content']
+            images = record.get('images')
+            if images is None:
+                self._process_page_images(content, stats, image_queue)
+            else:
+                local_paths = images['local_paths']
+                for item in content.get('content', []):
+                    if item.get('type') == 'image' and item.get('url') in local_paths:
+                        item['local_path'] = local_paths[item['url']]
+                        stats['images_processed'] += 1
+                stats['failed_images'].extend(images['failed'])
+            self.content_organizer.add_page_content(content)
+            stats['pages_processed'] += 1
+        
+        last = pages[-1]
+        return last['next_url'], last['page_number'] + 1
+    
+    def _process_page_images(self, content, stats, image_queue=None):
+        """
+        下载页面的图片，或将页面提交到图片下载队列
+        
+        参数:
+            content: 页面内容字典
+            stats: 统计信息字典，在当前线程中下载时更新
+            image_queue: 图片下载队列，为None时在当前线程中下载
+        """
+        if image_queue:
+            image_queue.submit(content)
+            return
+        successful_downloads, failed_images = self._download_page_images(content)
+        stats['images_processed'] += successful_downloads
+        stats['failed_images'].extend(failed_images)
+        self._record_page_images(content, failed_images)
+    
+    def _record_page_images(self, content, failed_images):
+        """
+        将页面的图片处理结果写入抓取日志（如果启用）
+        
+        参数:
+            content: 页面内容字典
+            failed_images: 下载失败的图片列表
+        """
+        if self.journal is not None:
+            self.journal.record_images(content, failed_images)
+    
+    def _download_page_images(self, content):
+        """
+        下载单个页面中的图片（如果配置了下载图片）
+        
+        参数:
+            content: 页面内容字典，图片项下载成功后会被写入local_path
+            
+        返回:
+            (成功下载的图片数, 下载失败的图片列表)
+        """
+        failed_images = []
+        if not self.image_downloader:
+            return 0, failed_images
+        
+        url = content['url']
+        page_number = content['page_number']
+        image_items = [item for item in content.get('content', []) if item.get('type') == 'image']
+        if not image_items:
+            return 0, failed_images
+        
+        self.report_progress(f"正在下载第 {page_number} 页的图片 ({len(image_items)} 张)")
+        skip_existing = self.config.get('skip_existing_images', True)
+        self.image_downloader.download_all_images(image_items, skip_existing=skip_existing)
+        
+        # 统计图片下载结果
+        successful_downloads = sum(1 for item in image_items if 'local_path' in item)
+        
+        # 记录失败的图片
+        for item in image_items:
+            if item.get('type') == 'image' and 'url' in item and 'local_path' not in item:
+                failed_images.append({'url': item['url'], 'page': url})
+        
+        if successful_downloads < len(image_items):
+            self.report_progress(f"警告: 第 {page_number} 页有 {len(image_items) - successful_downloads} 张图片下载失败")
+        
+        return successful_downloads, failed_images
+    
     def report_progress(self, message, percentage=None):
         """
         报告进度
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+后台图片下载模块
+
+这个模块包含BackgroundImageQueue类，在顺序抓取模式下于后台线程中下载页面图片，
+使页面抓取不必等待图片下载完成；以及DeadlineImageQueue类，在限时模式下先抓取全部页面文本，
+再按优先级下载图片，到达截止时间后推迟其余图片。
+"""
+
+import queue
+import threading
+import time
+
+# 队列结束标记
+_STOP = object()
+
+
+class BackgroundImageQueue:
+    """
+    后台图片下载队列
+
+    顺序抓取模式下，每个页面解析完成后将页面内容提交到队列，由后台线程调用
+    Controller._download_page_images下载图片并写入图片项的local_path，抓取线程立即继续抓取下一页。
+    join等待队列处理完毕，并按页面提交的顺序汇总统计信息，因此成功数和失败图片列表与逐页下载时相同。
+    """
+
+    def __init__(self, controller, workers=1):
+        """
+        初始化后台图片下载队列
+
+        参数:
+            controller: Controller实例，提供图片下载和进度报告
+            workers: 后台下载线程数，每个线程一次处理一个页面（页面内的图片仍按image_workers并发下载）
+        """
+        self.controller = controller
+        self.workers = max(1, int(workers or 1))
+        self._queue = queue.Queue()
+        self._results = []  # 按提交顺序排列的(成功下载数, 失败图片列表)
+        self._threads = []
+
+    def start(self):
+        """启动后台下载线程"""
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, content):
+        """
+        提交一个页面的图片下载任务
+
+        参数:
+            content: 页面内容字典，图片项下载成功后会被写入local_path
+        """
+        index = len(self._results)
+        self._results.append(None)
+        self._queue.put((index, content))
+
+    def join(self, stats):
+        """
+        等待所有任务完成，并将图片统计信息合并到stats中
+
+        参数:
+            stats: 统计信息字典，更新其中的images_processed和failed_images
+        """
+        if self._queue.unfinished_tasks:
+            self.controller.report_progress(f"等待后台图片下载完成（剩余 {self._queue.unfinished_tasks} 个页面）...")
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+        for successful_downloads, failed_images in self._results:
+            stats['images_processed'] += successful_downloads
+            stats['failed_images'].extend(failed_images)
+        self._results = []
+
+    def _worker(self):
+        """后台线程：依次下载队列中页面的图片"""
+        while True:
+            task = self._queue.get()
+            try:
+                if task is _STOP:
+                    break
+                index, content = task
+                self._results[index] = self._download(content)
+                self.controller._record_page_images(content, self._results[index][1])
+            finally:
+                self._queue.task_done()
+
+    def _download(self, content):
+        """
+        下载页面图片，出错时将未下载的图片记为失败
+
+        参数:
+            content: 页面内容字典
+
+        返回:
+            (成功下载的图片数, 下载失败的图片列表)
+        """
+        try:
+            return self.controller._download_page_images(content)
+        except Exception as e:
+            self.controller.report_progress(f"下载页面 {content['url']} 的图片时出错: {str(e)}")
+            image_items = [item for item in content.get('content', []) if item.get('type') == 'image']
+            successful_downloads = sum(1 for item in image_items if 'local_path' in item)
+            failed_images = [{'url': item['url'], 'page': content['url']}
+                             for item in image_items if 'url' in item and 'local_path' not in item]
+            return successful_downloads, failed_images
+
+
+class DeadlineImageQueue:
+    """
+    限时模式的图片下载队列
+
+    与BackgroundImageQueue接口相同。抓取期间只收集页面，不下载图片；join时按优先级分批下载：
+    先下载每个页面的第1张图片，再下载每个页面的第2张图片，依此类推，同一优先级按页码排序。
+    每批开始前检查截止时间，到达截止时间后其余图片不再下载（推迟），Markdown中保留它们的原始URL。
+
+    属性:
+        deadline: 截止时间（time.time()时间戳）
+        deferred: 被推迟的图片列表，每项包含url、page、page_number和rank（页面内的序号，从0开始）
+    """
+
+    def __init__(self, controller, deadline, batch_size=None):
+        """
+        初始化限时图片下载队列
+
+        参数:
+            controller: Controller实例，提供图片下载器、配置和进度报告
+            deadline: 截止时间（time.time()时间戳）
+            batch_size: 每批下载的图片数，为None时为图片下载线程数的2倍
+        """
+        self.controller = controller
+        self.deadline = deadline
+        downloader = controller.image_downloader
+        self.batch_size = max(1, int(batch_size or downloader.max_workers * 2))
+        self.deferred = []
+        self._pages = []
+
+    def start(self):
+        """与BackgroundImageQueue保持一致，无需启动线程"""
+
+    def submit(self, content):
+        """
+        收集一个页面，图片在join时下载
+
+        参数:
+            content: 页面内容字典，图片项下载成功后会被写入local_path
+        """
+        self._pages.append(content)
+
+    def join(self, stats):
+        """
+        按优先级下载图片直到截止时间，并将图片统计信息合并到stats中
+
+        参数:
+            stats: 统计信息字典，更新其中的images_processed、failed_images和deferred_images
+        """
+        report = self.controller.report_progress
+        skip_existing = self.controller.config.get('skip_existing_images', True)
+
+        # (页面内序号, 提交顺序, 图片项, 页面)
+        queue_items = []
+        for order, content in enumerate(self._pages):
+            image_items = [item for item in content.get('content', []) if item.get('type') == 'image']
+            for rank, item in enumerate(image_items):
+                queue_items.append((rank, order, item, content))
+        queue_items.sort(key=lambda entry: entry[:2])
+
+        attempted = set()
+        for start in range(0, len(queue_items), self.batch_size):
+            if time.time() >= self.deadline:
+                break
+            batch = queue_items[start:start + self.batch_size]
+            report(f"正在下载图片 {start + 1}-{start + len(batch)}/{len(queue_items)}（剩余 "
+                   f"{max(0.0, self.deadline - time.time()):.0f} 秒）")
+            try:
+                self.controller.image_downloader.download_all_images(
+                    [entry[2] for entry in batch], skip_existing=skip_existing)
+            except Exception as e:
+                report(f"下载图片时出错: {str(e)}")
+            attempted.update(id(entry[2]) for entry in batch)
+
+        # 按页面和图片顺序汇总，与逐页下载时的统计方式相同
+        self.deferred = []
+        for order, content in enumerate(self._pages):
+            image_items = [item for item in content.get('content', []) if item.get('type') == 'image']
+            page_deferred = []
+            page_failed = []
+            for rank, item in enumerate(image_items):
+                if 'local_path' in item:
+                    stats['images_processed'] += 1
+                elif id(item) not in attempted:
+                    page_deferred.append({'url': item.get('url'), 'page': content['url'],
+                                          'page_number': content.get('page_number'), 'rank': rank})
+                elif 'url' in item:
+                    page_failed.append({'url': item['url'], 'page': content['url']})
+            stats['failed_images'].extend(page_failed)
+            self.deferred.extend(page_deferred)
+            # 有图片被推迟的页面不记录图片结果，从抓取日志恢复时会重新处理
+            if not page_deferred:
+                self.controller._record_page_images(content, page_failed)
+        stats.setdefault('deferred_images', []).extend(self.deferred)
+        self._pages = []
+
+        if self.deferred:
+            report(f"已到达截止时间，推迟下载 {len(self.deferred)} 张图片，Markdown中保留其原始URL")
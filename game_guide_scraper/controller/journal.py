@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+抓取日志模块
+
+这个模块包含CrawlJournal类，以只追加的JSON Lines文件记录顺序抓取过程中每个页面的解析结果、
+图片下载结果和下一页URL，中断（崩溃或Ctrl-C）后再次运行时从最后一个检查点继续抓取。
+"""
+
+import json
+import os
+import threading
+
+from game_guide_scraper.parser.items import ContentItem, content_items
+
+# 日志格式版本，格式变化时旧日志不再用于恢复
+JOURNAL_VERSION = 2
+
+
+def _encode(obj):
+    """将内容元素转换为字典写入JSON"""
+    if isinstance(obj, ContentItem):
+        return obj.to_dict()
+    raise TypeError(f"无法写入抓取日志的对象: {obj!r}")
+
+
+class CrawlJournal:
+    """
+    抓取日志
+
+    日志的每一行是一条JSON记录：
+        {"type": "start", "version": 2, "start_url": ..., "start_page": ..., "end_page": ...,
+         "download_images": ...}  抓取参数，恢复时必须一致
+        {"type": "page", "page_number": 3, "content": {...}, "next_url": ...}  页面解析完成
+        {"type": "images", "page_number": 3, "local_paths": {...}, "failed": [...]}  页面图片处理完成
+    每条记录写入后立即刷新到文件，最后一行不完整（写入时中断）时被忽略。
+
+    属性:
+        path: 日志文件路径
+        pages: 从日志中恢复的页面记录列表（按页码排序），每项包含page_number、content、next_url，
+               图片已处理完成的页面还包含images（local_paths和failed）
+    """
+
+    def __init__(self, path, start_url, start_page=1, end_page=None, download_images=True, resume=True):
+        """
+        打开抓取日志
+
+        参数:
+            path: 日志文件路径
+            start_url: 起始URL
+            start_page: 起始页码
+            end_page: 最后输出的页码（由max_pages和预览页数决定），None表示不限制
+            download_images: 是否下载图片（不下载图片时记录的图片结果为空，不能用于下载图片的抓取）
+            resume: 是否从已有日志恢复，为False或抓取参数不一致时清空日志重新开始
+        """
+        self.path = path
+        self.pages = []
+        self._lock = threading.Lock()
+        header = {'type': 'start', 'version': JOURNAL_VERSION, 'start_url': start_url, 'start_page': start_page,
+                  'end_page': end_page, 'download_images': download_images}
+
+        records = self._read() if resume else []
+        if records and records[0] == header:
+            self.pages = self._replay(records[1:])
+            self._file = open(path, 'a', encoding='utf-8')
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'w', encoding='utf-8')
+            self._append(header)
+
+    def _read(self):
+        """读取日志中的全部完整记录"""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 写入时中断留下的不完整记录
+                    break
+        return records
+
+    @staticmethod
+    def _replay(records):
+        """
+        按记录重建页面列表，页面的内容元素恢复为ContentItem对象
+
+        参数:
+            records: 日志记录（不含start记录）
+
+        返回:
+            按页码排序的页面记录列表
+        """
+        pages = {}
+        for record in records:
+            if record.get('type') == 'page':
+                content = record['content']
+                if content.get('content') is not None:
+                    content['content'] = content_items(content['content'])
+                pages[record['page_number']] = {
+                    'page_number': record['page_number'],
+                    'content': content,
+                    'next_url': record.get('next_url')
+                }
+            elif record.get('type') == 'images' and record.get('page_number') in pages:
+                pages[record['page_number']]['images'] = {
+                    'local_paths': record.get('local_paths', {}),
+                    'failed': record.get('failed', [])
+                }
+        return [pages[page_number] for page_number in sorted(pages)]
+
+    def _append(self, record):
+        """追加一条记录并立即刷新到文件"""
+        line = json.dumps(record, ensure_ascii=False, default=_encode)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def record_page(self, content, next_url):
+        """
+        记录解析完成的页面
+
+        参数:
+            content: 页面内容字典（包含page_number）
+            next_url: 下一页URL
+        """
+        self._append({'type': 'page', 'page_number': content['page_number'], 'content': content,
+                      'next_url': next_url})
+
+    def record_images(self, content, failed_images):
+        """
+        记录页面的图片处理结果
+
+        参数:
+            content: 页面内容字典，下载成功的图片项包含local_path
+            failed_images: 下载失败的图片列表
+        """
+        local_paths = {item['url']: item['local_path'] for item in content.get('content', [])
+                       if item.get('type') == 'image' and 'url' in item and 'local_path' in item}
+        self._append({'type': 'images', 'page_number': content['page_number'], 'local_paths': local_paths,
+                      'failed': failed_images})
+
+    @property
+    def last_page(self):
+        """最后一个已记录的页面，没有时返回None"""
+        return self.pages[-1] if self.pages else None
+
+    def close(self):
+        """关闭日志文件"""
+        with self._lock:
+            self._file.close()
+
+    def discard(self):
+        """关闭并删除日志（抓取完整结束后调用）"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
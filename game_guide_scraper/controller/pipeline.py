@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+流水线抓取模块
+
+这个模块包含CrawlPipeline类，将抓取、解析、图片下载和内容组织拆分为独立的阶段，
+各阶段之间通过有界队列连接，每个阶段拥有各自的工作线程数。
+"""
+
+import queue
+import threading
+
+# 队列结束标记
+_STOP = object()
+
+
+class CrawlPipeline:
+    """
+    流水线抓取器，复用Controller中的各组件，按阶段并行处理页面
+
+    阶段划分:
+        抓取: 首页包含页面索引时按索引并发抓取（工作线程数由fetch_jobs决定），
+              否则沿"下一页"链接依次抓取
+        解析: 解析HTML内容，工作线程数由parse_jobs决定
+        图片下载: 下载页面中的图片，工作线程数由image_jobs决定
+        组织: 在调用线程中将页面添加到内容组织器
+
+    阶段之间的队列均有容量上限，下游处理不过来时上游会阻塞，从而保持内存占用平稳。
+    内容组织器按page_number排序，因此输出与顺序模式完全一致。
+    """
+
+    def __init__(self, controller):
+        """
+        初始化流水线
+
+        参数:
+            controller: Controller实例，提供配置、各组件和进度报告
+        """
+        self.controller = controller
+        self.config = controller.config
+
+        jobs = max(1, int(self.config.get('jobs') or 1))
+        self.fetch_jobs = max(1, int(self.config.get('fetch_jobs') or jobs))
+        self.parse_jobs = max(1, int(self.config.get('parse_jobs') or jobs))
+        self.image_jobs = max(1, int(self.config.get('image_jobs') or jobs))
+        queue_size = max(1, int(self.config.get('queue_size') or jobs * 2))
+
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.image_queue = queue.Queue(maxsize=queue_size)
+        self.organize_queue = queue.Queue(maxsize=queue_size)
+
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._stats = None
+
+    def run(self, start_url, stats):
+        """
+        运行流水线，直到所有页面处理完毕
+
+        参数:
+            start_url: 起始URL
+            stats: 统计信息字典，抓取过程中会被更新
+        """
+        self._stats = stats
+        download_images = self.controller.image_downloader is not None
+
+        fetch_threads = [self._start_thread(self._fetch_stage, start_url)]
+        parse_threads = [self._start_thread(self._parse_stage) for _ in range(self.parse_jobs)]
+        image_threads = []
+        if download_images:
+            image_threads = [self._start_thread(self._image_stage) for _ in range(self.image_jobs)]
+
+        # 按阶段依次关闭：上游全部结束后，向下游队列发送结束标记
+        stages = [(fetch_threads, self.parse_queue, self.parse_jobs)]
+        if download_images:
+            stages.append((parse_threads, self.image_queue, self.image_jobs))
+            stages.append((image_threads, self.organize_queue, 1))
+        else:
+            stages.append((parse_threads, self.organize_queue, 1))
+        self._start_thread(self._close_stages, stages)
+
+        try:
+            self._organize_stage()
+        except BaseException:
+            # 出现异常（如用户中断）时通知各阶段尽快结束
+            self._stop_event.set()
+            raise
+
+    def _start_thread(self, target, *args):
+        """
+        启动一个后台工作线程
+
+        参数:
+            target: 线程函数
+            args: 线程函数参数
+
+        返回:
+            已启动的线程对象
+        """
+        thread = threading.Thread(target=target, args=args)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _close_stages(self, stages):
+        """
+        等待每个阶段的线程结束，然后向下游发送结束标记
+
+        参数:
+            stages: (上游线程列表, 下游队列, 下游工作线程数)组成的列表
+        """
+        for threads, downstream, consumers in stages:
+            for thread in threads:
+                thread.join()
+            for _ in range(consumers):
+                downstream.put(_STOP)
+
+    def _record_failure(self, url, reason):
+        """
+        记录处理失败的页面（线程安全）
+
+        参数:
+            url: 页面URL
+            reason: 失败原因
+        """
+        with self._lock:
+            self._stats['failed_pages'].append({'url': url, 'reason': reason})
+        if not self.config.get('continue_on_error', True):
+            self._stop_event.set()
+
+    def _fetch_stage(self, url):
+        """
+        抓取阶段：抓取首页，如果首页包含页面索引，则并发抓取其余页面，
+        否则沿"下一页"链接依次抓取
+
+        参数:
+            url: 起始URL
+        """
+        html = self._fetch(1, url)
+        if html is None:
+            return
+
+        # 首页在抓取阶段完成解析，解析结果中同时包含页面索引和下一页URL
+        page = self._parse(url, html, with_index=True)
+        if page is None:
+            return
+
+        if page.page_index:
+            self.controller.report_progress(f"发现页面索引，共 {len(page.page_index)} 页")
+            if self.controller._page_range()[0] <= 1:
+                self.parse_queue.put((1, url, None, page))
+            self._fetch_indexed(page.page_index)
+        else:
+            self._fetch_chain(page)
+
+    def _parse(self, url, html, with_index=False):
+        """
+        解析单个页面，失败时记录失败信息
+
+        参数:
+            url: 页面URL
+            html: 页面的HTML内容
+            with_index: 是否提取页面索引
+
+        返回:
+            ParsedPage对象，无法解析时返回None
+        """
+        try:
+            page = self.controller.parser.parse_page(html, url, with_index=with_index)
+        except Exception as e:
+            self.controller.report_progress(f"处理页面 {url} 时出错: {str(e)}")
+            self._record_failure(url, str(e))
+            return None
+
+        if page is None:
+            self.controller.report_progress(f"无法解析页面内容: {url}")
+            self._record_failure(url, '无法解析页面内容')
+        return page
+
+    def _fetch(self, page_number, url):
+        """
+        抓取单个页面，失败时记录失败信息
+
+        参数:
+            page_number: 页码
+            url: 页面URL
+
+        返回:
+            页面的HTML内容，抓取失败时返回None
+        """
+        report = self.controller.report_progress
+        report(f"正在抓取第 {page_number} 页: {url}")
+
+        try:
+            html = self.controller.scraper.fetch_page(url)
+        except Exception as e:
+            report(f"处理页面 {url} 时出错: {str(e)}")
+            self._record_failure(url, str(e))
+            return None
+
+        if not html:
+            report(f"无法抓取页面: {url}")
+            self._record_failure(url, '无法获取HTML内容')
+            return None
+        return html
+
+    def _fetch_indexed(self, page_index):
+        """
+        按页面索引并发抓取首页之外的页面
+
+        参数:
+            page_index: 从首页开始的页面列表，由Scraper.get_page_index返回
+        """
+        first_page, last_page = self.controller._page_range()
+        if last_page is not None and len(page_index) > last_page:
+            if self.config.get('preview', False):
+                self.controller.report_progress(f"预览模式：只抓取到第 {last_page} 页")
+            else:
+                self.controller.report_progress(f"只抓取到第 {last_page} 页")
+            page_index = page_index[:last_page]
+
+        # 页码按索引中的位置编号，与沿链接抓取时的编号一致；起始页之前的页面不抓取
+        tasks = queue.Queue()
+        for position, entry in enumerate(page_index[1:], start=2):
+            if position >= first_page:
+                tasks.put((position, entry['url']))
+
+        def worker():
+            while not self._stop_event.is_set():
+                try:
+                    page_number, url = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                html = self._fetch(page_number, url)
+                if html is not None:
+                    self.parse_queue.put((page_number, url, html, None))
+
+        workers = [self._start_thread(worker) for _ in range(self.fetch_jobs)]
+        for thread in workers:
+            thread.join()
+
+    def _fetch_chain(self, page):
+        """
+        沿"下一页"链接依次抓取页面
+
+        链式抓取时必须先解析当前页面才能得到下一页URL，因此页面在抓取阶段完成解析，
+        解析结果直接交给后续阶段，不会再次解析。
+
+        参数:
+            page: 首页的解析结果
+        """
+        report = self.controller.report_progress
+        first_page, last_page = self.controller._page_range()
+        page_number = 1
+
+        while True:
+            # 起始页之前的页面只用于查找下一页链接
+            if page_number >= first_page:
+                self.parse_queue.put((page_number, page.url, None, page))
+            else:
+                report(f"跳过第 {page_number} 页")
+
+            url = page.next_url
+            page_number += 1
+            if not url:
+                report("已到达最后一页")
+                break
+            if self._stop_event.is_set():
+                break
+
+            # 检查页码范围（--max-pages和预览模式）
+            if last_page is not None and page_number > last_page:
+                report(f"已抓取到第 {last_page} 页，停止抓取")
+                break
+
+            html = self._fetch(page_number, url)
+            if html is None:
+                break
+            page = self._parse(url, html)
+            if page is None:
+                break
+
+    def _parse_stage(self):
+        """解析阶段：解析页面HTML（已在抓取阶段解析的页面直接传递），并交给图片下载阶段或组织阶段"""
+        report = self.controller.report_progress
+        downstream = self.image_queue if self.controller.image_downloader else self.organize_queue
+
+        while True:
+            task = self.parse_queue.get()
+            if task is _STOP:
+                break
+            if self._stop_event.is_set():
+                continue
+
+            page_number, url, html, page = task
+            if page is None:
+                page = self._parse(url, html)
+                if page is None:
+                    continue
+
+            if not page.ok:
+                report(f"无法解析页面内容: {url}")
+                self._record_failure(url, '无法解析页面内容')
+                continue
+
+            content = page.to_dict(page_number)
+
+            if downstream is self.organize_queue:
+                downstream.put((content, 0, []))
+            else:
+                downstream.put(content)
+
+    def _image_stage(self):
+        """图片下载阶段：下载页面中的图片，并交给组织阶段"""
+        report = self.controller.report_progress
+
+        while True:
+            content = self.image_queue.get()
+            if content is _STOP:
+                break
+            if self._stop_event.is_set():
+                continue
+
+            try:
+                successful_downloads, failed_images = self.controller._download_page_images(content)
+            except Exception as e:
+                report(f"处理页面 {content['url']} 时出错: {str(e)}")
+                self._record_failure(content['url'], str(e))
+                continue
+
+            self.organize_queue.put((content, successful_downloads, failed_images))
+
+    def _organize_stage(self):
+        """组织阶段：在调用线程中将页面添加到内容组织器，并汇总统计信息"""
+        report = self.controller.report_progress
+        stats = self._stats
+
+        while True:
+            task = self.organize_queue.get()
+            if task is _STOP:
+                break
+
+            content, successful_downloads, failed_images = task
+            stats['images_processed'] += successful_downloads
+            stats['failed_images'].extend(failed_images)
+
+            self.controller.content_organizer.add_page_content(content)
+            stats['pages_processed'] += 1
+            report(f"已处理 {stats['pages_processed']} 个页面")
@@ -3,36 +3,113 @@
 """
 
 import os
-import time
+import re
 import hashlib
+import threading
 import requests
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from urllib.parse import urlparse
 from typing import Dict, List, Optional, Any
 
+from game_guide_scraper.utils.rate_limiter import RateLimiter, rate_from_delay
+from game_guide_scraper.utils.http import build_session, IMAGE_HEADERS, DEFAULT_POOL_MAXSIZE
+from game_guide_scraper.downloader.store import ImageStore
+from game_guide_scraper.downloader.imageinfo import image_size, image_size_from_bytes, HEADER_SIZE
+
+# Content-Range响应头格式，如"bytes 100-999/1000"
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes\s+(\d+)-\d+/(\d+|\*)$')
+
 class ImageDownloader:
     """
     图片下载器类，用于下载和保存图片文件。
     """
     
-    def __init__(self, output_dir, delay=0.5):
+    def __init__(self, output_dir, delay=0.5, rate_limiter=None, max_workers=1, host_limit=None, session=None,
+                 store=None, manifest=None, source_selector=None):
         """
         初始化图片下载器
         
         参数:
             output_dir: 图片保存目录
-            delay: 下载间隔时间（秒）
+            delay: 没有配置主机限速规则时的下载间隔时间（秒）
+            rate_limiter: 共享的限速器（RateLimiter对象），为None时创建一个只使用delay的限速器
+            max_workers: 批量下载时的默认并发线程数，为1时逐张下载
+            host_limit: 每个图片主机同时进行的最大下载数（在所有批量下载之间共享），为None时等于max_workers
+            session: 共享的requests会话（见utils.http.build_session），为None时创建一个连接池足够大的新会话
+            store: 内容寻址的图片库（ImageStore对象），为None时图片直接保存在output_dir中
+            manifest: 图片清单（ImageManifest对象），用于判断图片是否已下载和重新验证，
+                      为None时通过检查文件是否存在来判断
+            source_selector: 图片来源选择器（ImageSourceSelector对象），用于在缩略图和原图之间选择下载地址，
+                             为None时总是下载图片信息中的url
         """
         self.output_dir = output_dir
         self.delay = delay
-        self.last_download_time = 0
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_workers = max(1, int(max_workers or 1))
+        self.host_limit = max(1, int(host_limit or self.max_workers))
+        self._host_semaphores = {}
+        self._host_lock = threading.Lock()
+        self._in_flight = {}  # 本地路径 -> 正在进行的下载（Future对象）
+        self._in_flight_lock = threading.Lock()
+        self.session = session or build_session(pool_maxsize=max(self.host_limit, DEFAULT_POOL_MAXSIZE))
+        self.store = store
+        self.manifest = manifest
+        self.source_selector = source_selector
         
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
     
+    @staticmethod
+    def image_filename(url):
+        """
+        根据URL生成图片文件名（URL的md5加上原扩展名，默认为.jpg）
+        
+        参数:
+            url: 图片URL
+        """
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        ext = os.path.splitext(urlparse(url).path)[1] or '.jpg'
+        return f"{url_hash}{ext}"
+    
+    def _has_image(self, url, local_path):
+        """
+        判断图片是否已经下载
+        
+        有图片清单时先查询清单，清单中有记录时只检查文件是否仍然存在（图片目录可能被清空，
+        而清单文件还在）；清单中没有记录时检查文件，已存在的文件（如旧版本下载的图片）会被补充到清单中。
+        
+        参数:
+            url: 图片URL
+            local_path: 图片的本地路径
+        """
+        if self.manifest is None:
+            return os.path.exists(local_path)
+        
+        entry = self.manifest.get(url)
+        if entry is not None:
+            return entry['path'] == os.path.basename(local_path) and os.path.exists(local_path)
+        
+        if not os.path.exists(local_path):
+            return False
+        width, height = image_size(local_path) or (None, None)
+        self.manifest.record(
+            url,
+            os.path.basename(local_path),
+            size=os.path.getsize(local_path),
+            width=width,
+            height=height,
+            fetched_at=os.path.getmtime(local_path)
+        )
+        return True
+    
     def download_image(self, url, filename=None, skip_existing=True):
         """
         下载图片并保存到本地
         
+        同一本地路径同时只有一个线程下载（流水线模式下不同页面的批量下载可能包含相同的图片），
+        其他线程等待并返回该次下载的结果，避免多个线程同时写同一个.part文件。
+        
         参数:
             url: 图片URL
             filename: 保存的文件名，如果为None则自动生成
@@ -41,38 +118,111 @@ class ImageDownloader:
         返回:
             保存后的本地文件路径，如果下载失败则返回None
         """
+        # 如果没有提供文件名，从URL生成一个（使用URL的哈希值作为文件名）
+        if not filename:
+            filename = self.image_filename(url)
+        local_path = os.path.join(self.output_dir, filename)
+        
+        with self._in_flight_lock:
+            future = self._in_flight.get(local_path)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[local_path] = future
+        if not owner:
+            return future.result()
+        
+        result = None
         try:
-            # 如果没有提供文件名，从URL生成一个
-            if not filename:
-                # 使用URL的哈希值作为文件名
-                url_hash = hashlib.md5(url.encode()).hexdigest()
-                parsed_url = urlparse(url)
-                path = parsed_url.path
-                ext = os.path.splitext(path)[1] or '.jpg'  # 默认为.jpg
-                filename = f"{url_hash}{ext}"
-            
-            local_path = os.path.join(self.output_dir, filename)
+            result = self._download_image(url, filename, local_path, skip_existing)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[local_path]
+            future.set_result(result)
+        return result
+        
+    def _download_image(self, url, filename, local_path, skip_existing):
+        """
+        下载图片并保存到本地（由download_image调用，同一本地路径不会并发执行）
+        
+        参数:
+            url: 图片URL
+            filename: 保存的文件名
+            local_path: 图片的本地路径
+            skip_existing: 是否跳过已存在的文件
             
+        返回:
+            保存后的本地文件路径，如果下载失败则返回None
+        """
+        try:
             # 检查文件是否已存在
-            if skip_existing and os.path.exists(local_path):
+            if skip_existing and self._has_image(url, local_path):
                 print(f"图片已存在，跳过下载: {local_path}")
                 return local_path
             
-            # 实现下载延迟
-            current_time = time.time()
-            sleep_time = max(0, self.delay - (current_time - self.last_download_time))
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+            # 图片库中已有该URL的图片，直接链接，无需下载
+            if self.store is not None:
+                object_path = self.store.lookup(url)
+                if object_path:
+                    self.store.link(object_path, local_path)
+                    if self.manifest is not None:
+                        width, height = image_size(object_path) or (None, None)
+                        self.manifest.record(
+                            url,
+                            filename,
+                            size=os.path.getsize(object_path),
+                            hash=os.path.basename(object_path)[:64],
+                            width=width,
+                            height=height
+                        )
+                    return local_path
             
-            # 下载图片
-            response = requests.get(url, stream=True, timeout=10)
-            response.raise_for_status()
+            # 按图片主机限速
+            self.rate_limiter.acquire(url, rate=rate_from_delay(self.delay))
             
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            # 强制重新下载时，用清单中的ETag/Last-Modified发送条件请求
+            entry = self.manifest.get(url) if self.manifest is not None else None
+            validators = {}
+            if entry and entry['path'] == filename and os.path.exists(local_path):
+                if entry['etag']:
+                    validators['If-None-Match'] = entry['etag']
+                if entry['last_modified']:
+                    validators['If-Modified-Since'] = entry['last_modified']
+            
+            # 先下载到.part文件，完整后再原子替换，中断时保留已下载的部分以便续传
+            part_path = f"{local_path}.part"
+            info = self._fetch_to_part(url, part_path, validators)
+            if info is None:
+                return None
+            if info['not_modified']:
+                self.manifest.touch(url)
+                return local_path
+            
+            width, height = (image_size(part_path) or (None, None)) if self.manifest is not None else (None, None)
+            digest = None
+            if self.store is not None:
+                # 按内容哈希存入图片库，再链接回图片目录
+                object_path = self.store.add(url, part_path, ext=os.path.splitext(local_path)[1] or '.jpg')
+                self.store.link(object_path, local_path)
+                digest = os.path.basename(object_path)[:64]
+            else:
+                if self.manifest is not None:
+                    digest = ImageStore.hash_file(part_path)
+                # 原子替换不会改写已存在的文件（可能是其他攻略共享的硬链接）
+                os.replace(part_path, local_path)
+            
+            if self.manifest is not None:
+                self.manifest.record(
+                    url,
+                    filename,
+                    size=info['size'],
+                    hash=digest,
+                    etag=info['etag'],
+                    last_modified=info['last_modified'],
+                    width=width,
+                    height=height
+                )
             
-            self.last_download_time = time.time()
             return local_path
         
         except requests.exceptions.RequestException as e:
@@ -85,57 +235,263 @@ class ImageDownloader:
             print(f"Unexpected error when downloading image {url}: {e}")
             return None
             
-    def download_all_images(self, image_list: List[Dict[str, Any]], skip_existing=True) -> Dict[str, str]:
+    def _fetch_to_part(self, url, part_path, validators=None):
+        """
+        将图片下载到.part文件，已有部分内容时通过Range请求续传
+        
+        参数:
+            url: 图片URL
+            part_path: .part文件路径
+            validators: 条件请求头（If-None-Match/If-Modified-Since），续传时不使用
+            
+        返回:
+            下载完整且大小与Content-Length一致时返回包含not_modified、size、etag和last_modified的字典；
+            服务器返回304时not_modified为True；下载失败或不完整时返回None（.part文件保留以便下次续传）
+        """
+        for _ in range(2):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if offset:
+                headers = dict(IMAGE_HEADERS, Range=f"bytes={offset}-")
+            elif validators:
+                headers = dict(IMAGE_HEADERS, **validators)
+            else:
+                headers = IMAGE_HEADERS
+            
+            # 下载图片（复用会话中的keep-alive连接）
+            response = self.session.get(url, stream=True, timeout=10, headers=headers)
+            try:
+                if not offset and validators and response.status_code == 304:
+                    return {'not_modified': True, 'size': None, 'etag': None, 'last_modified': None}
+                if offset and response.status_code == 416:
+                    # 续传位置无效（服务器上的图片可能已变化），丢弃已下载的部分后重新下载
+                    os.remove(part_path)
+                    continue
+                response.raise_for_status()
+                
+                expected_size = self._parse_length(response.headers.get('Content-Length'))
+                resumed = bool(offset) and response.status_code == 206
+                if resumed:
+                    start, total = self._parse_content_range(response.headers.get('Content-Range'))
+                    if start != offset:
+                        # 服务器返回的范围与请求不一致，重新下载
+                        os.remove(part_path)
+                        continue
+                    expected_size = total if total is not None else (
+                        offset + expected_size if expected_size is not None else None)
+                
+                # 服务器不支持Range时返回完整内容（200），从头写入
+                with open(part_path, 'ab' if resumed else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        f.write(chunk)
+                
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+            finally:
+                # 确保连接归还连接池
+                response.close()
+            
+            actual_size = os.path.getsize(part_path)
+            if expected_size is not None and actual_size != expected_size:
+                print(f"图片下载不完整: {url}（{actual_size}/{expected_size} 字节），下次运行时续传")
+                return None
+            return {
+                'not_modified': False,
+                'size': actual_size,
+                'etag': etag if isinstance(etag, str) else None,
+                'last_modified': last_modified if isinstance(last_modified, str) else None
+            }
+        return None
+    
+    def probe_image(self, url, head=False):
+        """
+        探测图片的大小和尺寸，不下载整张图片
+        
+        参数:
+            url: 图片URL
+            head: 为True时只发送HEAD请求获取大小，否则用Range请求读取文件头，同时解析宽高
+            
+        返回:
+            包含size（总字节数）和dimensions（宽, 高）的字典，无法获取的项不出现，请求失败时返回空字典
+        """
+        self.rate_limiter.acquire(url, rate=rate_from_delay(self.delay))
+        try:
+            if head:
+                response = self.session.head(url, timeout=10, headers=IMAGE_HEADERS, allow_redirects=True)
+            else:
+                headers = {**IMAGE_HEADERS, 'Range': f'bytes=0-{HEADER_SIZE - 1}'}
+                response = self.session.get(url, timeout=10, headers=headers, stream=True)
+        except requests.exceptions.RequestException as e:
+            print(f"探测图片失败: {url}, 错误: {e}")
+            return {}
+        
+        try:
+            if response.status_code not in (200, 206):
+                return {}
+            info = {}
+            if response.status_code == 206:
+                size = self._parse_content_range(response.headers.get('Content-Range'))[1]
+            else:
+                size = self._parse_length(response.headers.get('Content-Length'))
+            if size is not None:
+                info['size'] = size
+            if not head:
+                data = b''
+                for chunk in response.iter_content(chunk_size=8192):
+                    data += chunk
+                    if len(data) >= HEADER_SIZE:
+                        break
+                dimensions = image_size_from_bytes(data)
+                if dimensions:
+                    info['dimensions'] = dimensions
+            return info
+        finally:
+            response.close()
+    
+    def _select_source(self, image_info, skip_existing):
+        """
+        选择图片的下载地址（没有来源选择器时为图片信息中的url）
+        
+        参数:
+            image_info: 图片信息字典
+            skip_existing: 是否跳过已存在的文件，为True时已在本地的原图或缩略图优先
+        """
+        if self.source_selector is None:
+            return image_info['url']
+        is_local = None
+        if skip_existing:
+            is_local = lambda url: self._has_image(url, os.path.join(self.output_dir, self.image_filename(url)))
+        return self.source_selector.select(image_info, self.probe_image, is_local)
+    
+    @staticmethod
+    def _parse_length(value):
+        """解析Content-Length，无法解析时返回None"""
+        try:
+            return int(value) if isinstance(value, (str, int)) else None
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _parse_content_range(value):
+        """
+        解析Content-Range（如"bytes 100-999/1000"）
+        
+        返回:
+            (起始位置, 总大小)，无法解析的部分为None
+        """
+        match = CONTENT_RANGE_PATTERN.match(value) if isinstance(value, str) else None
+        if not match:
+            return None, None
+        total = match.group(2)
+        return int(match.group(1)), int(total) if total != '*' else None
+    
+    def _host_semaphore(self, url):
+        """
+        返回图片所在主机的并发信号量，不存在时创建
+        
+        参数:
+            url: 图片URL
+        """
+        host = (urlparse(url).hostname or '').lower()
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.host_limit)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+    
+    def _download_with_host_limit(self, url, skip_existing):
+        """
+        在主机并发上限内下载图片
+        
+        参数:
+            url: 图片URL
+            skip_existing: 是否跳过已存在的文件
+        """
+        with self._host_semaphore(url):
+            return self.download_image(url, skip_existing=skip_existing)
+            
+    def download_all_images(self, image_list: List[Dict[str, Any]], skip_existing=True,
+                            max_workers: Optional[int] = None) -> Dict[str, str]:
         """
         批量下载图片
         
         参数:
-            image_list: 图片信息列表，每个元素应该是一个字典，至少包含'url'键
+            image_list: 图片信息列表，每个元素应该是一个字典，至少包含'url'键；
+                        下载地址与url不同（如选择了缩略图）时，图片信息中会记录source_url
             skip_existing: 是否跳过已存在的文件
+            max_workers: 并发下载的线程数，为None时使用初始化时的max_workers，为1时逐张下载
             
         返回:
-            图片URL到本地路径的映射字典，如果某张图片下载失败，则不会出现在结果中
+            图片URL到本地路径的映射字典（按image_list中的顺序），如果某张图片下载失败，则不会出现在结果中
         """
         result = {}
         total_images = len(image_list)
         downloaded_count = 0
         skipped_count = 0
         failed_count = 0
+        max_workers = max(1, int(max_workers or self.max_workers))
         
         print(f"开始处理 {total_images} 张图片...")
         
+        # 第一遍：检查图片信息，跳过已存在的文件，收集需要下载的URL
+        local_paths = {}  # 序号 -> 本地路径
+        sources = {}  # 序号 -> 下载地址
+        pending = {}  # 下载地址 -> 第一次出现时的序号
         for i, image_info in enumerate(image_list):
             # 检查图片信息是否有效
-            if not isinstance(image_info, dict) or 'url' not in image_info:
+            if not isinstance(image_info, Mapping) or 'url' not in image_info:
                 print(f"跳过无效的图片信息: {image_info}")
                 failed_count += 1
                 continue
                 
-            url = image_info['url']
+            url = self._select_source(image_info, skip_existing)
+            sources[i] = url
             
-            # 检查文件是否已存在（提前检查以优化输出）
-            url_hash = hashlib.md5(url.encode()).hexdigest()
-            parsed_url = urlparse(url)
-            path = parsed_url.path
-            ext = os.path.splitext(path)[1] or '.jpg'
-            filename = f"{url_hash}{ext}"
-            local_path = os.path.join(self.output_dir, filename)
+            # 检查图片是否已下载（提前检查以优化输出）
+            local_path = os.path.join(self.output_dir, self.image_filename(url))
             
-            if skip_existing and os.path.exists(local_path):
+            if skip_existing and (url in pending or self._has_image(url, local_path)):
+                # 列表中重复的URL与第一次出现时的下载结果相同
                 print(f"图片 {i+1}/{total_images}: 已存在，跳过下载")
-                result[url] = local_path
-                image_info['local_path'] = local_path
-                skipped_count += 1
+                local_paths[i] = local_path if url not in pending else None
                 continue
             
             print(f"下载图片 {i+1}/{total_images}: {url}")
+            pending.setdefault(url, i)
+            
+        # 第二遍：下载图片（逐张或并发），同一URL只下载一次
+        downloaded = {}
+        if max_workers == 1 or len(pending) <= 1:
+            for url in pending:
+                downloaded[url] = self.download_image(url, skip_existing=skip_existing)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as executor:
+                futures = {url: executor.submit(self._download_with_host_limit, url, skip_existing) for url in pending}
+                for url, future in futures.items():
+                    downloaded[url] = future.result()
+                    
+        # 第三遍：按列表顺序更新映射、图片信息和计数
+        for i, image_info in enumerate(image_list):
+            if i not in sources:
+                continue
+            url = sources[i]
+            if url != image_info['url']:
+                image_info['source_url'] = url
             
-            # 下载图片
-            downloaded_path = self.download_image(url, skip_existing=skip_existing)
+            if i in local_paths:
+                local_path = local_paths[i] or downloaded.get(url)
+                if local_path:
+                    result[image_info['url']] = local_path
+                    image_info['local_path'] = local_path
+                    skipped_count += 1
+                else:
+                    failed_count += 1
+                continue
             
             # 如果下载成功，更新映射和图片信息
+            downloaded_path = downloaded.get(url)
             if downloaded_path:
-                result[url] = downloaded_path
+                result[image_info['url']] = downloaded_path
                 image_info['local_path'] = downloaded_path
                 print(f"图片已保存到: {downloaded_path}")
                 downloaded_count += 1
@@ -143,5 +499,10 @@ class ImageDownloader:
                 print(f"图片下载失败: {url}")
                 failed_count += 1
                 
+        if self.store is not None:
+            self.store.save()
+        if self.manifest is not None:
+            self.manifest.flush()
+                
         print(f"图片处理完成。总计: {total_images}, 新下载: {downloaded_count}, 跳过: {skipped_count}, 失败: {failed_count}")
-        return result
\ No newline at end of file
+        return result
@@ -0,0 +1,99 @@
+"""
+图片信息模块，只读取文件头解析常见图片格式的宽高，不依赖第三方库。
+"""
+import struct
+from typing import Optional, Tuple
+
+# 读取的文件头长度，JPEG的SOF标记可能位于较大的EXIF数据之后
+HEADER_SIZE = 64 * 1024
+
+# JPEG中携带图片尺寸的SOF标记（排除DHT、JPG、DAC）
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(path: str) -> Optional[Tuple[int, int]]:
+    """
+    读取图片文件的宽高
+
+    参数:
+        path: 图片文件路径
+
+    返回:
+        (宽, 高)，格式不支持或文件损坏时返回None
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(HEADER_SIZE)
+    except OSError:
+        return None
+    return image_size_from_bytes(data)
+
+
+def image_size_from_bytes(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    从文件头解析图片的宽高，支持PNG、GIF、JPEG、WebP和BMP
+
+    参数:
+        data: 图片文件开头的字节
+
+    返回:
+        (宽, 高)，格式不支持或数据不完整时返回None
+    """
+    try:
+        if data.startswith(b'\x89PNG\r\n\x1a\n') and data[12:16] == b'IHDR':
+            return struct.unpack('>II', data[16:24])
+
+        if data[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', data[6:10])
+
+        if data.startswith(b'\xff\xd8'):
+            return _jpeg_size(data)
+
+        if data.startswith(b'RIFF') and data[8:12] == b'WEBP':
+            return _webp_size(data)
+
+        if data.startswith(b'BM'):
+            width, height = struct.unpack('<ii', data[18:26])
+            return width, abs(height)
+    except struct.error:
+        return None
+    return None
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """逐个跳过JPEG段，直到找到SOF段"""
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # 填充字节
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # 没有长度字段的标记
+            offset += 2
+            continue
+        length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        offset += 2 + length
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """解析WebP的VP8、VP8L和VP8X三种格式"""
+    chunk = data[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        bits = struct.unpack('<I', data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return width, height
+    return None
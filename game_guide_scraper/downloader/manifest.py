@@ -0,0 +1,149 @@
+"""
+图片清单模块，用SQLite记录已下载图片的路径、内容哈希、大小、ETag、尺寸和下载时间。
+"""
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, Any
+
+# 清单中记录的字段
+MANIFEST_FIELDS = ('url', 'path', 'hash', 'size', 'etag', 'last_modified', 'width', 'height', 'fetched_at')
+
+
+class ImageManifest:
+    """
+    图片清单
+
+    启动时一次性将全部记录读入内存，之后的查询不再访问数据库和文件系统；
+    新增和更新的记录先缓存在内存中，调用flush时在一个事务中批量写入。
+
+    属性:
+        db_path: SQLite数据库文件路径
+    """
+
+    def __init__(self, db_path: str):
+        """
+        打开（或创建）图片清单并读取全部记录
+
+        参数:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS images ('
+            'url TEXT PRIMARY KEY, path TEXT NOT NULL, hash TEXT, size INTEGER, etag TEXT, '
+            'last_modified TEXT, width INTEGER, height INTEGER, fetched_at REAL)'
+        )
+        self._connection.commit()
+
+        cursor = self._connection.execute(f"SELECT {', '.join(MANIFEST_FIELDS)} FROM images")
+        self._entries = {row[0]: dict(zip(MANIFEST_FIELDS, row)) for row in cursor}
+        self._pending = {}
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查询图片记录
+
+        参数:
+            url: 图片URL
+
+        返回:
+            记录字典（字段见MANIFEST_FIELDS），没有记录时返回None
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            return dict(entry) if entry else None
+
+    def record(self, url: str, path: str, size: Optional[int] = None, hash: Optional[str] = None,
+               etag: Optional[str] = None, last_modified: Optional[str] = None,
+               width: Optional[int] = None, height: Optional[int] = None,
+               fetched_at: Optional[float] = None) -> None:
+        """
+        新增或更新图片记录（调用flush后写入数据库）
+
+        参数:
+            url: 图片URL
+            path: 图片文件名（相对于图片目录）
+            size: 文件大小（字节）
+            hash: 内容的sha256
+            etag: 服务器返回的ETag
+            last_modified: 服务器返回的Last-Modified
+            width: 图片宽度
+            height: 图片高度
+            fetched_at: 下载（或最近一次重新验证）的时间戳，为None时使用当前时间
+        """
+        entry = {
+            'url': url,
+            'path': path,
+            'hash': hash,
+            'size': size,
+            'etag': etag,
+            'last_modified': last_modified,
+            'width': width,
+            'height': height,
+            'fetched_at': fetched_at if fetched_at is not None else time.time()
+        }
+        with self._lock:
+            self._entries[url] = entry
+            self._pending[url] = entry
+
+    def touch(self, url: str) -> None:
+        """
+        重新验证成功（服务器返回304）后更新记录的时间
+
+        参数:
+            url: 图片URL
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry:
+                entry['fetched_at'] = time.time()
+                self._pending[url] = entry
+
+    def remove(self, url: str) -> None:
+        """
+        删除图片记录（立即写入数据库）
+
+        参数:
+            url: 图片URL
+        """
+        with self._lock:
+            self._entries.pop(url, None)
+            self._pending.pop(url, None)
+            with self._connection:
+                self._connection.execute('DELETE FROM images WHERE url = ?', (url,))
+
+    def flush(self) -> int:
+        """
+        在一个事务中批量写入缓存的记录
+
+        返回:
+            写入的记录数
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            rows = [tuple(entry[field] for field in MANIFEST_FIELDS) for entry in self._pending.values()]
+            placeholders = ', '.join('?' for _ in MANIFEST_FIELDS)
+            with self._connection:
+                self._connection.executemany(
+                    f"INSERT OR REPLACE INTO images ({', '.join(MANIFEST_FIELDS)}) VALUES ({placeholders})",
+                    rows
+                )
+            self._pending.clear()
+            return len(rows)
+
+    def close(self) -> None:
+        """写入缓存的记录并关闭数据库"""
+        self.flush()
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,124 @@
+"""
+图片来源选择模块，根据图片质量等级和流量预算在游民星空的缩略图和高清原图之间选择下载地址。
+"""
+from typing import Any, Callable, Dict, Optional
+
+# 优先下载缩略图的图片质量等级（缩略图宽度通常在550像素左右，转码后也不会超过这些等级的尺寸上限太多）
+THUMBNAIL_QUALITIES = ('medium', 'low')
+
+# 缩略图的最长边小于该值时改为下载原图
+DEFAULT_MIN_DIMENSION = 480
+
+
+class ImageSourceSelector:
+    """
+    图片来源选择器
+
+    解析器为游民星空的图片同时记录原图地址（url）和缩略图地址（thumbnail_url）。选择规则：
+    - 没有缩略图地址的图片下载url；
+    - 图片质量为original或high时下载原图，为medium或low时下载缩略图；
+    - 缩略图的最长边小于min_dimension时改为下载原图（用Range请求读取文件头得到尺寸）；
+    - 设置了流量预算时，用HEAD请求得到原图大小，超出剩余预算的原图改为下载缩略图。
+    预算只影响选择哪个地址，不会放弃下载图片；已在本地的原图或缩略图直接使用，不发送探测请求。
+
+    属性:
+        quality: 图片质量等级
+        min_dimension: 缩略图最长边的下限（像素）
+        byte_budget: 流量预算（字节），为None时不限制
+        spent: 已计入预算的字节数
+        thumbnails: 选择缩略图的次数
+        originals: 选择原图的次数
+        upgraded: 因缩略图太小而改为原图的次数
+        budget_limited: 因超出预算而改为缩略图的次数
+    """
+
+    def __init__(self, quality: str = 'original', min_dimension: int = DEFAULT_MIN_DIMENSION,
+                 byte_budget: Optional[int] = None):
+        """
+        初始化图片来源选择器
+
+        参数:
+            quality: 图片质量等级（original、high、medium、low）
+            min_dimension: 缩略图最长边的下限（像素），为0时不检查缩略图尺寸
+            byte_budget: 流量预算（字节），为None时不限制
+        """
+        self.quality = quality
+        self.min_dimension = min_dimension or 0
+        self.byte_budget = byte_budget
+
+        self.spent = 0
+        self.thumbnails = 0
+        self.originals = 0
+        self.upgraded = 0
+        self.budget_limited = 0
+
+    @property
+    def prefer_thumbnail(self) -> bool:
+        """当前图片质量等级是否优先下载缩略图"""
+        return self.quality in THUMBNAIL_QUALITIES
+
+    def select(self, image_info: Dict[str, Any], probe: Callable[..., Dict[str, Any]],
+               is_local: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        选择图片的下载地址
+
+        参数:
+            image_info: 图片信息字典，包含url，可能包含thumbnail_url
+            probe: 探测函数probe(url, head=False)，返回包含size（总字节数）和dimensions（宽, 高）的字典，
+                   探测失败时返回空字典；head为True时只需要size
+            is_local: 判断地址对应的图片是否已在本地的函数，为None时不检查
+
+        返回:
+            下载地址
+        """
+        original = image_info['url']
+        thumbnail = image_info.get('thumbnail_url')
+        if not thumbnail or thumbnail == original:
+            return original
+
+        if is_local is not None:
+            if is_local(original):
+                return original
+            if self.prefer_thumbnail and is_local(thumbnail):
+                self.thumbnails += 1
+                return thumbnail
+
+        want_original = not self.prefer_thumbnail
+        thumbnail_size = None
+        if not want_original:
+            info = probe(thumbnail)
+            thumbnail_size = info.get('size')
+            dimensions = info.get('dimensions')
+            if dimensions and max(dimensions) < self.min_dimension:
+                want_original = True
+                self.upgraded += 1
+
+        if want_original:
+            original_size = None
+            if self.byte_budget is not None:
+                original_size = probe(original, head=True).get('size')
+            if original_size is None or self.spent + original_size <= self.byte_budget:
+                self.spent += original_size or 0
+                self.originals += 1
+                return original
+            self.budget_limited += 1
+
+        self.spent += thumbnail_size or 0
+        self.thumbnails += 1
+        return thumbnail
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回来源选择的统计信息
+
+        返回:
+            包含thumbnails、originals、upgraded、budget_limited、spent和byte_budget的字典
+        """
+        return {
+            'thumbnails': self.thumbnails,
+            'originals': self.originals,
+            'upgraded': self.upgraded,
+            'budget_limited': self.budget_limited,
+            'spent': self.spent,
+            'byte_budget': self.byte_budget
+        }
@@ -0,0 +1,212 @@
+"""
+图片库模块，按内容哈希保存图片，多个攻略的图片目录通过链接共享同一份文件。
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+from typing import Dict, Optional, Any
+
+
+class ImageStore:
+    """
+    内容寻址的图片库
+
+    图片按内容的sha256保存为objects/<前两位>/<sha256><扩展名>，相同内容只保存一份；
+    index.json记录URL到内容哈希的映射，已知的URL无需再次下载。
+    各攻略的images目录中的文件是指向图片库的硬链接，不能建立硬链接时（如跨文件系统）
+    依次退回为相对路径的符号链接和复制。
+
+    属性:
+        root: 图片库根目录
+        url_hits: 通过URL索引直接得到图片（无需下载）的次数
+        dedup_hits: 下载的图片内容已在图片库中的次数
+        links: 各种链接方式（hardlink、symlink、copy）的使用次数
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, root: str):
+        """
+        初始化图片库，读取URL索引
+
+        参数:
+            root: 图片库根目录，可在多个输出目录之间共享
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+        self.url_hits = 0
+        self.dedup_hits = 0
+        self.links = {'hardlink': 0, 'symlink': 0, 'copy': 0}
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        # URL -> 图片库中的相对路径（objects/ab/<sha256>.jpg）
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, str]:
+        """读取URL索引，文件不存在或损坏时返回空索引"""
+        path = os.path.join(self.root, self.INDEX_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"读取图片库索引失败，将重新建立: {e}")
+            return {}
+
+    def save(self) -> None:
+        """将URL索引写入磁盘（没有变化时不写入）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            # 合并其他进程（如同时构建的其他攻略）写入的条目
+            merged = self._load_index()
+            merged.update(self._index)
+            self._index = merged
+            data = json.dumps(self._index, ensure_ascii=False, indent=0)
+            self._dirty = False
+
+        # 先写临时文件再替换，多个进程同时写入时也不会得到不完整的索引
+        path = os.path.join(self.root, self.INDEX_FILE)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"保存图片库索引失败: {e}")
+
+    def lookup(self, url: str) -> Optional[str]:
+        """
+        查找URL对应的图片
+
+        参数:
+            url: 图片URL
+
+        返回:
+            图片库中文件的路径，URL未知或文件已丢失时返回None
+        """
+        with self._lock:
+            relative = self._index.get(url)
+        if not relative:
+            return None
+        object_path = os.path.join(self.root, relative)
+        if not os.path.exists(object_path):
+            return None
+        with self._lock:
+            self.url_hits += 1
+        return object_path
+
+    def add(self, url: str, path: str, ext: str = '.jpg') -> str:
+        """
+        将下载好的文件加入图片库，并记录URL索引
+
+        文件会被移动到图片库中（内容已存在时直接删除），调用者需要再通过link放回目标位置。
+
+        参数:
+            url: 图片URL
+            path: 下载好的文件路径
+            ext: 保存到图片库时使用的扩展名
+
+        返回:
+            图片库中文件的路径
+        """
+        digest = self.hash_file(path)
+        relative = os.path.join('objects', digest[:2], f"{digest}{ext}")
+
+        with self._lock:
+            # 相同内容可能以不同扩展名保存过
+            existing = self._find_object(digest)
+            if existing:
+                relative = existing
+                self.dedup_hits += 1
+                os.remove(path)
+            else:
+                object_path = os.path.join(self.root, relative)
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                shutil.move(path, object_path)
+            if self._index.get(url) != relative:
+                self._index[url] = relative
+                self._dirty = True
+        return os.path.join(self.root, relative)
+
+    def _find_object(self, digest: str) -> Optional[str]:
+        """查找内容哈希对应的已有文件，返回相对路径"""
+        bucket = os.path.join(self.objects_dir, digest[:2])
+        try:
+            names = os.listdir(bucket)
+        except FileNotFoundError:
+            return None
+        for name in names:
+            if name.startswith(digest):
+                return os.path.join('objects', digest[:2], name)
+        return None
+
+    def link(self, object_path: str, dest_path: str) -> str:
+        """
+        在目标位置建立指向图片库文件的链接
+
+        参数:
+            object_path: 图片库中文件的路径
+            dest_path: 目标路径（如攻略的images目录中的文件），已存在时被替换
+
+        返回:
+            使用的链接方式：'hardlink'、'symlink'或'copy'
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+        tmp_path = f"{dest_path}.{threading.get_ident()}.link"
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+        try:
+            os.link(object_path, tmp_path)
+            method = 'hardlink'
+        except OSError:
+            try:
+                target = os.path.relpath(os.path.abspath(object_path), os.path.dirname(os.path.abspath(dest_path)))
+                os.symlink(target, tmp_path)
+                method = 'symlink'
+            except OSError:
+                shutil.copy2(object_path, tmp_path)
+                method = 'copy'
+
+        # 原子替换，已存在的目标文件（可能是另一个硬链接）不会被改写
+        os.replace(tmp_path, dest_path)
+        with self._lock:
+            self.links[method] += 1
+        return method
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """
+        计算文件内容的sha256
+
+        参数:
+            path: 文件路径
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回图片库的统计信息
+
+        返回:
+            包含urls、url_hits、dedup_hits和links的字典
+        """
+        with self._lock:
+            return {
+                'urls': len(self._index),
+                'url_hits': self.url_hits,
+                'dedup_hits': self.dedup_hits,
+                'links': dict(self.links)
+            }
@@ -0,0 +1,226 @@
+"""
+图片转码模块，按图片质量等级在进程池中缩放和重新压缩已下载的图片（需要安装Pillow）。
+"""
+import os
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
+
+# 图片质量等级 -> 最大边长（像素）和压缩质量
+QUALITY_TIERS = {
+    'high': {'max_dimension': 1920, 'quality': 85},
+    'medium': {'max_dimension': 1280, 'quality': 75},
+    'low': {'max_dimension': 800, 'quality': 60},
+}
+
+# 不转码的质量等级
+ORIGINAL_QUALITY = 'original'
+
+
+def pillow_available() -> bool:
+    """检查是否安装了Pillow"""
+    return importlib.util.find_spec('PIL') is not None
+
+
+def transcode_file(source: str, dest: str, max_dimension: int, quality: int,
+                   webp: bool = False) -> Optional[Tuple[int, int]]:
+    """
+    缩放并重新压缩单张图片（在工作进程中执行）
+
+    参数:
+        source: 原图路径
+        dest: 转码后的图片路径
+        max_dimension: 最大边长，超过时按比例缩小
+        quality: 压缩质量（1-100）
+        webp: 是否输出WebP格式，否则透明图片输出PNG，其他输出JPEG
+
+    返回:
+        (原图字节数, 转码后字节数)；动图、无法识别的图片或转码后没有变小时返回None，并删除转码结果
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        if getattr(image, 'is_animated', False):
+            return None
+        image.thumbnail((max_dimension, max_dimension))
+
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        tmp_path = f"{dest}.tmp"
+        if webp:
+            image.save(tmp_path, 'WEBP', quality=quality, method=4)
+        elif has_alpha:
+            image.save(tmp_path, 'PNG', optimize=True)
+        else:
+            image.convert('RGB').save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+
+    source_size = os.path.getsize(source)
+    dest_size = os.path.getsize(tmp_path)
+    if dest_size >= source_size:
+        os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, dest)
+    return source_size, dest_size
+
+
+class ImageTranscoder:
+    """
+    图片转码器
+
+    将已下载的图片按质量等级转码为同目录下的<原文件名>_<质量>.<扩展名>，并把图片项的local_path
+    指向转码结果，生成的Markdown因此引用转码后的图片。原图保留，已存在且不旧于原图的转码结果直接复用。
+    动图或转码后没有变小的图片在同目录下留下隐藏的标记文件，再次运行时不旧于原图的标记表示直接保留原图。
+
+    属性:
+        quality: 图片质量等级（original、high、medium、low）
+        webp: 是否输出WebP格式
+        workers: 进程池大小，为None时使用CPU核数
+        transcoded: 本次转码的图片数
+        reused: 复用已有转码结果的图片数
+        kept: 保留原图（动图、转码后没有变小或转码失败）的图片数
+        bytes_before: 参与转码的原图总字节数
+        bytes_after: 转码后（包括保留原图的）总字节数
+    """
+
+    def __init__(self, quality: str = ORIGINAL_QUALITY, webp: bool = False, workers: Optional[int] = None):
+        """
+        初始化图片转码器
+
+        参数:
+            quality: 图片质量等级，为original时不转码
+            webp: 是否输出WebP格式
+            workers: 进程池大小，为None时使用CPU核数
+        """
+        if quality != ORIGINAL_QUALITY and quality not in QUALITY_TIERS:
+            raise ValueError(f"未知的图片质量等级: {quality}")
+        self.quality = quality
+        self.webp = webp
+        self.workers = workers
+
+        self.transcoded = 0
+        self.reused = 0
+        self.kept = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def variant_path(self, local_path: str) -> str:
+        """
+        返回图片转码结果的路径
+
+        参数:
+            local_path: 原图路径
+        """
+        stem, ext = os.path.splitext(local_path)
+        if self.webp:
+            ext = '.webp'
+        elif ext.lower() not in ('.png', '.jpg', '.jpeg'):
+            ext = '.jpg'
+        return f"{stem}_{self.quality}{ext}"
+
+    def kept_marker_path(self, local_path: str) -> str:
+        """
+        返回记录该图片保留原图（不转码）的标记文件路径
+
+        参数:
+            local_path: 原图路径
+        """
+        directory, name = os.path.split(self.variant_path(local_path))
+        return os.path.join(directory, f".{name}.kept")
+
+    def transcode(self, image_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        并行转码图片，成功后更新图片项的local_path
+
+        参数:
+            image_items: 图片项列表，只处理带有local_path的项，同一文件只转码一次
+
+        返回:
+            统计信息，见stats
+        """
+        if self.quality == ORIGINAL_QUALITY:
+            return self.stats()
+        if not pillow_available():
+            print("警告: 未安装Pillow（pip install Pillow），图片将保持原始质量")
+            return self.stats()
+
+        tier = QUALITY_TIERS[self.quality]
+        # 原图路径 -> 使用该图片的图片项
+        sources = {}
+        for item in image_items:
+            local_path = item.get('local_path')
+            if local_path and not local_path.endswith(f"_{self.quality}{os.path.splitext(local_path)[1]}"):
+                sources.setdefault(local_path, []).append(item)
+
+        pending = {}
+        for source in sources:
+            variant = self.variant_path(source)
+            marker = self.kept_marker_path(source)
+            try:
+                if os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(source):
+                    self._use_variant(sources[source], variant, os.path.getsize(source), os.path.getsize(variant))
+                    self.reused += 1
+                    continue
+                if os.path.exists(marker) and os.path.getmtime(marker) >= os.path.getmtime(source):
+                    self._keep_original(source)
+                    continue
+            except OSError:
+                continue
+            pending[source] = variant
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    source: executor.submit(transcode_file, source, variant, tier['max_dimension'],
+                                            tier['quality'], self.webp)
+                    for source, variant in pending.items()
+                }
+                for source, future in futures.items():
+                    try:
+                        sizes = future.result()
+                    except Exception as e:
+                        print(f"图片转码失败: {source}, 错误: {e}")
+                        self._keep_original(source)
+                        continue
+                    if sizes is None:
+                        # 记录保留原图，原图不变时下次运行不再转码
+                        try:
+                            open(self.kept_marker_path(source), 'w').close()
+                        except OSError:
+                            pass
+                        self._keep_original(source)
+                    else:
+                        self._use_variant(sources[source], pending[source], *sizes)
+                        self.transcoded += 1
+
+        return self.stats()
+
+    def _keep_original(self, source: str) -> None:
+        """保留原图（图片项不变），并累计原图的字节数"""
+        size = os.path.getsize(source)
+        self.bytes_before += size
+        self.bytes_after += size
+        self.kept += 1
+
+    def _use_variant(self, items: List[Dict[str, Any]], variant: str, source_size: int, variant_size: int) -> None:
+        """将图片项指向转码结果，并累计节省的字节数"""
+        for item in items:
+            item['local_path'] = variant
+        self.bytes_before += source_size
+        self.bytes_after += variant_size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回转码统计信息
+
+        返回:
+            包含quality、transcoded、reused、kept、bytes_before、bytes_after和saved_ratio的字典
+        """
+        saved = self.bytes_before - self.bytes_after
+        return {
+            'quality': self.quality,
+            'transcoded': self.transcoded,
+            'reused': self.reused,
+            'kept': self.kept,
+            'bytes_before': self.bytes_before,
+            'bytes_after': self.bytes_after,
+            'saved_ratio': saved / self.bytes_before if self.bytes_before else 0.0
+        }
@@ -3,10 +3,33 @@ Markdown生成器模块，负责将结构化内容转换为Markdown格式。
 """
 import os
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Union, IO
+
+from game_guide_scraper.generator.renderer import ContentRenderer
 
 logger = logging.getLogger(__name__)
 
+# write_markdown写入文件时的缓冲区大小（字节）
+WRITE_BUFFER_SIZE = 64 * 1024
+
+EMPTY_DOCUMENT = "# 空文档\n\n*没有内容可显示*"
+
+
+def _iter_joined(parts: Iterable[Union[str, Iterable[str]]]) -> Iterator[str]:
+    """
+    逐块产出'\n'.join(parts)的结果，parts中的元素可以是字符串，也可以是逐块产出字符串的可迭代对象
+    
+    参数:
+        parts: 字符串或字符串块的可迭代对象
+    """
+    for index, part in enumerate(parts):
+        if index:
+            yield '\n'
+        if isinstance(part, str):
+            yield part
+        else:
+            yield from part
+
 class MarkdownGenerator:
     """
     Markdown生成器类，负责将结构化内容转换为Markdown格式。
@@ -31,31 +54,98 @@ class MarkdownGenerator:
         返回:
             Markdown格式的文档字符串
         """
+        return ''.join(self.iter_markdown(content))
+        
+    def iter_markdown(self, content: Dict[str, Any]) -> Iterator[str]:
+        """
+        逐块生成Markdown文档，拼接后与generate_markdown的结果相同
+        
+        章节内容可以是任意可迭代对象（例如流式内容组织器的SpilledContent），只遍历一次，
+        整个文档不会同时保存在内存中。
+        
+        参数:
+            content: 结构化内容字典，包含title、source_url、toc和chapters等字段
+            
+        返回:
+            Markdown字符串块的迭代器
+        """
         if not content:
             logger.warning("尝试生成空内容的Markdown")
-            return "# 空文档\n\n*没有内容可显示*"
+            return iter((EMPTY_DOCUMENT,))
+        return _iter_joined(self._document_parts(content))
+        
+    def write_markdown(self, content: Dict[str, Any], output: Union[str, IO[str]]) -> bool:
+        """
+        逐块生成Markdown文档并写入文件或输出流
+        
+        写入文件时先写入同目录下的临时文件，完成后再替换目标文件，中途出错不会留下不完整的文档。
+        
+        参数:
+            content: 结构化内容字典
+            output: 输出文件路径，或任何具有write方法的文本输出流
             
-        markdown = []
+        返回:
+            写入成功返回True，否则返回False
+        """
+        if not isinstance(output, str):
+            try:
+                for chunk in self.iter_markdown(content):
+                    output.write(chunk)
+                return True
+            except Exception as e:
+                logger.error(f"写入Markdown时出错: {e}")
+                return False
+        
+        tmp_file = f"{output}.{os.getpid()}.tmp"
+        try:
+            # 确保输出目录存在
+            output_dir = os.path.dirname(output)
+            if output_dir and not os.path.exists(output_dir):
+                os.makedirs(output_dir, exist_ok=True)
+                
+            with open(tmp_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+                for chunk in self.iter_markdown(content):
+                    f.write(chunk)
+            os.replace(tmp_file, output)
+            
+            logger.info(f"Markdown已保存到: {output}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"保存Markdown时出错: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return False
         
+    def _document_parts(self, content: Dict[str, Any]) -> Iterator[Union[str, Iterator[str]]]:
+        """
+        按顺序产出文档的各个部分，部分之间以换行符连接
+        
+        参数:
+            content: 结构化内容字典
+            
+        返回:
+            字符串或字符串块迭代器的迭代器
+        """
         # 添加文档标题
         title = content.get('title', '未知标题')
-        markdown.append(f"# {title}\n")
+        yield f"# {title}\n"
         
         # 添加来源信息
         source_url = content.get('source_url', '')
         if source_url:
-            markdown.append(f"*来源: [{source_url}]({source_url})*\n")
+            yield f"*来源: [{source_url}]({source_url})*\n"
             
         # 添加目录（只包含页面标题，不包含默认的文档标题）
         toc = content.get('toc', [])
         page_titles = content.get('page_titles', [])
         
         if page_titles:
-            markdown.append("## 目录\n")
+            yield "## 目录\n"
             # 只生成页面标题的目录，跳过默认的文档标题
             page_toc = [item for item in toc if item.get('level', 0) > 0]
-            markdown.append(self.generate_toc_markdown(page_toc))
-            markdown.append("\n---\n")
+            yield self.generate_toc_markdown(page_toc)
+            yield "\n---\n"
             
         # 获取页面标题信息
         page_titles = content.get('page_titles', [])
@@ -68,7 +158,7 @@ class MarkdownGenerator:
             if page_titles:
                 # 直接添加章节内容，不添加章节标题
                 chapter_content = chapter.get('content', [])
-                markdown.append(self.generate_content_markdown_with_anchors(chapter_content, page_title_map))
+                yield self._iter_content_markdown(chapter_content, page_title_map)
             else:
                 # 如果没有页面标题，则使用默认的章节结构
                 chapter_num = i + 1
@@ -76,11 +166,11 @@ class MarkdownGenerator:
                 chapter_id = chapter.get('id', f"chapter-{chapter_num}")
                 
                 # 添加章节标题
-                markdown.append(f"## {chapter_num}. {chapter_title} <a id=\"{chapter_id}\"></a>\n")
+                yield f"## {chapter_num}. {chapter_title} <a id=\"{chapter_id}\"></a>\n"
                 
                 # 添加章节内容
                 chapter_content = chapter.get('content', [])
-                markdown.append(self.generate_content_markdown_with_anchors(chapter_content, page_title_map))
+                yield self._iter_content_markdown(chapter_content, page_title_map)
             
             # 添加小节内容
             sections = chapter.get('sections', [])
@@ -90,13 +180,11 @@ class MarkdownGenerator:
                 section_id = section.get('id', f"section-{chapter_num}-{j + 1}")
                 
                 # 添加小节标题
-                markdown.append(f"### {section_num} {section_title} <a id=\"{section_id}\"></a>\n")
+                yield f"### {section_num} {section_title} <a id=\"{section_id}\"></a>\n"
                 
                 # 添加小节内容
                 section_content = section.get('content', [])
-                markdown.append(self.generate_content_markdown_with_anchors(section_content, page_title_map))
-                
-        return '\n'.join(markdown)
+                yield self._iter_content_markdown(section_content, page_title_map)
         
     def generate_content_markdown(self, content_list: List[Dict[str, Any]]) -> str:
         """
@@ -108,100 +196,7 @@ class MarkdownGenerator:
         返回:
             内容的Markdown字符串
         """
-        markdown = []
-        
-        for item in content_list:
-            item_type = item.get('type', '')
-            
-            if item_type == 'text':
-                # 处理文本内容
-                value = item.get('value', '')
-                if value:
-                    markdown.append(f"{value}\n")
-                    
-            elif item_type == 'image':
-                # 处理图片内容
-                url = item.get('url', '')
-                alt = item.get('alt', '')
-                
-                if url:
-                    # 优先使用本地路径
-                    if url in self.image_path_mapping:
-                        local_path = self.image_path_mapping[url]
-                        # 使用相对路径
-                        rel_path = os.path.basename(local_path)
-                        markdown.append(f"![{alt}](images/{rel_path})\n")
-                    else:
-                        # 使用原始URL
-                        markdown.append(f"![{alt}]({url})\n")
-                        
-            elif item_type == 'heading':
-                # 处理标题内容
-                level = item.get('level', 3)  # 默认为h3
-                value = item.get('value', '')
-                id_str = item.get('id', '')
-                
-                if value:
-                    # 根据级别添加不同数量的#
-                    heading_prefix = '#' * (level + 1)  # +1是因为在章节和小节下，标题级别需要增加
-                    
-                    if id_str:
-                        markdown.append(f"{heading_prefix} {value} <a id=\"{id_str}\"></a>\n")
-                    else:
-                        markdown.append(f"{heading_prefix} {value}\n")
-                        
-            elif item_type == 'list':
-                # 处理列表内容
-                items = item.get('items', [])
-                ordered = item.get('ordered', False)
-                
-                if items:
-                    markdown.append("\n")
-                    for i, list_item in enumerate(items):
-                        if ordered:
-                            markdown.append(f"{i + 1}. {list_item}\n")
-                        else:
-                            markdown.append(f"- {list_item}\n")
-                    markdown.append("\n")
-                    
-            elif item_type == 'table':
-                # 处理表格内容
-                headers = item.get('headers', [])
-                rows = item.get('rows', [])
-                
-                if headers and rows:
-                    # 添加表头
-                    markdown.append("| " + " | ".join(headers) + " |\n")
-                    # 添加分隔线
-                    markdown.append("| " + " | ".join(["---"] * len(headers)) + " |\n")
-                    # 添加表格内容
-                    for row in rows:
-                        markdown.append("| " + " | ".join(row) + " |\n")
-                    markdown.append("\n")
-                    
-            elif item_type == 'code':
-                # 处理代码内容
-                value = item.get('value', '')
-                language = item.get('language', '')
-                
-                if value:
-                    if language:
-                        markdown.append(f"```{language}\n{value}\n```\n")
-                    else:
-                        markdown.append(f"```\n{value}\n```\n")
-                        
-            elif item_type == 'quote':
-                # 处理引用内容
-                value = item.get('value', '')
-                
-                if value:
-                    # 为每一行添加>前缀
-                    lines = value.split('\n')
-                    for line in lines:
-                        markdown.append(f"> {line}\n")
-                    markdown.append("\n")
-                    
-        return '\n'.join(markdown)
+        return ContentRenderer(self.image_path_mapping, heading_offset=1).render(content_list)
     
     def generate_content_markdown_with_anchors(self, content_list: List[Dict[str, Any]], page_title_map: Dict[str, Dict[str, Any]]) -> str:
         """
@@ -214,106 +209,18 @@ class MarkdownGenerator:
         返回:
             内容的Markdown字符串
         """
-        markdown = []
+        return ''.join(self._iter_content_markdown(content_list, page_title_map))
         
-        for item in content_list:
-            item_type = item.get('type', '')
-            
-            if item_type == 'text':
-                # 处理文本内容
-                value = item.get('value', '')
-                if value:
-                    # 检查是否是页面标题
-                    if value in page_title_map:
-                        page_info = page_title_map[value]
-                        # 为页面标题添加锚点
-                        markdown.append(f"\n## {value} <a id=\"{page_info['id']}\"></a>\n")
-                    else:
-                        markdown.append(f"{value}\n")
-                        
-            elif item_type == 'image':
-                # 处理图片内容
-                url = item.get('url', '')
-                alt = item.get('alt', '')
-                
-                if url:
-                    # 优先使用本地路径
-                    if url in self.image_path_mapping:
-                        local_path = self.image_path_mapping[url]
-                        # 使用相对路径
-                        rel_path = os.path.basename(local_path)
-                        markdown.append(f"![{alt}](images/{rel_path})\n")
-                    else:
-                        # 使用原始URL
-                        markdown.append(f"![{alt}]({url})\n")
-                        
-            elif item_type == 'heading':
-                # 处理标题内容
-                level = item.get('level', 3)  # 默认为h3
-                value = item.get('value', '')
-                id_str = item.get('id', '')
-                
-                if value:
-                    # 根据级别添加不同数量的#
-                    heading_prefix = '#' * (level + 2)  # +2是因为在章节下，标题级别需要增加
-                    
-                    if id_str:
-                        markdown.append(f"{heading_prefix} {value} <a id=\"{id_str}\"></a>\n")
-                    else:
-                        markdown.append(f"{heading_prefix} {value}\n")
-                        
-            elif item_type == 'list':
-                # 处理列表内容
-                items = item.get('items', [])
-                ordered = item.get('ordered', False)
-                
-                if items:
-                    markdown.append("\n")
-                    for i, list_item in enumerate(items):
-                        if ordered:
-                            markdown.append(f"{i + 1}. {list_item}\n")
-                        else:
-                            markdown.append(f"- {list_item}\n")
-                    markdown.append("\n")
-                    
-            elif item_type == 'table':
-                # 处理表格内容
-                headers = item.get('headers', [])
-                rows = item.get('rows', [])
-                
-                if headers and rows:
-                    # 添加表头
-                    markdown.append("| " + " | ".join(headers) + " |\n")
-                    # 添加分隔线
-                    markdown.append("| " + " | ".join(["---"] * len(headers)) + " |\n")
-                    # 添加表格内容
-                    for row in rows:
-                        markdown.append("| " + " | ".join(row) + " |\n")
-                    markdown.append("\n")
-                    
-            elif item_type == 'code':
-                # 处理代码内容
-                value = item.get('value', '')
-                language = item.get('language', '')
-                
-                if value:
-                    if language:
-                        markdown.append(f"```{language}\n{value}\n```\n")
-                    else:
-                        markdown.append(f"```\n{value}\n```\n")
-                        
-            elif item_type == 'quote':
-                # 处理引用内容
-                value = item.get('value', '')
-                
-                if value:
-                    # 为每一行添加>前缀
-                    lines = value.split('\n')
-                    for line in lines:
-                        markdown.append(f"> {line}\n")
-                    markdown.append("\n")
-                    
-        return '\n'.join(markdown)
+    def _iter_content_markdown(self, content_list: Iterable[Dict[str, Any]], page_title_map: Dict[str, Dict[str, Any]]) -> Iterator[str]:
+        """
+        逐块生成带页面标题锚点的内容Markdown，拼接后与generate_content_markdown_with_anchors的结果相同
+        
+        参数:
+            content_list: 内容元素的可迭代对象
+            page_title_map: 页面标题映射字典
+        """
+        renderer = ContentRenderer(self.image_path_mapping, heading_offset=2, page_title_map=page_title_map)
+        return renderer.iter_markdown(content_list)
         
     def generate_toc_markdown(self, toc: List[Dict[str, Any]]) -> str:
         """
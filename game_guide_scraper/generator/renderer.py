@@ -0,0 +1,290 @@
+"""
+内容渲染器模块，按元素类型查表将内容元素渲染为Markdown片段。
+"""
+import os
+from itertools import islice
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Mapping
+
+from game_guide_scraper.parser.items import (
+    ITEM_TYPES, TextItem, ImageItem, HeadingItem, ListItem, TableItem, CodeItem, QuoteItem, content_item
+)
+
+# 渲染函数：接收渲染器、内容元素和输出函数，通过输出函数产出零个或多个Markdown片段
+Renderer = Callable[['ContentRenderer', Mapping[str, Any], Callable[[str], None]], None]
+
+# 元素类型 -> 渲染函数，新建的ContentRenderer复制这张表
+_RENDERERS: Dict[str, Renderer] = {}
+
+# iter_markdown每渲染这么多个元素产出一次
+CHUNK_ITEMS = 256
+
+# 内容元素类，这些元素直接交给渲染函数
+_ITEM_CLASSES = frozenset(ITEM_TYPES.values())
+
+
+def _as_item(item: Mapping) -> Any:
+    """
+    将字典形式的内容元素转换为ContentItem，内置渲染函数直接读取元素的属性
+
+    与原来直接读取字典时相同，元素类型没有的字段（如下载器写入的其他信息）被忽略。
+
+    参数:
+        item: 内容元素
+
+    返回:
+        ContentItem对象；不属于内置元素类型的元素（如自定义类型）原样返回
+    """
+    if item.get('type') in ITEM_TYPES:
+        return content_item(item, strict=False)
+    return item
+
+
+def _image_links(image_path_mapping: Dict[str, str]) -> Dict[str, str]:
+    """
+    计算已下载图片在Markdown中的链接（images目录下的文件名）
+
+    参数:
+        image_path_mapping: 图片URL到本地路径的映射字典
+
+    返回:
+        图片URL到链接的映射字典
+    """
+    return {url: f"images/{os.path.basename(path)}" for url, path in image_path_mapping.items()}
+
+
+def register_renderer(item_type: str, render: Optional[Renderer] = None):
+    """
+    注册一种内容元素类型的渲染函数，之后创建的ContentRenderer都会使用它
+
+    可以直接调用register_renderer('spoiler', render_spoiler)，也可以作为装饰器使用：
+
+        @register_renderer('spoiler')
+        def render_spoiler(renderer, item, emit):
+            emit(f"||{item['value']}||\n")
+
+    参数:
+        item_type: 内容元素的type字段
+        render: 渲染函数，为None时返回装饰器
+
+    返回:
+        渲染函数本身（作为装饰器使用时返回装饰器）
+    """
+    if render is None:
+        return lambda func: register_renderer(item_type, func)
+    _RENDERERS[item_type] = render
+    return render
+
+
+class ContentRenderer:
+    """
+    内容渲染器
+
+    按元素的type字段从渲染表中查找渲染函数，渲染函数产出的所有Markdown片段之间以换行符连接。
+    没有注册渲染函数的元素类型被忽略。内置类型的字典元素先转换为ContentItem
+    （忽略该类型没有的字段），渲染函数收到的内置类型元素总是ContentItem。
+
+    属性:
+        image_path_mapping: 图片URL到本地路径的映射字典
+        heading_offset: 标题元素的级别偏移，输出的#数量为level + heading_offset
+        page_title_map: 锚点策略，完整页面标题到页面标题信息的映射，
+                        与其中的完整标题相同的文本渲染为带锚点的二级标题；为空时不添加页面标题锚点
+        renderers: 本渲染器使用的渲染表（元素类型 -> 渲染函数）
+    """
+
+    def __init__(self, image_path_mapping: Optional[Dict[str, str]] = None, heading_offset: int = 1,
+                 page_title_map: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        初始化内容渲染器
+
+        参数:
+            image_path_mapping: 图片URL到本地路径的映射字典
+            heading_offset: 标题元素的级别偏移（章节和小节下为1，直接位于页面标题下为2）
+            page_title_map: 页面标题映射字典，为None时不添加页面标题锚点
+        """
+        self.image_path_mapping = image_path_mapping or {}
+        # 已下载图片的URL -> Markdown中的相对路径，每张图片只计算一次
+        self.image_links = _image_links(self.image_path_mapping)
+        self.heading_offset = heading_offset
+        self.page_title_map = page_title_map or {}
+        self.renderers = dict(_RENDERERS)
+        # 常见标题级别的#前缀
+        self.heading_prefixes = {level: '#' * (level + heading_offset) for level in range(7)}
+
+    def register(self, item_type: str, render: Renderer) -> None:
+        """
+        只为本渲染器注册（或替换）一种元素类型的渲染函数
+
+        参数:
+            item_type: 内容元素的type字段
+            render: 渲染函数
+        """
+        self.renderers[item_type] = render
+
+    def heading_prefix(self, level: int) -> str:
+        """
+        返回标题级别对应的#前缀
+
+        参数:
+            level: 标题元素的级别
+        """
+        prefix = self.heading_prefixes.get(level)
+        if prefix is None:
+            prefix = '#' * (level + self.heading_offset)
+        return prefix
+
+    def image_link(self, url: str) -> str:
+        """
+        返回图片在Markdown中的链接：已下载的图片使用images目录下的相对路径，否则使用原始URL
+
+        参数:
+            url: 图片URL
+        """
+        return self.image_links.get(url, url)
+
+    def render_item(self, item: Mapping[str, Any]) -> List[str]:
+        """
+        渲染单个内容元素
+
+        参数:
+            item: 内容元素
+
+        返回:
+            Markdown片段列表，元素类型未注册或没有可显示的内容时为空列表
+        """
+        fragments = []
+        if item.__class__ not in _ITEM_CLASSES:
+            item = _as_item(item)
+        render = self.renderers.get(item.get('type', ''))
+        if render is not None:
+            render(self, item, fragments.append)
+        return fragments
+
+    def _render_into(self, content_list: Iterable[Mapping[str, Any]], emit: Callable[[str], None]) -> None:
+        """
+        渲染内容元素，产出的片段交给emit
+
+        参数:
+            content_list: 内容元素的可迭代对象
+            emit: 接收Markdown片段的函数
+        """
+        get_renderer = self.renderers.get
+        for item in content_list:
+            if item.__class__ in _ITEM_CLASSES:
+                render = get_renderer(item.type)
+            else:
+                item = _as_item(item)
+                render = get_renderer(item.get('type', ''))
+            if render is not None:
+                render(self, item, emit)
+
+    def iter_markdown(self, content_list: Iterable[Mapping[str, Any]]) -> Iterator[str]:
+        """
+        逐块渲染内容元素，拼接后与render的结果相同
+
+        参数:
+            content_list: 内容元素的可迭代对象
+
+        返回:
+            Markdown字符串块的迭代器
+        """
+        fragments = []
+        separator = ''
+        items = iter(content_list)
+        while True:
+            batch = list(islice(items, CHUNK_ITEMS))
+            if not batch:
+                break
+            self._render_into(batch, fragments.append)
+            if fragments:
+                yield separator + '\n'.join(fragments)
+                fragments.clear()
+                separator = '\n'
+
+    def render(self, content_list: Iterable[Mapping[str, Any]]) -> str:
+        """
+        渲染内容元素列表
+
+        参数:
+            content_list: 内容元素的可迭代对象
+
+        返回:
+            内容的Markdown字符串
+        """
+        fragments = []
+        self._render_into(content_list, fragments.append)
+        return '\n'.join(fragments)
+
+
+# 内置渲染函数，元素是对应类型的ContentItem
+
+@register_renderer('text')
+def _render_text(renderer: ContentRenderer, item: TextItem, emit: Callable[[str], None]) -> None:
+    value = item.value
+    if value:
+        # 页面标题添加锚点
+        if value in renderer.page_title_map:
+            emit(f"\n## {value} <a id=\"{renderer.page_title_map[value]['id']}\"></a>\n")
+        else:
+            emit(f"{value}\n")
+
+
+@register_renderer('image')
+def _render_image(renderer: ContentRenderer, item: ImageItem, emit: Callable[[str], None]) -> None:
+    url = item.url
+    if url:
+        emit(f"![{item.alt}]({renderer.image_links.get(url, url)})\n")
+
+
+@register_renderer('heading')
+def _render_heading(renderer: ContentRenderer, item: HeadingItem, emit: Callable[[str], None]) -> None:
+    value = item.value
+    if value:
+        prefix = renderer.heading_prefixes.get(item.level)
+        if prefix is None:
+            prefix = renderer.heading_prefix(item.level)
+        if item.id:
+            emit(f"{prefix} {value} <a id=\"{item.id}\"></a>\n")
+        else:
+            emit(f"{prefix} {value}\n")
+
+
+@register_renderer('list')
+def _render_list(renderer: ContentRenderer, item: ListItem, emit: Callable[[str], None]) -> None:
+    items = item.items
+    if items:
+        emit("\n")
+        if item.ordered:
+            for i, list_item in enumerate(items, 1):
+                emit(f"{i}. {list_item}\n")
+        else:
+            for list_item in items:
+                emit(f"- {list_item}\n")
+        emit("\n")
+
+
+@register_renderer('table')
+def _render_table(renderer: ContentRenderer, item: TableItem, emit: Callable[[str], None]) -> None:
+    headers = item.headers
+    rows = item.rows
+    if headers and rows:
+        emit("| " + " | ".join(headers) + " |\n")
+        emit("| " + " | ".join(["---"] * len(headers)) + " |\n")
+        for row in rows:
+            emit("| " + " | ".join(row) + " |\n")
+        emit("\n")
+
+
+@register_renderer('code')
+def _render_code(renderer: ContentRenderer, item: CodeItem, emit: Callable[[str], None]) -> None:
+    value = item.value
+    if value:
+        emit(f"```{item.language or ''}\n{value}\n```\n")
+
+
+@register_renderer('quote')
+def _render_quote(renderer: ContentRenderer, item: QuoteItem, emit: Callable[[str], None]) -> None:
+    value = item.value
+    if value:
+        # 为每一行添加>前缀，最后一个空行；各行片段之间以换行符连接，因此直接拼接成一个片段
+        lines = '\n\n> '.join(value.split('\n'))
+        emit(f"> {lines}\n\n\n")
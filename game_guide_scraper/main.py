@@ -18,6 +18,24 @@ from game_guide_scraper.controller.controller import Controller
 from game_guide_scraper.utils.cli import ConfigWizard, prompt_yes_no, InteractiveController
 
 
+def parse_rate_limit(value):
+    """
+    解析--rate-limit参数
+    
+    参数:
+        value: 形如"HOST=RATE"或"HOST=RATE:BURST"的字符串，HOST可以使用通配符，如"img*.gamersky.com=4:8"
+        
+    返回:
+        (主机名模式, {'rate': 每秒请求数, 'burst': 突发数量})元组
+    """
+    try:
+        host, rule = value.split('=', 1)
+        rate, _, burst = rule.partition(':')
+        return host.strip(), {'rate': float(rate), 'burst': int(burst) if burst else 1}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的限速规则: {value}，格式应为 HOST=RATE[:BURST]")
+
+
 def parse_arguments():
     """解析命令行参数"""
     # 创建一个自定义的描述文本，包含更多信息
@@ -62,9 +80,27 @@ def parse_arguments():
                         help='图片保存目录，默认为output_dir/images')
     img_group.add_argument('--image-delay', type=float, default=0.5,
                         help='图片下载间隔时间（秒）')
+    img_group.add_argument('--image-workers', type=int, default=4,
+                        help='每个页面并发下载图片的线程数，1表示逐张下载')
+    img_group.add_argument('--image-host-limit', type=int, default=None,
+                        help='每个图片主机同时进行的最大下载数，默认等于--image-workers')
+    img_group.add_argument('--no-image-manifest', dest='image_manifest', action='store_false', default=True,
+                        help='不使用图片清单，逐个检查图片文件是否存在')
+    img_group.add_argument('--image-store', type=str, default=None,
+                        help='内容寻址图片库目录，多个攻略共享同一份图片，图片目录中保存指向图片库的链接')
     img_group.add_argument('--image-quality', type=str, choices=['original', 'high', 'medium', 'low'], 
                         default='original',
-                        help='图片质量，影响下载的图片大小')
+                        help='图片质量：original保留原图，high/medium/low在下载后将图片缩放到1920/1280/800像素以内并重新压缩（需要安装Pillow）')
+    img_group.add_argument('--thumbnail-min-size', type=int, default=480,
+                        help='图片质量为medium/low时下载游民星空的缩略图，缩略图最长边小于该像素值时改为下载原图，0表示不检查')
+    img_group.add_argument('--image-budget-mb', type=float, default=None,
+                        help='图片流量预算（MB），探测到的原图超出剩余预算时改为下载缩略图')
+    img_group.add_argument('--image-format', type=str, choices=['auto', 'webp'], default='auto',
+                        help='转码后的图片格式：auto保持JPEG/PNG，webp输出WebP')
+    img_group.add_argument('--transcode-workers', type=int, default=None,
+                        help='图片转码进程数，默认为CPU核数')
+    img_group.add_argument('--no-background-images', dest='background_images', action='store_false', default=True,
+                        help='顺序模式下在抓取线程中逐页下载图片，而不是在后台线程中下载')
     img_group.add_argument('--skip-existing-images', action='store_true', default=True,
                         help='跳过已存在的图片，避免重复下载')
     img_group.add_argument('--force-download-images', dest='skip_existing_images', 
@@ -89,9 +125,48 @@ def parse_arguments():
     crawler_group.add_argument('--stop-on-error', dest='continue_on_error', action='store_false',
                         help='遇到错误时停止抓取')
     crawler_group.add_argument('--max-pages', type=int, default=0,
-                        help='最大抓取页面数，0表示不限制')
+                        help='最多输出的页面数（从--start-page开始计算），0表示不限制')
     crawler_group.add_argument('--start-page', type=int, default=1,
-                        help='开始抓取的页码，用于断点续传')
+                        help='从第几页开始输出，之前的页面只用于查找下一页链接（有页面索引时在流水线模式下直接跳过）')
+    crawler_group.add_argument('--no-resume', dest='resume', action='store_false', default=True,
+                        help='忽略上次中断时留下的抓取日志，从头开始抓取')
+    crawler_group.add_argument('--no-journal', dest='journal', action='store_false', default=True,
+                        help='顺序模式下不记录抓取日志（默认记录在输出目录的.crawl_journal.jsonl中，中断后再次运行从中断处继续）')
+    crawler_group.add_argument('--deadline', type=float, default=None,
+                             help='限时模式的时间预算（秒）：先抓取所有页面的文本，再按优先级下载图片（先下载每页的第1张），'
+                             '到时推迟其余图片并在Markdown中保留其原始URL，推迟的图片列在输出目录的deferred_images.json中（仅供查看）；'
+                             '再次运行时重新处理全部页面，已下载的图片被跳过')
+    crawler_group.add_argument('--pipeline', action='store_true', default=False,
+                        help='流水线模式，抓取、解析、图片下载和内容组织分阶段并行执行')
+    crawler_group.add_argument('--jobs', '-j', type=int, default=1,
+                        help='流水线各阶段的默认工作线程数，大于1时自动启用流水线模式')
+    crawler_group.add_argument('--fetch-jobs', type=int, default=None,
+                        help='按页面索引并发抓取页面时的线程数，默认与--jobs相同')
+    crawler_group.add_argument('--parse-jobs', type=int, default=None,
+                        help='解析阶段工作线程数，默认与--jobs相同')
+    crawler_group.add_argument('--image-jobs', type=int, default=None,
+                        help='图片下载阶段工作线程数，默认与--jobs相同')
+    crawler_group.add_argument('--queue-size', type=int, default=None,
+                        help='流水线阶段间队列容量，默认为--jobs的2倍')
+    crawler_group.add_argument('--parser-backend', type=str, choices=['auto', 'html.parser', 'lxml'],
+                        default='html.parser',
+                        help='HTML解析后端，auto表示通过微基准测试自动选择最快的可用后端（lxml需要额外安装）')
+    crawler_group.add_argument('--rate-limit', dest='rate_limits', type=parse_rate_limit, action='append',
+                        default=None, metavar='HOST=RATE[:BURST]',
+                        help='按主机名限速（每秒请求数和突发数量），可多次指定，主机名支持通配符，'
+                             '如 --rate-limit "img*.gamersky.com=4:8"；未匹配的主机使用--delay/--image-delay')
+    crawler_group.add_argument('--cache-dir', type=str, default=None,
+                        help='页面缓存目录，默认为输出目录下的.cache/pages')
+    crawler_group.add_argument('--cache-ttl', type=float, default=7 * 24 * 3600,
+                        help='页面缓存有效期（秒），过期后通过条件请求重新验证，默认为7天')
+    crawler_group.add_argument('--cache-max-mb', type=float, default=200,
+                        help='页面缓存大小上限（MB），超过时淘汰最久未访问的页面')
+    crawler_group.add_argument('--no-cache', dest='cache', action='store_false', default=True,
+                        help='禁用页面缓存，每次都从网络抓取')
+    crawler_group.add_argument('--no-parse-cache', dest='parse_cache', action='store_false', default=True,
+                             help='不缓存页面解析结果（默认缓存在output_dir/.cache/parsed，HTML和解析规则不变时不再重新解析）')
+    crawler_group.add_argument('--offline', action='store_true', default=False,
+                        help='离线模式，只从页面缓存读取，不访问网络')
     crawler_group.add_argument('--cookies', type=str, default=None,
                         help='Cookie字符串，用于需要登录的网站')
     crawler_group.add_argument('--headers', type=str, default=None,
@@ -112,6 +187,8 @@ def parse_arguments():
                         help='安静模式，只输出错误信息')
     output_group.add_argument('--verbose', action='store_true', default=False,
                         help='详细模式，输出更多调试信息')
+    output_group.add_argument('--low-memory', action='store_true', default=False,
+                        help='低内存模式，将页面内容写入磁盘临时文件，内存占用不随攻略长度增长')
     output_group.add_argument('--output-format', type=str, 
                         choices=['markdown', 'html', 'text'], default='markdown',
                         help='输出格式，默认为Markdown')
@@ -207,19 +284,51 @@ def generate_config_template(output_path):
         "image_dir": "output/images",
         "image_delay": 0.5,
         "image_quality": "original",  # 可选值: original, high, medium, low
+        "image_format": "auto",  # 转码输出格式: auto, webp
+        "transcode_workers": None,
+        "thumbnail_min_size": 480,
+        "image_budget_mb": None,
         "skip_existing_images": True,
+        "image_workers": 4,
+        "image_host_limit": None,
+        "image_store": None,  # 多个攻略共享的图片库目录
+        "image_manifest": True,  # 使用图片清单记录已下载的图片
+        "background_images": True,  # 顺序模式下在后台下载图片
         
         # 爬虫配置
         "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "delay": 1.0,
         "max_retries": 3,
         "retry_delay": 2.0,
+        "deadline": None,  # 限时模式的时间预算（秒）
+        "journal": True,  # 顺序模式下记录抓取日志，中断后可以继续
+        "resume": True,  # 从上次中断时的抓取日志继续
+        "rate_limits": {  # 按主机名限速，rate为每秒请求数，burst为突发数量；未匹配的主机使用delay/image_delay
+            "www.gamersky.com": {"rate": 1.0, "burst": 1},
+            "img*.gamersky.com": {"rate": 4.0, "burst": 8}
+        },
         "timeout": 30,
         "continue_on_error": True,
         "max_pages": 0,  # 0表示不限制
         "start_page": 1,
+        "pipeline": False,
+        "jobs": 1,  # 大于1时自动启用流水线模式
+        "fetch_jobs": None,
+        "parse_jobs": None,
+        "image_jobs": None,
+        "queue_size": None,
+        "parser_backend": "html.parser",  # 可选值: html.parser, lxml, auto
+        "cache": True,
+        "cache_dir": None,  # 默认为output_dir/.cache/pages
+        "cache_ttl": 604800,  # 缓存有效期（秒）
+        "cache_max_mb": 200,
+        "offline": False,
+        "parse_cache": True,
+        "parse_cache_dir": None,  # 默认为output_dir/.cache/parsed
         "cookies": None,
         "headers": {},
+        "pool_connections": 10,  # 缓存的主机连接池数量
+        "pool_maxsize": None,  # 每个主机保持的连接数，None表示按并发线程数自动计算
         
         # 输出配置
         "show_progress_bar": True,
@@ -228,6 +337,8 @@ def generate_config_template(output_path):
         "quiet": False,
         "verbose": False,
         "output_format": "markdown",  # 可选值: markdown, html, text
+        "low_memory": False,  # 将页面内容写入磁盘临时文件
+        "spill_dir": None,  # 低内存模式的临时文件目录，默认为系统临时目录
         
         # 内容过滤配置
         "include_keywords": None,  # 多个关键词用逗号分隔
@@ -308,6 +419,18 @@ def show_examples():
   # 从指定页码开始抓取（断点续传）
   python -m game_guide_scraper.main --start-page 5
   
+  # 流水线模式，各阶段使用4个工作线程
+  python -m game_guide_scraper.main --jobs 4
+  
+  # 页面和图片主机分别限速，并发下载时保持礼貌
+  python -m game_guide_scraper.main --jobs 4 --rate-limit "www.gamersky.com=1" --rate-limit "img*.gamersky.com=4:8"
+  
+  # 多个攻略共享同一个图片库，相同的图片只下载和保存一次
+  python -m game_guide_scraper.main --output-dir "Guide_A" --image-store "image_store"
+  
+  # 只使用页面缓存重新生成文档，不访问网络
+  python -m game_guide_scraper.main --offline
+  
   # 遇到错误时停止抓取
   python -m game_guide_scraper.main --stop-on-error
   
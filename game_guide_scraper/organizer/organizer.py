@@ -3,6 +3,7 @@
 """
 import re
 import os
+import bisect
 import logging
 from typing import Dict, List, Any, Optional
 
@@ -17,9 +18,11 @@ class ContentOrganizer:
         """
         初始化内容组织器
         """
-        self.pages = []  # 存储所有页面内容
+        self.pages = []  # 存储所有页面内容，始终按页码排序（只通过add_page_content添加）
         self.title = ""  # 文档标题
         self.source_url = ""  # 原始URL
+        self._page_numbers = []  # 与pages一一对应的页码，用于二分查找插入位置
+        self._pages_by_url = {}  # URL -> 页面内容，用于去重
         
     def add_page_content(self, page_content: Dict[str, Any]) -> None:
         """
@@ -39,16 +42,10 @@ class ContentOrganizer:
                 logger.warning(f"页面内容缺少必要的字段: {field}")
                 return
                 
-        # 如果是第一个页面，设置文档标题和源URL
-        if not self.pages:
-            self.title = page_content['title']
-            self.source_url = page_content['url']
-            
         # 检查是否已存在相同URL的页面，避免重复添加
-        for existing_page in self.pages:
-            if existing_page.get('url') == page_content['url']:
-                logger.warning(f"页面已存在，跳过添加: {page_content['url']}")
-                return
+        if page_content['url'] in self._pages_by_url:
+            logger.warning(f"页面已存在，跳过添加: {page_content['url']}")
+            return
                 
         # 处理内容中的图片路径
         for item in page_content.get('content', []):
@@ -56,18 +53,55 @@ class ContentOrganizer:
                 # 确保本地路径是相对路径，便于后续生成Markdown
                 item['relative_path'] = os.path.basename(item['local_path'])
                 
-        # 添加页面内容到列表中
-        self.pages.append(page_content)
-        
-        # 按页码排序
-        if 'page_number' in page_content:
-            self.pages.sort(key=lambda p: p.get('page_number', 0))
-        else:
-            # 如果没有页码，则按添加顺序排序
-            page_content['page_number'] = len(self.pages)
+        # 如果没有页码，则按添加顺序编号
+        if 'page_number' not in page_content:
+            page_content['page_number'] = len(self.pages) + 1
+            
+        # 按页码二分插入，页码相同的页面保持添加顺序
+        page_number = page_content['page_number']
+        position = bisect.bisect_right(self._page_numbers, page_number)
+        page = self._store_page(page_content)
+        self._page_numbers.insert(position, page_number)
+        self.pages.insert(position, page)
+        self._pages_by_url[page_content['url']] = page
+        
+        # 文档标题和源URL取页码最小的页面，而不是第一个添加的页面：流水线模式下页面乱序到达，
+        # 按到达顺序取标题会使输出与顺序模式不同
+        if position == 0:
+            self.title = page_content['title']
+            self.source_url = page_content['url']
             
         logger.info(f"添加了页面内容: {page_content['title']} (页码: {page_content.get('page_number', '未知')})")
         
+    def _store_page(self, page_content: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        保存页面内容，返回存入pages列表的对象
+        
+        参数:
+            page_content: 已校验的页面内容字典
+            
+        返回:
+            存入pages列表的页面字典（这里直接保存页面内容本身）
+        """
+        return page_content
+        
+    def _merged_content(self) -> List[Dict[str, Any]]:
+        """
+        按页码顺序合并所有页面的内容元素
+        
+        返回:
+            内容元素列表
+        """
+        merged = []
+        for page in self.pages:
+            merged.extend(page.get('content', []))
+        return merged
+        
+    def close(self) -> None:
+        """
+        释放内容组织器占用的资源（内存中的组织器无需释放）
+        """
+        
     def organize_content(self) -> Dict[str, Any]:
         """
         组织所有内容，生成结构化文档
@@ -93,9 +127,6 @@ class ContentOrganizer:
             'page_titles': []  # 添加页面标题列表
         }
         
-        # 确保页面按页码排序
-        self.pages.sort(key=lambda p: p.get('page_number', 0))
-        
         # 收集页面标题信息
         page_titles = self._extract_page_titles()
         document['page_titles'] = page_titles
@@ -109,8 +140,7 @@ class ContentOrganizer:
         }
         
         # 合并所有页面的内容
-        for page in self.pages:
-            chapter['content'].extend(page.get('content', []))
+        chapter['content'] = self._merged_content()
             
         document['chapters'].append(chapter)
         
@@ -277,33 +307,42 @@ class ContentOrganizer:
         page_titles = []
         
         for page in self.pages:
-            page_number = page.get('page_number', 0)
-            
-            # 在页面内容中查找页面标题（格式如"第X页：标题"）
-            content = page.get('content', [])
-            for item in content:
-                if item.get('type') == 'text':
-                    text = item.get('value', '')
-                    # 匹配"第X页：标题"格式
-                    import re
-                    match = re.match(r'^第(\d+)页：(.+)$', text.strip())
-                    if match:
-                        page_num = int(match.group(1))
-                        title = match.group(2).strip()
-                        
-                        page_titles.append({
-                            'page_number': page_num,
-                            'title': title,
-                            'full_title': text.strip(),
-                            'id': self._generate_id(f"page-{page_num}-{title}"),
-                            'url': page.get('url', '')
-                        })
-                        break  # 找到页面标题后跳出循环
+            page_title = self._find_page_title(page)
+            if page_title:
+                page_titles.append(page_title)
         
         # 按页码排序
         page_titles.sort(key=lambda x: x['page_number'])
         return page_titles
     
+    def _find_page_title(self, page: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        在页面内容中查找页面标题（格式如"第X页：标题"）
+        
+        参数:
+            page: 页面内容字典
+            
+        返回:
+            页面标题信息，包含页码、标题、完整标题、ID和URL，找不到时返回None
+        """
+        for item in page.get('content', []):
+            if item.get('type') == 'text':
+                text = item.get('value', '')
+                # 匹配"第X页：标题"格式
+                match = re.match(r'^第(\d+)页：(.+)$', text.strip())
+                if match:
+                    page_num = int(match.group(1))
+                    title = match.group(2).strip()
+                    
+                    return {
+                        'page_number': page_num,
+                        'title': title,
+                        'full_title': text.strip(),
+                        'id': self._generate_id(f"page-{page_num}-{title}"),
+                        'url': page.get('url', '')
+                    }
+        return None
+    
     def generate_page_based_toc(self, page_titles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         基于页面标题生成目录
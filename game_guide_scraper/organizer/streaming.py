@@ -0,0 +1,139 @@
+"""
+流式内容组织器模块，将页面内容写入磁盘临时文件，组织后的文档内容按需从磁盘读取。
+"""
+import os
+import pickle
+import tempfile
+import threading
+from typing import Dict, List, Any, Optional, Iterator
+
+from game_guide_scraper.organizer.organizer import ContentOrganizer
+
+
+class SpilledContent:
+    """
+    按页码顺序从磁盘读取的内容元素序列
+
+    每次迭代都重新从临时文件读取，同一时间只有一个页面的内容在内存中，因此可以多次遍历
+    （例如先收集图片，再生成Markdown）。图片元素不写入磁盘，迭代时返回页面添加时的图片字典本身，
+    因此之后下载或转码写入的local_path在迭代结果中可见。
+    """
+
+    def __init__(self, organizer: 'StreamingContentOrganizer'):
+        """
+        初始化内容序列
+
+        参数:
+            organizer: 保存页面的流式内容组织器
+        """
+        self.organizer = organizer
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for page in list(self.organizer.pages):
+            yield from self.organizer._read_page(page)
+
+
+class StreamingContentOrganizer(ContentOrganizer):
+    """
+    流式内容组织器
+
+    页面添加时将内容元素写入磁盘临时文件（每个页面一个段，记录偏移和长度），pages列表中只保留
+    URL、标题、页码、段位置、页面标题信息和图片元素。organize_content返回的章节内容是SpilledContent，
+    MarkdownGenerator遍历时逐页读取，不会生成合并后的内容列表，内存占用不随攻略文字长度增长。
+
+    属性:
+        spill_dir: 临时文件所在目录，为None时使用系统临时目录
+        spilled_bytes: 写入临时文件的字节数
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None):
+        """
+        初始化流式内容组织器
+
+        参数:
+            spill_dir: 临时文件所在目录，为None时使用系统临时目录
+        """
+        super().__init__()
+        self.spill_dir = spill_dir
+        self.spilled_bytes = 0
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        # 临时文件在关闭（或进程退出）后自动删除
+        self._file = tempfile.TemporaryFile(prefix='organizer-', suffix='.spill', dir=spill_dir)
+        self._lock = threading.Lock()
+
+    def _store_page(self, page_content: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        将页面内容写入临时文件
+
+        参数:
+            page_content: 已校验的页面内容字典
+
+        返回:
+            不包含内容元素的页面字典
+        """
+        content = page_content.get('content', [])
+        images = [item for item in content if item.get('type') == 'image']
+        # 图片元素以None占位，读取时按顺序替换为内存中的图片字典
+        items = [None if item.get('type') == 'image' else item for item in content]
+        data = pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with self._lock:
+            self._file.seek(0, 2)
+            offset = self._file.tell()
+            self._file.write(data)
+            self.spilled_bytes += len(data)
+
+        return {
+            'url': page_content['url'],
+            'title': page_content['title'],
+            'page_number': page_content['page_number'],
+            'segment': (offset, len(data)),
+            'images': images,
+            'page_title': super()._find_page_title(page_content)
+        }
+
+    def _read_page(self, page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        从临时文件读取一个页面的内容元素
+
+        参数:
+            page: pages列表中的页面字典
+
+        返回:
+            内容元素列表
+        """
+        offset, length = page['segment']
+        with self._lock:
+            self._file.seek(offset)
+            data = self._file.read(length)
+        images = iter(page['images'])
+        return [next(images) if item is None else item for item in pickle.loads(data)]
+
+    def _merged_content(self) -> SpilledContent:
+        """
+        返回按页码顺序从磁盘读取的内容序列
+
+        返回:
+            SpilledContent对象
+        """
+        return SpilledContent(self)
+
+    def _find_page_title(self, page: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        返回页面添加时提取的页面标题信息
+
+        参数:
+            page: pages列表中的页面字典
+
+        返回:
+            页面标题信息，页面没有标题时返回None
+        """
+        return page['page_title']
+
+    def close(self) -> None:
+        """
+        关闭并删除临时文件
+        """
+        with self._lock:
+            self._file.close()
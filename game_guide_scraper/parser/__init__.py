@@ -2,5 +2,11 @@
 解析器模块，用于从HTML中提取有用信息。
 """
 from game_guide_scraper.parser.parser import Parser
+from game_guide_scraper.parser.page import ParsedPage
+from game_guide_scraper.parser.items import (
+    ContentItem, TextItem, ImageItem, HeadingItem, ListItem, TableItem, CodeItem, QuoteItem,
+    content_item, content_items
+)
 
-__all__ = ['Parser']
\ No newline at end of file
+__all__ = ['Parser', 'ParsedPage', 'ContentItem', 'TextItem', 'ImageItem', 'HeadingItem', 'ListItem',
+           'TableItem', 'CodeItem', 'QuoteItem', 'content_item', 'content_items']
\ No newline at end of file
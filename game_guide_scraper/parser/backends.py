@@ -0,0 +1,148 @@
+"""
+HTML解析后端模块，管理BeautifulSoup可用的树构建器，并支持通过微基准测试自动选择最快的后端。
+"""
+import time
+import threading
+import importlib.util
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+# 默认后端，纯Python实现，无需额外依赖
+DEFAULT_BACKEND = 'html.parser'
+
+# 后端名称 -> (BeautifulSoup的features参数, 依赖的模块名)
+PARSER_BACKENDS = {
+    'html.parser': ('html.parser', None),
+    'lxml': ('lxml', 'lxml'),
+}
+
+_auto_backend = None
+_auto_lock = threading.Lock()
+
+
+def register_backend(name: str, features: str, module: Optional[str] = None) -> None:
+    """
+    注册一个新的解析后端
+
+    参数:
+        name: 后端名称
+        features: 传给BeautifulSoup的features参数（树构建器名称）
+        module: 后端依赖的模块名，用于检查是否已安装；为None表示无额外依赖
+    """
+    global _auto_backend
+    PARSER_BACKENDS[name] = (features, module)
+    # 新后端可能更快，清除自动选择的缓存结果
+    _auto_backend = None
+
+
+def is_available(name: str) -> bool:
+    """
+    检查后端是否可用
+
+    参数:
+        name: 后端名称
+
+    返回:
+        后端已注册且其依赖模块已安装时返回True
+    """
+    if name not in PARSER_BACKENDS:
+        return False
+    module = PARSER_BACKENDS[name][1]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def available_backends() -> List[str]:
+    """
+    返回当前环境中可用的后端名称列表
+    """
+    return [name for name in PARSER_BACKENDS if is_available(name)]
+
+
+def get_features(name: str) -> str:
+    """
+    返回后端对应的BeautifulSoup features参数
+
+    参数:
+        name: 后端名称
+    """
+    return PARSER_BACKENDS[name][0]
+
+
+def _sample_html(paragraphs: int = 200) -> str:
+    """
+    生成用于微基准测试的示例页面，结构与游民星空攻略页面类似
+
+    参数:
+        paragraphs: 段落数量
+    """
+    body = []
+    for i in range(paragraphs):
+        body.append(f'<p>第{i}段：这是攻略正文内容，介绍了关卡流程与BOSS打法。</p>')
+        if i % 5 == 0:
+            body.append(f'<p align="center"><a href="#"><img src="https://img1.gamersky.com/{i}_S.jpg" alt="截图{i}"></a></p>')
+    return (
+        '<html><head><title>黑神话悟空攻略 - 游民星空</title></head><body>'
+        '<div class="header"><div class="nav">导航</div></div>'
+        '<div class="Mid2L_con"><h1>黑神话悟空攻略</h1>' + ''.join(body) +
+        '<a href="2.shtml">下一页</a></div>'
+        '<div class="footer">版权信息</div><script>var a = 1;</script></body></html>'
+    )
+
+
+def benchmark_backends(html: Optional[str] = None, rounds: int = 3) -> Dict[str, float]:
+    """
+    对所有可用后端进行微基准测试
+
+    参数:
+        html: 用于测试的HTML内容，为None时使用内置的示例页面
+        rounds: 每个后端的测试轮数，取最短耗时
+
+    返回:
+        后端名称到单次解析耗时（秒）的映射
+    """
+    html = html or _sample_html()
+    results = {}
+    for name in available_backends():
+        features = get_features(name)
+        best = None
+        try:
+            for _ in range(rounds):
+                start = time.perf_counter()
+                BeautifulSoup(html, features)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+        except Exception as e:
+            print(f"解析后端 {name} 测试失败: {e}")
+            continue
+        results[name] = best
+    return results
+
+
+def select_backend(name: Optional[str] = None) -> str:
+    """
+    解析后端名称
+
+    参数:
+        name: 后端名称；为'auto'时通过微基准测试选择最快的可用后端（结果在进程内缓存），
+              为None时使用默认后端
+
+    返回:
+        实际使用的后端名称；指定的后端不可用时回退到默认后端
+    """
+    global _auto_backend
+
+    if not name:
+        return DEFAULT_BACKEND
+
+    if name == 'auto':
+        with _auto_lock:
+            if _auto_backend is None:
+                timings = benchmark_backends()
+                _auto_backend = min(timings, key=timings.get) if timings else DEFAULT_BACKEND
+            return _auto_backend
+
+    if not is_available(name):
+        print(f"警告: 解析后端 {name} 不可用，使用 {DEFAULT_BACKEND}")
+        return DEFAULT_BACKEND
+    return name
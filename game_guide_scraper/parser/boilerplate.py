@@ -0,0 +1,111 @@
+"""
+无用元素移除模块，将过滤选择器编译为单个匹配器，一次遍历移除广告、导航栏等元素。
+"""
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+from bs4 import BeautifulSoup, Tag
+
+
+class BoilerplateMatcher:
+    """
+    无用元素匹配器
+
+    形如'tag'、'tag.class'、'.class'的简单选择器被编译为按标签名和class索引的查找表，
+    一次遍历即可判断每个元素是否需要移除；匹配的子树直接摘除，不再向下遍历。
+    其他复杂选择器回退为soup.select逐个处理。
+
+    属性:
+        selectors: 过滤选择器元组
+        removed: 每个选择器累计移除的元素数量
+    """
+
+    # 简单选择器：可选的标签名加可选的单个class
+    SIMPLE_SELECTOR = re.compile(r'^([a-zA-Z][\w-]*)?(?:\.([\w-]+))?$')
+
+    def __init__(self, selectors: Iterable[str]):
+        """
+        初始化匹配器
+
+        参数:
+            selectors: CSS选择器列表
+        """
+        self.selectors = tuple(selectors)
+        self.removed = Counter()
+        self._lock = threading.Lock()
+
+        # 标签名 -> 选择器序号（只有标签名的规则）
+        self._tag_rules = {}
+        # class -> [(标签名或None, 选择器序号)]
+        self._class_rules = {}
+        # 无法编译的复杂选择器
+        self._complex_selectors = []
+
+        for index, selector in enumerate(self.selectors):
+            match = self.SIMPLE_SELECTOR.match(selector.strip())
+            if not match or not any(match.groups()):
+                self._complex_selectors.append(selector)
+                continue
+            tag_name, class_name = match.groups()
+            tag_name = tag_name.lower() if tag_name else None
+            if class_name:
+                self._class_rules.setdefault(class_name, []).append((tag_name, index))
+            else:
+                self._tag_rules.setdefault(tag_name, index)
+
+    def match(self, element: Tag) -> Optional[str]:
+        """
+        判断元素是否需要移除
+
+        参数:
+            element: 要检查的元素
+
+        返回:
+            匹配的选择器（多个规则同时匹配时取配置中靠前的），不匹配时返回None
+        """
+        best = self._tag_rules.get(element.name)
+        if self._class_rules:
+            classes = element.get('class')
+            if classes:
+                for class_name in classes:
+                    for tag_name, index in self._class_rules.get(class_name, ()):
+                        if (tag_name is None or tag_name == element.name) and (best is None or index < best):
+                            best = index
+        return self.selectors[best] if best is not None else None
+
+    def strip(self, soup: BeautifulSoup) -> Dict[str, int]:
+        """
+        一次遍历移除所有匹配的元素
+
+        参数:
+            soup: BeautifulSoup对象，会被原地修改
+
+        返回:
+            本次每个选择器移除的元素数量
+        """
+        counts = Counter()
+
+        stack = [soup]
+        while stack:
+            node = stack.pop()
+            for child in list(node.contents):
+                if not isinstance(child, Tag):
+                    continue
+                selector = self.match(child)
+                if selector is not None:
+                    # 整个子树直接摘除，不再遍历其中的元素
+                    child.extract()
+                    counts[selector] += 1
+                else:
+                    stack.append(child)
+
+        for selector in self._complex_selectors:
+            for element in soup.select(selector):
+                element.decompose()
+                counts[selector] += 1
+
+        with self._lock:
+            self.removed.update(counts)
+        return dict(counts)
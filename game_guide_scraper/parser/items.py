@@ -0,0 +1,282 @@
+"""
+内容元素模块，定义解析器、内容组织器和Markdown生成器共用的内容元素类型。
+"""
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+
+# 元素类型 -> 内容元素类
+ITEM_TYPES: Dict[str, type] = {}
+
+
+class ContentItem(MutableMapping):
+    """
+    内容元素基类
+
+    每种元素类型是一个使用__slots__的子类，字段固定，比同样内容的字典占用更少的内存。
+    元素同时实现可变映射协议，可以像原来的字典一样使用item['url']、item.get('type')、
+    'local_path' in item和item['local_path'] = path；值为None的字段视为不存在。
+    ListItem的items字段与映射协议的items方法同名，需要键值对时使用to_dict()。
+    写入元素类型没有的字段时抛出KeyError，因此各模块之间不会出现字段名不一致的元素。
+
+    属性:
+        type: 元素类型（类属性）
+    """
+
+    __slots__ = ()
+    type = ''
+    # 字段名（子类的__slots__），也是构造函数的参数顺序和to_dict的键顺序
+    _fields = ()
+    _field_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(cls.__slots__)
+        cls._field_set = frozenset(cls._fields)
+        ITEM_TYPES[cls.type] = cls
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        elif key == 'type':
+            return self.type
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self._field_set:
+            raise KeyError(f"{self.type}元素没有字段: {key}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._field_set or getattr(self, key) is None:
+            raise KeyError(key)
+        setattr(self, key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        yield 'type'
+        for field in self._fields:
+            if getattr(self, field) is not None:
+                yield field
+
+    def __len__(self) -> int:
+        return 1 + sum(1 for field in self._fields if getattr(self, field) is not None)
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._field_set:
+            return getattr(self, key) is not None
+        return key == 'type'
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # 渲染时每个元素要读取多个字段，直接读取属性而不经过__getitem__和KeyError
+        if key in self._field_set:
+            value = getattr(self, key)
+            return default if value is None else value
+        if key == 'type':
+            return self.type
+        return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        转换为字典
+
+        返回:
+            包含type和所有值不为None的字段的字典
+        """
+        # 不使用self.items()：ListItem的items字段会覆盖映射协议的items方法
+        data = {'type': self.type}
+        for field in self._fields:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ContentItem):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == {key: other[key] for key in other}
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # 按字段顺序保存值，pickle数据中不包含字段名
+        return self.__class__, tuple(getattr(self, field) for field in self._fields)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{field}={getattr(self, field)!r}" for field in self._fields
+                           if getattr(self, field) is not None)
+        return f"{self.__class__.__name__}({fields})"
+
+
+class TextItem(ContentItem):
+    """
+    文本段落
+
+    属性:
+        value: 文本内容
+    """
+
+    __slots__ = ('value',)
+    type = 'text'
+
+    def __init__(self, value: str = ''):
+        self.value = value
+
+
+class ImageItem(ContentItem):
+    """
+    图片
+
+    属性:
+        url: 图片URL（游民星空的图片总是指向原图）
+        alt: 图片描述
+        thumbnail_url: 缩略图URL，没有时为None
+        local_path: 下载后的本地路径，未下载时为None
+        relative_path: 本地文件名，由内容组织器根据local_path填写
+        source_url: 实际下载的地址（来源选择器选择了url以外的地址时由下载器填写，如缩略图）
+    """
+
+    # source_url放在最后，已写入解析结果缓存的元素按位置恢复时字段不错位
+    __slots__ = ('url', 'alt', 'thumbnail_url', 'local_path', 'relative_path', 'source_url')
+    type = 'image'
+
+    def __init__(self, url: str = '', alt: str = '', thumbnail_url: Optional[str] = None,
+                 local_path: Optional[str] = None, relative_path: Optional[str] = None,
+                 source_url: Optional[str] = None):
+        self.url = url
+        self.alt = alt
+        self.thumbnail_url = thumbnail_url
+        self.local_path = local_path
+        self.relative_path = relative_path
+        self.source_url = source_url
+
+
+class HeadingItem(ContentItem):
+    """
+    标题
+
+    属性:
+        value: 标题文本
+        level: 标题级别（h1-h6对应1-6）
+        id: 锚点id，没有时为None
+    """
+
+    __slots__ = ('value', 'level', 'id')
+    type = 'heading'
+
+    def __init__(self, value: str = '', level: int = 3, id: Optional[str] = None):
+        self.value = value
+        self.level = level
+        self.id = id
+
+
+class ListItem(ContentItem):
+    """
+    列表
+
+    属性:
+        items: 列表项文本列表
+        ordered: 是否为有序列表
+    """
+
+    __slots__ = ('items', 'ordered')
+    type = 'list'
+
+    def __init__(self, items: Optional[List[str]] = None, ordered: bool = False):
+        self.items = items if items is not None else []
+        self.ordered = ordered
+
+
+class TableItem(ContentItem):
+    """
+    表格
+
+    属性:
+        headers: 表头单元格文本列表
+        rows: 数据行列表，每行的单元格数与表头相同
+    """
+
+    __slots__ = ('headers', 'rows')
+    type = 'table'
+
+    def __init__(self, headers: Optional[List[str]] = None, rows: Optional[List[List[str]]] = None):
+        self.headers = headers if headers is not None else []
+        self.rows = rows if rows is not None else []
+
+
+class CodeItem(ContentItem):
+    """
+    代码块
+
+    属性:
+        value: 代码内容
+        language: 代码语言，没有时为None
+    """
+
+    __slots__ = ('value', 'language')
+    type = 'code'
+
+    def __init__(self, value: str = '', language: Optional[str] = None):
+        self.value = value
+        self.language = language
+
+
+class QuoteItem(ContentItem):
+    """
+    引用
+
+    属性:
+        value: 引用内容，多行之间以换行符分隔
+    """
+
+    __slots__ = ('value',)
+    type = 'quote'
+
+    def __init__(self, value: str = ''):
+        self.value = value
+
+
+def content_item(data: Mapping, strict: bool = True) -> ContentItem:
+    """
+    将字典形式的内容元素转换为对应类型的内容元素
+
+    参数:
+        data: 内容元素字典（如从抓取日志读取的JSON），已经是ContentItem时原样返回
+        strict: 为True时包含该类型没有的字段的字典抛出ValueError，为False时忽略这些字段
+
+    返回:
+        内容元素对象
+
+    异常:
+        ValueError: 元素类型未知，或strict为True时包含该类型没有的字段
+    """
+    if isinstance(data, ContentItem):
+        return data
+    item_type = data.get('type')
+    cls = ITEM_TYPES.get(item_type)
+    if cls is None:
+        raise ValueError(f"未知的内容元素类型: {item_type!r}")
+    if not strict:
+        return cls(**{key: value for key, value in data.items() if key in cls._field_set})
+    fields = dict(data)
+    del fields['type']
+    try:
+        return cls(**fields)
+    except TypeError:
+        unknown = fields.keys() - cls._field_set
+        raise ValueError(f"{item_type}元素没有字段: {', '.join(sorted(unknown))}") from None
+
+
+def content_items(data: Iterable[Mapping]) -> List[ContentItem]:
+    """
+    将内容元素字典列表转换为内容元素列表
+
+    参数:
+        data: 内容元素字典的可迭代对象
+
+    返回:
+        内容元素列表
+    """
+    return [content_item(item) for item in data]
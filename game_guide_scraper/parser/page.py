@@ -0,0 +1,63 @@
+"""
+解析结果模块，定义单个页面一次解析后得到的全部信息。
+"""
+from typing import Dict, List, Optional, Any
+
+
+class ParsedPage:
+    """
+    单个页面的解析结果，由Parser.parse_page一次解析生成，
+    同时携带标题、内容元素、下一页URL和页面索引，供控制器直接使用。
+
+    属性:
+        url: 页面URL
+        title: 页面标题
+        content: 内容元素（ContentItem对象）列表，如果内容解析失败则为None
+        next_url: 下一页的URL，没有下一页时为None
+        page_index: 从当前页面开始的页面索引列表，没有提取或没有索引时为空列表
+    """
+
+    def __init__(self, url: str, title: Optional[str], content: Optional[List[Dict[str, Any]]],
+                 next_url: Optional[str] = None, page_index: Optional[List[Dict[str, Any]]] = None):
+        """
+        初始化解析结果
+
+        参数:
+            url: 页面URL
+            title: 页面标题
+            content: 内容元素列表，如果内容解析失败则为None
+            next_url: 下一页的URL
+            page_index: 页面索引列表
+        """
+        self.url = url
+        self.title = title
+        self.content = content
+        self.next_url = next_url
+        self.page_index = page_index or []
+
+    @property
+    def ok(self) -> bool:
+        """内容是否解析成功"""
+        return self.content is not None
+
+    def to_dict(self, page_number: Optional[int] = None) -> Dict[str, Any]:
+        """
+        转换为内容组织器使用的页面内容字典
+
+        参数:
+            page_number: 页码，为None时不写入page_number字段
+
+        返回:
+            包含url、title、content（以及page_number）字段的字典
+        """
+        page = {
+            'title': self.title,
+            'content': self.content,
+            'url': self.url
+        }
+        if page_number is not None:
+            page['page_number'] = page_number
+        return page
+
+    def __repr__(self) -> str:
+        return f"ParsedPage(url={self.url!r}, title={self.title!r}, next_url={self.next_url!r})"
@@ -0,0 +1,122 @@
+"""
+解析结果缓存模块，按页面URL和HTML内容的哈希保存解析结果，解析规则变化时自动失效。
+"""
+import os
+import zlib
+import pickle
+import hashlib
+import threading
+from typing import Dict, Optional, Any
+
+from game_guide_scraper.parser.page import ParsedPage
+
+
+class ParseCache:
+    """
+    基于磁盘的解析结果缓存
+
+    缓存键为sha256(URL + HTML + 是否提取页面索引)，每个页面保存为<key[:2]>/<key>.pkl.z，
+    内容是zlib压缩的pickle数据(规则指纹, 标题, 内容元素, 下一页URL, 页面索引)。
+    读取时规则指纹（见Parser.rules_fingerprint）与当前解析器不一致则视为未命中，重新解析后覆盖，
+    因此修改选择器、过滤关键词、解析后端或解析器版本后缓存自动失效。
+
+    缓存文件使用pickle，只应读取本程序自己写入的缓存目录。
+
+    属性:
+        cache_dir: 缓存目录
+        hits: 命中次数
+        misses: 未命中次数（包括规则指纹不一致）
+    """
+
+    def __init__(self, cache_dir: str):
+        """
+        初始化解析结果缓存
+
+        参数:
+            cache_dir: 缓存目录，不存在时自动创建
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, html: str, with_index: bool = False) -> str:
+        """
+        计算缓存键
+
+        参数:
+            url: 页面URL（解析相对链接时使用，因此是键的一部分）
+            html: 页面的HTML内容
+            with_index: 是否提取了页面索引
+        """
+        digest = hashlib.sha256()
+        digest.update(url.encode('utf-8'))
+        digest.update(b'\0' + (b'1' if with_index else b'0') + b'\0')
+        digest.update(html.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl.z")
+
+    def get(self, url: str, html: str, with_index: bool, fingerprint: str) -> Optional[ParsedPage]:
+        """
+        读取缓存的解析结果
+
+        参数:
+            url: 页面URL
+            html: 页面的HTML内容
+            with_index: 是否提取页面索引
+            fingerprint: 当前解析规则的指纹
+
+        返回:
+            新的ParsedPage对象（每次读取都是独立的副本），未命中时返回None
+        """
+        try:
+            with open(self._path(self.key(url, html, with_index)), 'rb') as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, EOFError, zlib.error, pickle.UnpicklingError):
+            entry = None
+
+        if not entry or entry[0] != fingerprint:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        _, title, content, next_url, page_index = entry
+        return ParsedPage(url, title, content, next_url, page_index)
+
+    def put(self, html: str, with_index: bool, fingerprint: str, page: ParsedPage) -> None:
+        """
+        保存解析结果（先写入临时文件再替换，并发写入同一页面时不会留下不完整的文件）
+
+        参数:
+            html: 页面的HTML内容
+            with_index: 是否提取了页面索引
+            fingerprint: 当前解析规则的指纹
+            page: 解析结果
+        """
+        path = self._path(self.key(page.url, html, with_index))
+        entry = (fingerprint, page.title, page.content, page.next_url, page.page_index)
+        data = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"保存解析缓存失败: {page.url}, 错误: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回缓存统计信息
+
+        返回:
+            包含hits和misses的字典
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
@@ -1,21 +1,59 @@
 """
 解析器模块，用于从HTML中提取有用信息，如文本、图片等。
 """
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import re
-from urllib.parse import urljoin
+import json
+import hashlib
+from urllib.parse import urljoin, urldefrag
 from typing import Dict, List, Optional, Any
 
+from game_guide_scraper.parser.page import ParsedPage
+from game_guide_scraper.parser.items import (
+    ContentItem, TextItem, ImageItem, HeadingItem, ListItem, TableItem
+)
+from game_guide_scraper.parser.backends import select_backend, get_features
+from game_guide_scraper.parser.text_filter import TextFilter
+from game_guide_scraper.parser.boilerplate import BoilerplateMatcher
+
+# 作为整体输出、不再向下遍历的块级元素（div只有在子树中不包含其他块级元素时才作为块级元素，
+# 否则其中的标题、列表和表格会被合并成一段文本）
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+_BLOCK_TAGS = frozenset(('p', 'div', 'table', 'ul', 'ol') + _HEADING_TAGS)
+
+# 子树结构标记位
+_HAS_BLOCK = 1
+_HAS_IMG = 2
+
+# 解析器版本，提取逻辑或内容元素格式变化时递增，使解析结果缓存失效
+PARSER_VERSION = 2
+
 
 class Parser:
     """
-    HTML内容解析器，负责从HTML中提取标题、正文、图片URL等信息。
+    HTML内容解析器，负责从HTML中提取标题、正文、图片URL、下一页链接等信息。
     """
     
-    def __init__(self):
+    # 页面索引条目格式，如"第1页：小妖-第一回-狼斥候"
+    PAGE_ENTRY_PATTERN = re.compile(r'^第(\d+)页[：:]\s*(.*)$')
+    
+    def __init__(self, backend: Optional[str] = None, extra_filter_keywords: Optional[List[str]] = None,
+                 parse_cache=None):
         """
         初始化解析器
+        
+        参数:
+            backend: HTML解析后端名称（如'html.parser'、'lxml'），
+                     为'auto'时通过微基准测试自动选择，为None时使用默认的html.parser
+            extra_filter_keywords: 额外的文本过滤关键词，追加到默认关键词之后
+            parse_cache: 解析结果缓存（ParseCache对象），为None时不缓存
         """
+        self.parse_cache = parse_cache
+        
+        # HTML解析后端
+        self.backend = select_backend(backend)
+        self.features = get_features(self.backend)
+        
         # 定义可能包含主要内容的CSS选择器
         self.content_selectors = [
             'div.Mid2L_con',  # 游民星空攻略内容区域
@@ -25,7 +63,7 @@ class Parser:
             'div.main-content'
         ]
         
-        # 定义需要过滤的元素选择器
+        # 定义需要过滤的元素选择器（赋值时编译为BoilerplateMatcher）
         self.filter_selectors = [
             'div.adsbygoogle',
             'div.advertisement',
@@ -41,7 +79,7 @@ class Parser:
             'iframe'
         ]
         
-        # 定义需要过滤的文本内容关键词
+        # 定义需要过滤的文本内容关键词（赋值时预编译为TextFilter）
         self.filter_keywords = [
             '更多相关内容请关注',
             '责任编辑',
@@ -53,7 +91,27 @@ class Parser:
             '文章内容导航',
             '上一页',
             '下一页',
-        ]
+        ] + list(extra_filter_keywords or [])
+        
+    @property
+    def filter_keywords(self) -> List[str]:
+        """文本过滤关键词列表（返回副本，修改后需要重新赋值才能生效）"""
+        return list(self.text_filter.keywords)
+        
+    @filter_keywords.setter
+    def filter_keywords(self, keywords: List[str]) -> None:
+        # 关键词变化时重新编译过滤器
+        self.text_filter = TextFilter(keywords)
+        
+    @property
+    def filter_selectors(self) -> List[str]:
+        """需要过滤的元素选择器列表（返回副本，修改后需要重新赋值才能生效）"""
+        return list(self.boilerplate.selectors)
+        
+    @filter_selectors.setter
+    def filter_selectors(self, selectors: List[str]) -> None:
+        # 选择器变化时重新编译匹配器
+        self.boilerplate = BoilerplateMatcher(selectors)
         
     def parse_content(self, html: str) -> Optional[Dict[str, Any]]:
         """
@@ -67,8 +125,8 @@ class Parser:
             {
                 'title': '页面标题',
                 'content': [
-                    {'type': 'text', 'value': '文本内容'},
-                    {'type': 'image', 'url': '图片URL', 'alt': '图片描述'}
+                    TextItem('文本内容'),
+                    ImageItem('图片URL', '图片描述')
                 ]
             }
             如果解析失败，返回None
@@ -77,7 +135,7 @@ class Parser:
             return None
             
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = self.make_soup(html)
             
             # 移除不需要的元素
             self._remove_unwanted_elements(soup)
@@ -97,16 +155,183 @@ class Parser:
             print(f"解析HTML内容时出错: {e}")
             return None
             
-    def _remove_unwanted_elements(self, soup: BeautifulSoup) -> None:
+    def rules_fingerprint(self) -> str:
+        """
+        返回解析规则的指纹，包括解析器版本、解析后端、内容选择器、过滤选择器和过滤关键词
+        
+        返回:
+            sha256十六进制字符串，任何一项变化时指纹随之变化
+        """
+        rules = [PARSER_VERSION, self.backend, self.content_selectors, self.filter_selectors, self.filter_keywords]
+        return hashlib.sha256(json.dumps(rules, ensure_ascii=False).encode('utf-8')).hexdigest()
+        
+    def make_soup(self, html: str) -> BeautifulSoup:
+        """
+        使用当前解析后端构建DOM
+        
+        参数:
+            html: 页面的HTML内容
+            
+        返回:
+            BeautifulSoup对象
+        """
+        return BeautifulSoup(html, self.features)
+        
+    def parse_page(self, html: str, url: str, with_index: bool = False) -> Optional[ParsedPage]:
+        """
+        一次解析页面HTML，同时提取标题、内容、下一页URL和页面索引
+        
+        参数:
+            html: 页面的HTML内容
+            url: 页面URL，用于处理相对链接
+            with_index: 是否提取页面索引（通常只在首页需要）
+            
+        返回:
+            ParsedPage对象；如果HTML为空或无法解析，返回None。
+            内容提取失败时仍返回ParsedPage，其content为None，next_url仍然可用。
+            配置了解析结果缓存时，相同URL、HTML和解析规则的页面直接从缓存读取
+        """
+        if not html:
+            return None
+        
+        fingerprint = None
+        if self.parse_cache is not None:
+            fingerprint = self.rules_fingerprint()
+            page = self.parse_cache.get(url, html, with_index, fingerprint)
+            if page is not None:
+                return page
+            
+        try:
+            soup = self.make_soup(html)
+        except Exception as e:
+            print(f"解析HTML内容时出错: {e}")
+            return None
+            
+        # 链接和页面索引需要在移除导航等元素之前提取
+        next_url = self.extract_next_page_url(soup, url)
+        page_index = self.extract_page_index(soup, url) if with_index else []
+        
+        try:
+            self._remove_unwanted_elements(soup)
+            title = self.extract_title(soup)
+            content = self.extract_content(soup)
+        except Exception as e:
+            print(f"解析HTML内容时出错: {e}")
+            title, content = None, None
+            
+        page = ParsedPage(url, title, content, next_url, page_index)
+        if self.parse_cache is not None:
+            self.parse_cache.put(html, with_index, fingerprint, page)
+        return page
+        
+    def extract_next_page_url(self, soup: BeautifulSoup, base_url: str) -> Optional[str]:
+        """
+        从HTML中提取"下一页"的URL
+        
+        参数:
+            soup: BeautifulSoup对象
+            base_url: 当前页面的URL
+            
+        返回:
+            下一页的URL，如果没有下一页则返回None
+        """
+        # 查找包含"下一页"文本的链接
+        # 针对游戏攻略网站的特定结构进行查找
+        next_link = soup.find('a', string='下一页')
+        if not next_link:
+            # 尝试其他可能的"下一页"链接模式
+            next_link = soup.find('a', string=lambda t: t and '下一页' in t)
+            
+        if not next_link:
+            # 尝试查找带有特定class的下一页链接
+            next_link = soup.find('a', class_=lambda c: c and ('next' in c.lower() or 'nextpage' in c.lower()))
+            
+        # 如果找到了下一页链接
+        if next_link and 'href' in next_link.attrs:
+            next_url = next_link['href']
+            
+            # 处理相对URL，转换为绝对URL
+            if not next_url.startswith(('http://', 'https://')):
+                next_url = urljoin(base_url, next_url)
+                
+            # 循环检测：如果下一页URL与当前页面URL相同，则认为没有下一页
+            if next_url == base_url:
+                print(f"检测到循环链接: {next_url}")
+                return None
+                
+            # 记录找到的下一页URL
+            print(f"找到下一页链接: {next_url}")
+            return next_url
+            
+        # 没有找到下一页链接
+        print("未找到下一页链接")
+        return None
+        
+    def extract_page_index(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
+        """
+        从"文章内容导航"中提取攻略的完整页面列表
+        
+        参数:
+            soup: BeautifulSoup对象
+            base_url: 当前页面的URL
+            
+        返回:
+            从当前页面开始、按页码排序的页面列表，每个元素包含page_number、title和url；
+            如果页面中没有可用的页面索引，则返回空列表
+        """
+        entries = {}
+        
+        # 导航中的其他页面以链接形式给出
+        for link in soup.find_all('a', href=True):
+            match = self.PAGE_ENTRY_PATTERN.match(link.get_text(strip=True))
+            if match:
+                page_number = int(match.group(1))
+                url = urljoin(base_url, link['href'])
+                entries.setdefault(page_number, {
+                    'page_number': page_number,
+                    'title': match.group(2).strip(),
+                    'url': urldefrag(url)[0]
+                })
+                
+        if not entries:
+            return []
+            
+        # 当前页面通常不是链接，以纯文本形式出现
+        current_url = urldefrag(base_url)[0]
+        if current_url not in {entry['url'] for entry in entries.values()}:
+            for text in soup.find_all(string=re.compile(r'^\s*第\d+页[：:]')):
+                if text.find_parent('a') is not None:
+                    continue
+                match = self.PAGE_ENTRY_PATTERN.match(text.strip())
+                if match and int(match.group(1)) not in entries:
+                    page_number = int(match.group(1))
+                    entries[page_number] = {
+                        'page_number': page_number,
+                        'title': match.group(2).strip(),
+                        'url': current_url
+                    }
+                    break
+                
+        page_index = [entries[number] for number in sorted(entries)]
+        
+        # 当前页面必须出现在索引中，否则无法确定从哪一页开始
+        urls = [entry['url'] for entry in page_index]
+        if len(page_index) < 2 or current_url not in urls:
+            return []
+            
+        return page_index[urls.index(current_url):]
+        
+    def _remove_unwanted_elements(self, soup: BeautifulSoup) -> Dict[str, int]:
         """
-        移除不需要的HTML元素，如广告、导航栏等
+        移除不需要的HTML元素，如广告、导航栏等（一次遍历完成，匹配的子树整体摘除）
         
         参数:
             soup: BeautifulSoup对象
+            
+        返回:
+            每个选择器移除的元素数量，累计值见self.boilerplate.removed
         """
-        for selector in self.filter_selectors:
-            for element in soup.select(selector):
-                element.decompose()
+        return self.boilerplate.strip(soup)
                 
     def extract_title(self, soup: BeautifulSoup) -> str:
         """
@@ -143,76 +368,129 @@ class Parser:
             
         return "未知标题"
         
-    def extract_content(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _find_main_content(self, soup: BeautifulSoup) -> Optional[Tag]:
         """
-        从HTML中提取正文内容，包括文本和图片
+        查找页面的主要内容区域
         
         参数:
             soup: BeautifulSoup对象
             
         返回:
-            内容元素列表，每个元素是一个字典，包含类型和值
+            主要内容区域的元素，如果没有找到则使用body，仍然没有时返回None
         """
-        content = []
-        
-        # 找到主要内容区域
-        main_content = None
         for selector in self.content_selectors:
             main_content = soup.select_one(selector)
             if main_content:
-                break
+                return main_content
                 
         # 如果没有找到主要内容区域，使用body作为备用
-        if not main_content:
-            main_content = soup.body
+        return soup.body
+        
+    def _scan_structure(self, root: Tag) -> Dict[int, int]:
+        """
+        一次遍历计算每个元素的子树中是否包含块级元素（_BLOCK_TAGS）和图片
+        
+        按文档顺序的逆序遍历时，每个元素的后代都先于元素本身出现，
+        因此只需合并直接子元素的标记，整体为线性时间。
+        
+        参数:
+            root: 根元素
+            
+        返回:
+            元素id到标记位（_HAS_BLOCK、_HAS_IMG）的映射
+        """
+        flags = {}
+        for node in reversed(list(root.descendants)):
+            if not isinstance(node, Tag):
+                continue
+            node_flags = 0
+            for child in node.contents:
+                if isinstance(child, Tag):
+                    node_flags |= flags[id(child)]
+                    if child.name in _BLOCK_TAGS:
+                        node_flags |= _HAS_BLOCK
+                    elif child.name == 'img':
+                        node_flags |= _HAS_IMG
+            flags[id(node)] = node_flags
+        return flags
+        
+    def extract_content(self, soup: BeautifulSoup) -> List[ContentItem]:
+        """
+        从HTML中提取正文内容，包括文本和图片
+        
+        按文档顺序单次遍历主要内容区域：段落、标题、列表、表格和不含块级子元素的div
+        作为一个整体输出，不再向下遍历；其他元素作为容器继续遍历其子元素。
+        每个文本块和图片只输出一次，块内的图片先于块本身输出，整体为线性时间。
+        
+        参数:
+            soup: BeautifulSoup对象
             
+        返回:
+            内容元素列表（ContentItem对象）
+        """
+        content = []
+        
+        # 找到主要内容区域
+        main_content = self._find_main_content(soup)
         if not main_content:
             return content
             
-        # 提取内容元素
-        for element in main_content.find_all(['p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'img', 'table', 'ul', 'ol']):
-            # 跳过空元素
-            if not element.text.strip() and not element.find('img'):
+        flags = self._scan_structure(main_content)
+        
+        # 使用显式栈按文档顺序遍历，避免深层嵌套时递归过深
+        stack = [child for child in reversed(main_content.contents) if isinstance(child, Tag)]
+        while stack:
+            element = stack.pop()
+            name = element.name
+            element_flags = flags[id(element)]
+            
+            # 处理图片
+            if name == 'img':
+                img_info = self._extract_image_info(element)
+                if img_info:
+                    content.append(img_info)
                 continue
                 
-            # 处理图片
-            if element.name == 'img' or element.find('img'):
-                img_elements = [element] if element.name == 'img' else element.find_all('img')
-                for img in img_elements:
+            # 容器元素：继续遍历子元素
+            if name not in _BLOCK_TAGS or (name == 'div' and element_flags & _HAS_BLOCK):
+                stack.extend(child for child in reversed(element.contents) if isinstance(child, Tag))
+                continue
+                
+            # 块级元素：先输出块内的图片
+            if element_flags & _HAS_IMG:
+                for img in element.find_all('img'):
                     img_info = self._extract_image_info(img)
                     if img_info:
                         content.append(img_info)
                         
             # 处理表格
-            elif element.name == 'table':
-                table_html = str(element)
-                content.append({'type': 'table', 'value': table_html})
-                
+            if name == 'table':
+                table = self._extract_table(element)
+                if table:
+                    content.append(table)
+                    
             # 处理列表
-            elif element.name in ['ul', 'ol']:
-                list_items = []
-                for li in element.find_all('li'):
-                    list_items.append(li.text.strip())
+            elif name in ('ul', 'ol'):
+                list_elements = element.find_all('li', recursive=False) or element.find_all('li')
+                list_items = [li.get_text().strip() for li in list_elements]
                 if list_items:
-                    list_type = 'ordered_list' if element.name == 'ol' else 'unordered_list'
-                    content.append({'type': list_type, 'value': list_items})
+                    content.append(ListItem(list_items, ordered=name == 'ol'))
                     
             # 处理标题
-            elif element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                heading_text = element.text.strip()
+            elif name in _HEADING_TAGS:
+                heading_text = element.get_text().strip()
                 if heading_text:
-                    heading_level = int(element.name[1])
-                    content.append({'type': 'heading', 'value': heading_text, 'level': heading_level})
+                    content.append(HeadingItem(heading_text, int(name[1])))
                     
             # 处理文本段落
-            elif element.name == 'p' or (element.name == 'div' and not element.find(['div', 'p'])):
-                text = element.text.strip()
+            else:
+                text = element.get_text().strip()
                 if text and not self._should_filter_text(text):
-                    content.append({'type': 'text', 'value': text})
+                    content.append(TextItem(text))
                     
         return content
         
-    def extract_images(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def extract_images(self, soup: BeautifulSoup) -> List[ImageItem]:
         """
         从HTML中提取图片URL和描述
         
@@ -220,21 +498,12 @@ class Parser:
             soup: BeautifulSoup对象
             
         返回:
-            图片信息列表，每个元素是一个字典，包含URL和描述
+            图片元素列表（ImageItem对象），包含URL和描述
         """
         images = []
         
         # 找到主要内容区域
-        main_content = None
-        for selector in self.content_selectors:
-            main_content = soup.select_one(selector)
-            if main_content:
-                break
-                
-        # 如果没有找到主要内容区域，使用body作为备用
-        if not main_content:
-            main_content = soup.body
-            
+        main_content = self._find_main_content(soup)
         if not main_content:
             return images
             
@@ -246,7 +515,7 @@ class Parser:
                 
         return images
         
-    def _extract_image_info(self, img_tag) -> Optional[Dict[str, Any]]:
+    def _extract_image_info(self, img_tag) -> Optional[ImageItem]:
         """
         从img标签中提取图片信息
         
@@ -254,7 +523,7 @@ class Parser:
             img_tag: img标签的BeautifulSoup对象
             
         返回:
-            图片信息字典，包含URL和描述，如果提取失败则返回None
+            图片元素，包含URL和描述（游民星空的缩略图还包含thumbnail_url），如果提取失败则返回None
         """
         # 尝试获取图片URL
         img_url = None
@@ -269,9 +538,13 @@ class Parser:
         # 处理游民星空的高清原图URL
         # 游民星空的缩略图URL格式：image001_S.jpg
         # 高清原图URL格式：image001.jpg
+        # url总是指向原图，缩略图地址记录在thumbnail_url中，由下载器根据图片质量选择下载哪一个
+        thumbnail_url = None
         if 'gamersky.com' in img_url and '_S.jpg' in img_url:
+            thumbnail_url = img_url
             img_url = img_url.replace('_S.jpg', '.jpg')
         elif 'gamersky.com' in img_url and '_S.png' in img_url:
+            thumbnail_url = img_url
             img_url = img_url.replace('_S.png', '.png')
             
         # 处理相对URL
@@ -298,7 +571,36 @@ class Parser:
         if any(filename in img_url.lower() for filename in filter_filenames):
             return None
                 
-        return {'type': 'image', 'url': img_url, 'alt': description}
+        return ImageItem(img_url, description, thumbnail_url)
+        
+    def _extract_table(self, table_tag: Tag) -> Optional[TableItem]:
+        """
+        从table标签中提取表头和数据行
+        
+        第一行作为表头（表格只有一行时表头为空）；单元格文本中的空白合并为一个空格，
+        竖线转义，各行补齐到相同的单元格数。
+        
+        参数:
+            table_tag: table标签的BeautifulSoup对象
+            
+        返回:
+            表格元素，如果表格中没有文本则返回None
+        """
+        rows = []
+        for tr in table_tag.find_all('tr'):
+            cells = [' '.join(cell.get_text().split()).replace('|', '\\|')
+                     for cell in tr.find_all(['th', 'td'], recursive=False)]
+            if any(cells):
+                rows.append(cells)
+                
+        if not rows:
+            return None
+            
+        width = max(len(row) for row in rows)
+        rows = [row + [''] * (width - len(row)) for row in rows]
+        if len(rows) == 1:
+            return TableItem([''] * width, rows)
+        return TableItem(rows[0], rows[1:])
     
     def _should_filter_text(self, text: str) -> bool:
         """
@@ -310,31 +612,4 @@ class Parser:
         返回:
             True表示应该过滤，False表示保留
         """
-        import re
-        
-        # 检查是否包含过滤关键词
-        for keyword in self.filter_keywords:
-            if keyword in text:
-                return True
-        
-        # 检查是否是单独的页面标题（如"第1页：小妖-第一回-狼斥候"）
-        # 这种格式应该保留，不过滤
-        single_page_pattern = r'^第\d+页：[^第]*$'
-        if re.match(single_page_pattern, text.strip()):
-            return False  # 保留单独的页面标题
-        
-        # 检查是否是包含多个页码的长列表
-        # 如果文本中包含多个"第X页："模式，则过滤掉
-        page_matches = re.findall(r'第\d+页：', text)
-        if len(page_matches) > 1:
-            return True  # 过滤包含多个页码的文本
-            
-        # 检查是否是长页码列表（包含很多页码信息的文本）
-        if len(text) > 200 and '第' in text and '页：' in text:
-            return True
-            
-        # 检查是否只包含数字和空格（可能是页码）
-        if re.match(r'^[\d\s]+$', text) and len(text.split()) > 3:
-            return True
-            
-        return False
\ No newline at end of file
+        return self.text_filter.should_filter(text)
\ No newline at end of file
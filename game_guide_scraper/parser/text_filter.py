@@ -0,0 +1,121 @@
+"""
+文本过滤器模块，将过滤关键词和页码规则预编译为正则表达式，用于快速判断文本是否应该被过滤。
+"""
+import re
+import time
+import threading
+from typing import Dict, Iterable, Any
+
+
+class TextFilter:
+    """
+    预编译的文本过滤器
+
+    所有关键词合并为一个正则表达式（按长度降序排列的多选分支），每段文本只需扫描一次，
+    耗时与关键词数量基本无关。过滤器在构建后不可变，关键词变化时应重新构建。
+
+    属性:
+        keywords: 过滤关键词元组（已去重）
+        calls: should_filter的调用次数
+        filtered: 被过滤的文本数量
+        total_time: should_filter的累计耗时（秒）
+    """
+
+    # 单独的页面标题（如"第1页：小妖-第一回-狼斥候"）应该保留
+    SINGLE_PAGE_PATTERN = re.compile(r'^第\d+页：[^第]*$')
+
+    # 页码标记，包含多个页码标记的文本是页码列表
+    PAGE_MARKER_PATTERN = re.compile(r'第\d+页：')
+
+    # 只包含数字和空格的文本（可能是页码）
+    DIGITS_PATTERN = re.compile(r'^[\d\s]+$')
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        初始化文本过滤器
+
+        参数:
+            keywords: 过滤关键词列表，文本中包含任意一个关键词即被过滤
+        """
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+        if self.keywords:
+            # 较长的关键词优先匹配，与逐个查找的结果一致（只关心是否命中）
+            alternatives = sorted(self.keywords, key=len, reverse=True)
+            self._keyword_pattern = re.compile('|'.join(re.escape(keyword) for keyword in alternatives))
+        else:
+            self._keyword_pattern = None
+
+        self.calls = 0
+        self.filtered = 0
+        self.total_time = 0.0
+        self._lock = threading.Lock()
+
+    def should_filter(self, text: str) -> bool:
+        """
+        判断文本是否应该被过滤掉，并记录调用耗时
+
+        参数:
+            text: 要检查的文本
+
+        返回:
+            True表示应该过滤，False表示保留
+        """
+        start = time.perf_counter()
+        result = self._match(text)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.calls += 1
+            self.total_time += elapsed
+            if result:
+                self.filtered += 1
+        return result
+
+    def _match(self, text: str) -> bool:
+        """
+        执行过滤规则
+
+        参数:
+            text: 要检查的文本
+
+        返回:
+            True表示应该过滤，False表示保留
+        """
+        # 检查是否包含过滤关键词
+        if self._keyword_pattern is not None and self._keyword_pattern.search(text):
+            return True
+
+        # 单独的页面标题应该保留
+        if self.SINGLE_PAGE_PATTERN.match(text.strip()):
+            return False
+
+        # 包含多个"第X页："模式的文本是页码列表，找到第二个即可判定
+        markers = self.PAGE_MARKER_PATTERN.finditer(text)
+        if next(markers, None) is not None and next(markers, None) is not None:
+            return True
+
+        # 检查是否是长页码列表（包含很多页码信息的文本）
+        if len(text) > 200 and '第' in text and '页：' in text:
+            return True
+
+        # 检查是否只包含数字和空格（可能是页码）
+        if self.DIGITS_PATTERN.match(text) and len(text.split()) > 3:
+            return True
+
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回过滤器的性能统计信息
+
+        返回:
+            包含keywords、calls、filtered、total_time和avg_time（秒）的字典
+        """
+        with self._lock:
+            return {
+                'keywords': len(self.keywords),
+                'calls': self.calls,
+                'filtered': self.filtered,
+                'total_time': self.total_time,
+                'avg_time': self.total_time / self.calls if self.calls else 0.0
+            }
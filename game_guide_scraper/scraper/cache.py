@@ -0,0 +1,302 @@
+"""
+页面缓存模块，将抓取到的页面压缩保存到磁盘，支持过期时间、条件请求重新验证和按大小淘汰。
+"""
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+from typing import Dict, Optional, Any
+
+# 各协议的默认端口，规范化URL时去掉
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonical_url(url: str) -> str:
+    """
+    规范化URL，作为缓存键
+
+    协议和主机名转为小写，去掉默认端口和片段（#后的部分），空路径补为'/'。
+
+    参数:
+        url: 原始URL
+
+    返回:
+        规范化后的URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+
+class CachedPage:
+    """
+    缓存中的一个页面
+
+    属性:
+        url: 规范化后的页面URL
+        body: 页面HTML内容
+        etag: 服务器返回的ETag，没有时为None
+        last_modified: 服务器返回的Last-Modified，没有时为None
+        stored_at: 保存（或最近一次重新验证）的时间戳
+        fresh: 是否仍在有效期内，有效期内无需访问网络
+    """
+
+    def __init__(self, url: str, body: str, etag: Optional[str], last_modified: Optional[str],
+                 stored_at: float, fresh: bool):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.fresh = fresh
+
+    def validators(self) -> Dict[str, str]:
+        """
+        返回重新验证时使用的条件请求头
+
+        返回:
+            包含If-None-Match和/或If-Modified-Since的字典，没有验证信息时为空字典
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """
+    基于磁盘的页面缓存
+
+    每个页面以规范化URL的sha256为文件名，正文gzip压缩保存为<key>.html.gz，
+    URL、ETag、Last-Modified和保存时间保存在<key>.json中。
+    总大小超过上限时按最近访问时间淘汰（最近访问时间记录为正文文件的修改时间，重启后仍然有效）。
+
+    属性:
+        cache_dir: 缓存目录
+        ttl: 有效期（秒），为None表示永不过期，为0表示每次都重新验证
+        max_bytes: 缓存总大小上限（字节，按压缩后大小计算），为None表示不限制
+        hits: 直接命中（无需访问网络）的次数
+        revalidated: 条件请求返回304、继续使用缓存的次数
+        misses: 缓存中没有页面的次数
+        stores: 写入缓存的次数
+        evictions: 被淘汰的页面数量
+    """
+
+    def __init__(self, cache_dir: str, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        """
+        初始化页面缓存，读取缓存目录中已有页面的大小和访问时间
+
+        参数:
+            cache_dir: 缓存目录，不存在时在第一次写入时创建
+            ttl: 有效期（秒），为None表示永不过期
+            max_bytes: 缓存总大小上限（字节），为None表示不限制
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        # 缓存键 -> 占用字节数，按最近访问时间从旧到新排列
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """扫描缓存目录，按正文文件的修改时间重建LRU顺序"""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        found = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.html.gz'):
+                continue
+            key = name[:-len('.html.gz')]
+            try:
+                body_stat = os.stat(self._body_path(key))
+                meta_size = os.path.getsize(self._meta_path(key))
+            except OSError:
+                continue
+            found.append((body_stat.st_mtime, key, body_stat.st_size + meta_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(canonical_url(url).encode('utf-8')).hexdigest()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.html.gz")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        读取缓存的页面
+
+        参数:
+            url: 页面URL
+
+        返回:
+            CachedPage对象，缓存中没有该页面或缓存文件损坏时返回None
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                with gzip.open(self._body_path(key), 'rt', encoding='utf-8') as f:
+                    body = f.read()
+            except (OSError, ValueError) as e:
+                print(f"读取页面缓存失败: {url}, 错误: {e}")
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._touch(key)
+            stored_at = meta.get('stored_at', 0)
+            fresh = self.ttl is None or time.time() - stored_at < self.ttl
+            if fresh:
+                self.hits += 1
+            return CachedPage(
+                url=meta.get('url', canonical_url(url)),
+                body=body,
+                etag=meta.get('etag'),
+                last_modified=meta.get('last_modified'),
+                stored_at=stored_at,
+                fresh=fresh
+            )
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        保存页面到缓存，必要时淘汰最久未访问的页面
+
+        参数:
+            url: 页面URL
+            body: 页面HTML内容
+            etag: 服务器返回的ETag
+            last_modified: 服务器返回的Last-Modified
+        """
+        key = self._key(url)
+        meta = {
+            'url': canonical_url(url),
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': time.time()
+        }
+        data = gzip.compress(body.encode('utf-8'))
+        meta_data = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # 先写临时文件再替换，避免中断时留下不完整的缓存
+                self._write_atomic(self._body_path(key), data)
+                self._write_atomic(self._meta_path(key), meta_data)
+            except OSError as e:
+                print(f"写入页面缓存失败: {url}, 错误: {e}")
+                return
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data) + len(meta_data)
+            self._total_bytes += self._entries[key]
+            self.stores += 1
+            self._evict()
+
+    def refresh(self, url: str) -> None:
+        """
+        重新验证成功（服务器返回304）后更新页面的保存时间，使其重新进入有效期
+
+        参数:
+            url: 页面URL
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                return
+            try:
+                with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                meta['stored_at'] = time.time()
+                self._write_atomic(self._meta_path(key), json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+            except (OSError, ValueError) as e:
+                print(f"更新页面缓存失败: {url}, 错误: {e}")
+                return
+            self.revalidated += 1
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _touch(self, key: str) -> None:
+        """将页面标记为最近访问"""
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._body_path(key))
+        except OSError:
+            pass
+
+    def _remove(self, key: str) -> None:
+        """从索引和磁盘中删除页面"""
+        self._total_bytes -= self._entries.pop(key, 0)
+        for path in (self._body_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """淘汰最久未访问的页面，直到总大小不超过上限（至少保留最新写入的页面）"""
+        if self.max_bytes is None:
+            return
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """缓存占用的总字节数"""
+        return self._total_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回缓存的统计信息
+
+        返回:
+            包含entries、total_bytes、hits、revalidated、misses、stores和evictions的字典
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'stores': self.stores,
+                'evictions': self.evictions
+            }
@@ -3,9 +3,12 @@
 """
 import time
 import requests
-from typing import Optional
-from urllib.parse import urljoin
-from bs4 import BeautifulSoup
+from typing import Optional, List, Dict, Any
+
+from game_guide_scraper.parser.parser import Parser
+from game_guide_scraper.scraper.cache import PageCache
+from game_guide_scraper.utils.rate_limiter import RateLimiter, rate_from_delay
+from game_guide_scraper.utils.http import build_session
 
 
 class Scraper:
@@ -13,14 +16,19 @@ class Scraper:
     网页抓取器类，用于抓取指定URL的页面内容。
     
     属性:
-        session: requests.Session对象，用于发送HTTP请求
-        delay: 请求间隔时间（秒）
-        last_request_time: 上次请求的时间戳
+        session: requests.Session对象，用于发送HTTP请求（带连接池，可与图片下载器共享）
+        delay: 没有配置主机限速规则时的请求间隔时间（秒）
+        rate_limiter: 按主机名限速的RateLimiter对象，可与图片下载器共享
         max_retries: 最大重试次数
         retry_delay: 重试间隔时间（秒）
+        link_parser: 用于提取下一页链接和页面索引的Parser对象
+        cache: 页面缓存，为None表示不使用缓存
+        offline: 离线模式，只从缓存读取页面，不访问网络
     """
     
-    def __init__(self, user_agent: str, delay: float = 1.0, max_retries: int = 3, retry_delay: float = 2.0):
+    def __init__(self, user_agent: str, delay: float = 1.0, max_retries: int = 3, retry_delay: float = 2.0,
+                 parser_backend: Optional[str] = None, cache: Optional[PageCache] = None, offline: bool = False,
+                 rate_limiter: Optional[RateLimiter] = None, session: Optional[requests.Session] = None):
         """
         初始化抓取器
         
@@ -29,13 +37,21 @@ class Scraper:
             delay: 请求间隔时间（秒），默认为1.0秒
             max_retries: 最大重试次数，默认为3次
             retry_delay: 重试间隔时间（秒），默认为2.0秒
+            parser_backend: 提取链接时使用的HTML解析后端，默认为html.parser
+            cache: 页面缓存，为None表示不使用缓存
+            offline: 是否只从缓存读取页面（忽略有效期），缓存中没有的页面视为抓取失败
+            rate_limiter: 共享的限速器，为None时创建一个只使用delay的限速器
+            session: 共享的requests会话（见utils.http.build_session），为None时创建一个新会话，
+                     传入会话时user_agent应已在会话的请求头中设置
         """
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': user_agent})
+        self.session = session or build_session(user_agent)
         self.delay = delay
-        self.last_request_time = 0
+        self.rate_limiter = rate_limiter or RateLimiter()
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.link_parser = Parser(backend=parser_backend)
+        self.cache = cache
+        self.offline = offline
         
     def fetch_page(self, url: str) -> Optional[str]:
         """
@@ -47,24 +63,44 @@ class Scraper:
         返回:
             页面的HTML内容，如果抓取失败则返回None
         """
-        # 实现请求延迟
-        current_time = time.time()
-        sleep_time = max(0, self.delay - (current_time - self.last_request_time))
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        # 有效期内的缓存直接返回，过期的缓存用于条件请求
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and (cached.fresh or self.offline):
+            return cached.body
+        if self.offline:
+            print(f"离线模式: 缓存中没有 {url}")
+            return None
+        validators = cached.validators() if cached is not None else {}
+        
+        # 按主机限速（多个线程并发抓取时依次占用令牌），重试不再占用令牌
+        self.rate_limiter.acquire(url, rate=rate_from_delay(self.delay))
         
         retries = 0
         while retries <= self.max_retries:
             try:
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()  # 如果状态码不是200，抛出HTTPError异常
+                if validators:
+                    response = self.session.get(url, timeout=10, headers=validators)
+                else:
+                    response = self.session.get(url, timeout=10)
+                
+                # 页面未修改，继续使用缓存
+                if validators and response.status_code == 304:
+                    self.cache.refresh(url)
+                    return cached.body
                 
-                # 更新最后请求时间
-                self.last_request_time = time.time()
+                response.raise_for_status()  # 如果状态码不是200，抛出HTTPError异常
                 
                 # 确保中文内容正确显示
                 response.encoding = 'utf-8'
                 
+                if self.cache is not None:
+                    self.cache.put(
+                        url,
+                        response.text,
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified')
+                    )
+                
                 return response.text
             
             except requests.exceptions.HTTPError as e:
@@ -118,37 +154,23 @@ class Scraper:
         if not html:
             return None
             
-        # 使用BeautifulSoup解析HTML
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = self.link_parser.make_soup(html)
+        return self.link_parser.extract_next_page_url(soup, base_url)
         
-        # 查找包含"下一页"文本的链接
-        # 针对游戏攻略网站的特定结构进行查找
-        next_link = soup.find('a', text='下一页')
-        if not next_link:
-            # 尝试其他可能的"下一页"链接模式
-            next_link = soup.find('a', text=lambda t: t and '下一页' in t)
-            
-        if not next_link:
-            # 尝试查找带有特定class的下一页链接
-            next_link = soup.find('a', class_=lambda c: c and ('next' in c.lower() or 'nextpage' in c.lower()))
-            
-        # 如果找到了下一页链接
-        if next_link and 'href' in next_link.attrs:
-            next_url = next_link['href']
+    def get_page_index(self, html: str, base_url: str) -> List[Dict[str, Any]]:
+        """
+        从"文章内容导航"中提取攻略的完整页面列表
+        
+        参数:
+            html: 当前页面的HTML内容
+            base_url: 当前页面的URL
             
-            # 处理相对URL，转换为绝对URL
-            if not next_url.startswith(('http://', 'https://')):
-                next_url = urljoin(base_url, next_url)
-                
-            # 循环检测：如果下一页URL与当前页面URL相同，则认为没有下一页
-            if next_url == base_url:
-                print(f"检测到循环链接: {next_url}")
-                return None
-                
-            # 记录找到的下一页URL
-            print(f"找到下一页链接: {next_url}")
-            return next_url
+        返回:
+            从当前页面开始、按页码排序的页面列表，每个元素包含page_number、title和url；
+            如果页面中没有可用的页面索引，则返回空列表
+        """
+        if not html:
+            return []
             
-        # 没有找到下一页链接
-        print("未找到下一页链接")
-        return None
\ No newline at end of file
+        soup = self.link_parser.make_soup(html)
+        return self.link_parser.extract_page_index(soup, base_url)
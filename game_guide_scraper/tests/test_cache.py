@@ -0,0 +1,140 @@
+"""
+测试页面缓存模块的功能。
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.scraper.cache import PageCache, canonical_url
+from game_guide_scraper.scraper.scraper import Scraper
+
+
+class TestPageCache(unittest.TestCase):
+    """测试PageCache类的功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'pages')
+        self.url = 'https://www.gamersky.com/handbook/202408/1803231.shtml'
+        self.html = '<html><body><p>黑神话悟空攻略</p></body></html>'
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def _response(self, status_code=200, text='', headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.text = text
+        response.headers = headers or {}
+        return response
+
+    def test_canonical_url(self):
+        """测试URL规范化"""
+        self.assertEqual(
+            canonical_url('HTTPS://WWW.Gamersky.com:443/handbook/1.shtml#top'),
+            'https://www.gamersky.com/handbook/1.shtml'
+        )
+        self.assertEqual(canonical_url('http://example.com:8080'), 'http://example.com:8080/')
+        self.assertEqual(canonical_url('http://example.com/a?b=1'), 'http://example.com/a?b=1')
+
+    def test_put_and_get(self):
+        """测试保存和读取页面，重新打开缓存后仍然可用"""
+        cache = PageCache(self.cache_dir, ttl=60)
+        self.assertIsNone(cache.get(self.url))
+
+        cache.put(self.url, self.html, etag='"abc"', last_modified='Wed, 21 Aug 2024 07:28:00 GMT')
+        cached = cache.get(self.url + '#comments')
+        self.assertEqual(cached.body, self.html)
+        self.assertTrue(cached.fresh)
+        self.assertEqual(cached.validators(), {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Wed, 21 Aug 2024 07:28:00 GMT'
+        })
+
+        reopened = PageCache(self.cache_dir, ttl=60)
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(reopened.get(self.url).body, self.html)
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (1, 1, 1))
+
+    def test_ttl(self):
+        """测试过期的页面仍然可以读取，但标记为需要重新验证"""
+        cache = PageCache(self.cache_dir, ttl=0)
+        cache.put(self.url, self.html, etag='"abc"')
+        self.assertFalse(cache.get(self.url).fresh)
+
+        cache.ttl = 60
+        self.assertTrue(cache.get(self.url).fresh)
+
+    def test_lru_eviction(self):
+        """测试超过大小上限时淘汰最久未访问的页面"""
+        urls = [f'https://www.gamersky.com/handbook/{i}.shtml' for i in range(3)]
+        body = os.urandom(2000).hex()  # 不易压缩的内容
+
+        probe = PageCache(os.path.join(self.temp_dir, 'probe'))
+        probe.put(urls[0], body)
+        entry_size = probe.total_bytes
+
+        cache = PageCache(self.cache_dir, max_bytes=entry_size * 2 + entry_size // 2)
+        cache.put(urls[0], body)
+        cache.put(urls[1], body)
+        cache.get(urls[0])  # 访问后urls[1]成为最久未访问的页面
+        cache.put(urls[2], body)
+
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNotNone(cache.get(urls[0]))
+        self.assertIsNone(cache.get(urls[1]))
+        self.assertIsNotNone(cache.get(urls[2]))
+        self.assertLessEqual(cache.total_bytes, cache.max_bytes)
+
+    def test_scraper_uses_cache(self):
+        """测试抓取器在有效期内直接使用缓存"""
+        cache = PageCache(self.cache_dir, ttl=60)
+        scraper = Scraper('test-agent', delay=0, cache=cache)
+        scraper.session.get = MagicMock(return_value=self._response(text=self.html, headers={'ETag': '"v1"'}))
+
+        self.assertEqual(scraper.fetch_page(self.url), self.html)
+        self.assertEqual(scraper.fetch_page(self.url), self.html)
+        scraper.session.get.assert_called_once_with(self.url, timeout=10)
+
+    def test_scraper_revalidates_stale_page(self):
+        """测试过期的页面通过条件请求重新验证，服务器返回304时继续使用缓存"""
+        cache = PageCache(self.cache_dir, ttl=0)
+        cache.put(self.url, self.html, etag='"v1"')
+        scraper = Scraper('test-agent', delay=0, cache=cache)
+        scraper.session.get = MagicMock(return_value=self._response(status_code=304))
+
+        self.assertEqual(scraper.fetch_page(self.url), self.html)
+        scraper.session.get.assert_called_once_with(self.url, timeout=10, headers={'If-None-Match': '"v1"'})
+        self.assertEqual(cache.revalidated, 1)
+
+        # 页面已修改时更新缓存
+        new_html = '<html><body><p>更新后的攻略</p></body></html>'
+        scraper.session.get = MagicMock(return_value=self._response(text=new_html, headers={'ETag': '"v2"'}))
+        self.assertEqual(scraper.fetch_page(self.url), new_html)
+        self.assertEqual(cache.get(self.url).etag, '"v2"')
+
+    def test_offline(self):
+        """测试离线模式只从缓存读取页面（忽略有效期）"""
+        cache = PageCache(self.cache_dir, ttl=0)
+        cache.put(self.url, self.html)
+        scraper = Scraper('test-agent', delay=0, cache=cache, offline=True)
+        scraper.session.get = MagicMock()
+
+        self.assertEqual(scraper.fetch_page(self.url), self.html)
+        self.assertIsNone(scraper.fetch_page('https://www.gamersky.com/handbook/other.shtml'))
+        scraper.session.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
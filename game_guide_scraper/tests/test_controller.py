@@ -0,0 +1,335 @@
+"""
+测试控制器模块的功能。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.controller.controller import Controller, DEFERRED_REPORT, JOURNAL_FILE
+from game_guide_scraper.downloader.downloader import ImageDownloader
+
+
+BASE_URL = 'https://www.gamersky.com/handbook/202408/1803231'
+
+
+def page_url(page_number):
+    """返回模拟站点中指定页码的URL"""
+    return f"{BASE_URL}.shtml" if page_number == 1 else f"{BASE_URL}_{page_number}.shtml"
+
+
+def build_site(page_count, with_index=False):
+    """
+    构造一个多页攻略站点，返回URL到HTML的映射
+
+    参数:
+        page_count: 页面数量
+        with_index: 是否在页面中包含"文章内容导航"页面索引
+    """
+    site = {}
+    for i in range(1, page_count + 1):
+        url = page_url(i)
+        next_link = f'<a href="{page_url(i + 1)}">下一页</a>' if i < page_count else ''
+        nav = ''
+        if with_index:
+            nav = '<div class="page_css"><span>文章内容导航</span>' + ''.join(
+                f'<span>第{j}页：第{j}回攻略</span>' if j == i else
+                f'<a href="{page_url(j)}">第{j}页：第{j}回攻略</a>'
+                for j in range(1, page_count + 1)
+            ) + '</div>'
+        site[url] = f"""
+        <html>
+        <head><title>黑神话悟空攻略 - 游民星空</title></head>
+        <body>
+            <div class="Mid2L_con">
+                <h1>黑神话悟空攻略 第{i}页</h1>
+                <p>第{i}页：第{i}回攻略</p>
+                <p>这是第{i}页的正文内容。</p>
+                <p align="center"><img src="https://img1.gamersky.com/image{i}_S.jpg" alt="截图{i}" /></p>
+                <h2>第{i}页小结</h2>
+                <p>第{i}页的补充说明。</p>
+                {next_link}
+            </div>
+            {nav}
+        </body>
+        </html>
+        """
+    return site
+
+
+class TestController(unittest.TestCase):
+    """测试Controller类的功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.site = build_site(8)
+        self.download_hook = None  # 模拟下载图片时调用，返回False表示下载失败
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _run(self, name, **overrides):
+        """
+        使用模拟站点运行控制器，返回生成的Markdown字节内容和运行结果
+
+        参数:
+            name: 输出子目录名
+            overrides: 额外的配置项
+        """
+        output_dir = os.path.join(self.temp_dir, name)
+        config = {
+            'start_url': page_url(1),
+            'output_dir': output_dir,
+            'delay': 0,
+            'image_delay': 0,
+            'progress_callback': lambda message, percentage: None,
+        }
+        config.update(overrides)
+        controller = Controller(config)
+
+        def fake_download(url, filename=None, skip_existing=True):
+            if self.download_hook and self.download_hook(url) is False:
+                return None
+            return os.path.join(controller.config['image_dir'], os.path.basename(url))
+
+        with patch.object(controller.scraper, 'fetch_page', side_effect=self.site.get), \
+                patch('game_guide_scraper.downloader.downloader.ImageDownloader.download_image',
+                      side_effect=fake_download):
+            result = controller.run()
+
+        with open(result['output_file'], 'rb') as f:
+            return f.read(), result
+
+    def test_run_sequential(self):
+        """测试顺序模式抓取全部页面"""
+        markdown, result = self._run('sequential')
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['pages_processed'], 8)
+        self.assertEqual(result['images_processed'], 8)
+        self.assertIn('第8页：第8回攻略'.encode('utf-8'), markdown)
+
+    def test_background_images_match_foreground(self):
+        """测试后台下载图片时输出和失败图片统计与逐页下载时一致"""
+        self.download_hook = lambda url: not url.endswith(('image3.jpg', 'image6.jpg'))
+        foreground, expected = self._run('foreground', background_images=False)
+        background, result = self._run('background')
+
+        self.assertEqual(background, foreground)
+        self.assertEqual(result['images_processed'], 6)
+        self.assertEqual(result['failed_images'], expected['failed_images'])
+        self.assertEqual([image['page'] for image in result['failed_images']], [page_url(3), page_url(6)])
+
+    def test_background_images_do_not_block_crawl(self):
+        """测试后台下载图片时抓取页面不等待图片下载"""
+        pages = self.site
+        last_page_fetched = threading.Event()
+        waited = []
+
+        def fetch(url):
+            if url == page_url(8):
+                last_page_fetched.set()
+            return pages.get(url)
+
+        # 第一张图片在最后一页抓取完成之前不会下载完，逐页下载时会超时
+        self.download_hook = lambda url: waited.append(last_page_fetched.wait(5))
+        self.site = SimpleNamespace(get=fetch)
+        _, result = self._run('background')
+
+        self.assertEqual(result['images_processed'], 8)
+        self.assertTrue(all(waited))
+
+    def test_deadline_defers_images(self):
+        """测试限时模式到时推迟其余图片，再次运行时只下载推迟的图片"""
+        image_dir = os.path.join(self.temp_dir, 'deadline', 'images')
+        clock = {'offset': 0}
+        downloaded = []
+
+        def download(url):
+            # 每张图片耗时10秒（模拟时钟），并写入文件供再次运行时跳过
+            clock['offset'] += 10
+            downloaded.append(url)
+            with open(os.path.join(image_dir, ImageDownloader.image_filename(url)), 'wb') as f:
+                f.write(b'image')
+
+        self.download_hook = download
+        real_time = time.time
+        with patch('game_guide_scraper.controller.image_queue.time') as mock_time:
+            mock_time.time.side_effect = lambda: real_time() + clock['offset']
+            markdown, result = self._run('deadline', deadline=25, image_workers=1)
+
+        # 每批2张，第2批结束时超过25秒
+        self.assertEqual(result['pages_processed'], 8)
+        self.assertEqual(result['images_processed'], 4)
+        self.assertEqual(result['failed_images'], [])
+        self.assertEqual([image['page_number'] for image in result['deferred_images']], [5, 6, 7, 8])
+        self.assertIn(b'(https://img1.gamersky.com/image8.jpg)', markdown)
+        report_path = os.path.join(self.temp_dir, 'deadline', DEFERRED_REPORT)
+        with open(report_path, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['deferred_images']), 4)
+
+        downloaded.clear()
+        markdown, result = self._run('deadline')
+        self.assertEqual(downloaded, [f'https://img1.gamersky.com/image{i}.jpg' for i in range(5, 9)])
+        self.assertNotIn(b'(https://img1.gamersky.com/', markdown)
+        self.assertFalse(os.path.exists(report_path))
+
+    def test_resume_from_journal(self):
+        """测试中断后从抓取日志继续，已完成的页面不再抓取，输出与一次完成时相同"""
+        expected, _ = self._run('complete')
+
+        pages = self.site
+        fetched = []
+
+        def interrupted_fetch(url):
+            if url == page_url(5):
+                raise KeyboardInterrupt
+            fetched.append(url)
+            return pages.get(url)
+
+        self.site = SimpleNamespace(get=interrupted_fetch)
+        with self.assertRaises(KeyboardInterrupt):
+            self._run('resume')
+        journal_path = os.path.join(self.temp_dir, 'resume', JOURNAL_FILE)
+        self.assertTrue(os.path.exists(journal_path))
+
+        fetched.clear()
+        self.site = SimpleNamespace(get=lambda url: fetched.append(url) or pages.get(url))
+        markdown, result = self._run('resume')
+
+        self.assertEqual(fetched, [page_url(i) for i in range(5, 9)])
+        self.assertEqual(result['pages_processed'], 8)
+        self.assertEqual(result['images_processed'], 8)
+        self.assertEqual(markdown, expected)
+        self.assertFalse(os.path.exists(journal_path))
+
+    def test_journal_not_resumed_with_other_parameters(self):
+        """测试不下载图片时中断留下的日志不会用于下载图片的抓取"""
+        expected, _ = self._run('complete')
+
+        pages = self.site
+        fetched = []
+
+        def interrupted_fetch(url):
+            if url == page_url(5):
+                raise KeyboardInterrupt
+            fetched.append(url)
+            return pages.get(url)
+
+        self.site = SimpleNamespace(get=interrupted_fetch)
+        with self.assertRaises(KeyboardInterrupt):
+            self._run('no_images', download_images=False)
+
+        fetched.clear()
+        self.site = SimpleNamespace(get=lambda url: fetched.append(url) or pages.get(url))
+        markdown, result = self._run('no_images')
+
+        self.assertEqual(fetched, [page_url(i) for i in range(1, 9)])
+        self.assertEqual(result['images_processed'], 8)
+        self.assertEqual(markdown, expected)
+
+    def test_page_range(self):
+        """测试--start-page和--max-pages在两种模式下选择相同的页面"""
+        sequential, result = self._run('range', start_page=3, max_pages=4)
+        self.assertEqual(result['pages_processed'], 4)
+        self.assertIn('第3页的正文内容'.encode('utf-8'), sequential)
+        self.assertIn('第6页的正文内容'.encode('utf-8'), sequential)
+        self.assertNotIn('第2页的正文内容'.encode('utf-8'), sequential)
+        self.assertNotIn('第7页的正文内容'.encode('utf-8'), sequential)
+
+        pipelined, _ = self._run('range-pipeline', start_page=3, max_pages=4, jobs=4)
+        self.assertEqual(pipelined, sequential)
+
+        self.site = build_site(8, with_index=True)
+        sequential, _ = self._run('range-index', start_page=3, max_pages=4)
+        pipelined, _ = self._run('range-index-pipeline', start_page=3, max_pages=4, jobs=4)
+        self.assertEqual(pipelined, sequential)
+
+    def test_run_parses_each_page_once(self):
+        """测试每个页面只构建一次DOM"""
+        from bs4 import BeautifulSoup
+
+        for mode in ({}, {'jobs': 4}):
+            with patch('game_guide_scraper.parser.parser.BeautifulSoup', wraps=BeautifulSoup) as mock_soup:
+                self._run(f"single-parse-{len(mode)}", **mode)
+            self.assertEqual(mock_soup.call_count, 8)
+
+    def test_pipeline_output_matches_sequential(self):
+        """测试流水线模式的输出与顺序模式逐字节一致"""
+        sequential, _ = self._run('sequential')
+        pipelined, result = self._run('pipeline', jobs=4, queue_size=1)
+
+        self.assertEqual(result['pages_processed'], 8)
+        self.assertEqual(result['images_processed'], 8)
+        self.assertEqual(pipelined, sequential)
+
+    def test_pipeline_title_from_first_page(self):
+        """测试第一页最后到达组织阶段时，流水线模式的文档标题和来源仍取自第一页"""
+        self.site = build_site(8, with_index=True)
+        sequential, _ = self._run('sequential')
+
+        # 第一页的图片最慢，其余页面先到达组织阶段
+        self.download_hook = lambda url: time.sleep(0.3) if url.endswith('image1.jpg') else None
+        pipelined, result = self._run('pipeline', jobs=4)
+
+        self.assertEqual(result['pages_processed'], 8)
+        self.assertTrue(pipelined.startswith('# 黑神话悟空攻略 第1页\n'.encode('utf-8')))
+        self.assertIn(page_url(1).encode('utf-8'), pipelined.split(b'\n\n')[1])
+        self.assertEqual(pipelined, sequential)
+
+    def test_low_memory_output_matches(self):
+        """测试低内存模式在顺序和流水线模式下的输出与默认模式逐字节一致"""
+        expected, _ = self._run('sequential')
+        for mode in ({}, {'jobs': 4}):
+            output, result = self._run(f"low-memory-{len(mode)}", low_memory=True, **mode)
+            self.assertEqual(result['images_processed'], 8)
+            self.assertEqual(output, expected)
+
+    def test_pipeline_output_matches_sequential_without_images(self):
+        """测试不下载图片时流水线模式的输出与顺序模式一致"""
+        sequential, _ = self._run('sequential', download_images=False)
+        pipelined, _ = self._run('pipeline', download_images=False, pipeline=True, parse_jobs=3)
+
+        self.assertEqual(pipelined, sequential)
+
+    def test_pipeline_fetches_indexed_pages_concurrently(self):
+        """测试流水线模式按页面索引并发抓取，输出与顺序模式一致"""
+        self.site = build_site(8, with_index=True)
+        sequential, _ = self._run('sequential')
+        pipelined, result = self._run('pipeline', jobs=4)
+
+        self.assertEqual(result['pages_processed'], 8)
+        self.assertEqual(pipelined, sequential)
+
+    def test_pipeline_indexed_pages_continue_after_failure(self):
+        """测试按页面索引抓取时，单个页面失败不影响其余页面"""
+        self.site = build_site(8, with_index=True)
+        del self.site[page_url(5)]
+        _, result = self._run('pipeline', jobs=4)
+
+        self.assertEqual(result['pages_processed'], 7)
+        self.assertEqual([page['url'] for page in result['failed_pages']], [page_url(5)])
+
+    def test_pipeline_records_failed_pages(self):
+        """测试流水线模式记录无法抓取的页面"""
+        del self.site[page_url(5)]
+        _, result = self._run('pipeline', jobs=2)
+
+        self.assertEqual(result['pages_processed'], 4)
+        self.assertEqual(len(result['failed_pages']), 1)
+        self.assertEqual(result['failed_pages'][0]['url'], page_url(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
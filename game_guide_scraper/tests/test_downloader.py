@@ -3,6 +3,8 @@
 """
 import os
 import sys
+import time
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -42,7 +44,7 @@ class TestImageDownloader(unittest.TestCase):
             except OSError:
                 pass  # 如果目录不为空或有其他问题，忽略错误
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_download_image(self, mock_get):
         """测试单个图片下载功能"""
         # 模拟请求响应
@@ -61,9 +63,10 @@ class TestImageDownloader(unittest.TestCase):
         self.assertTrue(result.startswith(self.output_dir))
         
         # 验证请求是否正确发送
-        mock_get.assert_called_once_with(url, stream=True, timeout=10)
+        mock_get.assert_called_once_with(url, stream=True, timeout=10, headers={'Accept-Encoding': 'identity'})
+        mock_response.close.assert_called_once()
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_download_image_with_error(self, mock_get):
         """测试图片下载失败的情况"""
         # 模拟请求异常
@@ -121,6 +124,111 @@ class TestImageDownloader(unittest.TestCase):
         self.assertIn('local_path', test_image)
         self.assertEqual(test_image['local_path'], local_path)
 
+    def _range_response(self, data, status_code=200, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        response.iter_content.return_value = [data]
+        return response
+
+    def test_download_image_resume(self):
+        """测试中断后通过Range请求续传，完整后原子替换为最终文件"""
+        url = 'https://example.com/resume.jpg'
+        data = b'0123456789abcdef'
+
+        # 第一次下载连接中断，只收到前6个字节
+        self.downloader.session.get = MagicMock(
+            return_value=self._range_response(data[:6], headers={'Content-Length': str(len(data))}))
+        self.assertIsNone(self.downloader.download_image(url))
+        local_path = os.path.join(self.output_dir, os.listdir(self.output_dir)[0][:-len('.part')])
+        self.assertFalse(os.path.exists(local_path))
+        self.assertEqual(os.path.getsize(local_path + '.part'), 6)
+
+        # 第二次从第6个字节续传
+        self.downloader.session.get = MagicMock(return_value=self._range_response(
+            data[6:], status_code=206,
+            headers={'Content-Length': str(len(data) - 6), 'Content-Range': f'bytes 6-15/{len(data)}'}))
+        self.assertEqual(self.downloader.download_image(url), local_path)
+        self.downloader.session.get.assert_called_once_with(
+            url, stream=True, timeout=10, headers={'Accept-Encoding': 'identity', 'Range': 'bytes=6-'})
+        with open(local_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertFalse(os.path.exists(local_path + '.part'))
+
+    def test_download_image_range_not_supported(self):
+        """测试服务器不支持Range（返回200）时丢弃已下载的部分，写入完整内容"""
+        url = 'https://example.com/norange.jpg'
+        data = b'complete image'
+        self.downloader.session.get = MagicMock(
+            return_value=self._range_response(b'part', headers={'Content-Length': '100'}))
+        self.assertIsNone(self.downloader.download_image(url))
+
+        self.downloader.session.get = MagicMock(
+            return_value=self._range_response(data, headers={'Content-Length': str(len(data))}))
+        local_path = self.downloader.download_image(url)
+
+        self.assertEqual(self.downloader.session.get.call_args[1]['headers']['Range'], 'bytes=4-')
+        with open(local_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_download_image_same_url_concurrently(self):
+        """测试多个线程同时下载同一张图片时只请求一次，其他线程等待并得到相同的结果"""
+        url = 'https://example.com/shared.jpg'
+        data = b'0123456789abcdef'
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.1)
+            return self._range_response(data, headers={'Content-Length': str(len(data))})
+
+        self.downloader.session.get = MagicMock(side_effect=slow_get)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.downloader.download_image(url)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.downloader.session.get.call_count, 1)
+        self.assertEqual(len(set(results)), 1)
+        self.assertIsNotNone(results[0])
+        with open(results[0], 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.listdir(self.output_dir), [os.path.basename(results[0])])
+
+    def test_download_all_images_concurrent(self):
+        """测试并发下载时结果顺序、图片信息和主机并发上限"""
+        downloader = ImageDownloader(self.output_dir, delay=0, max_workers=8, host_limit=2)
+        images = [{'type': 'image', 'url': f'https://img{i % 2}.example.com/{i}.jpg'} for i in range(12)]
+        images.append({'type': 'image', 'url': 'https://img0.example.com/fail.jpg'})
+        images.append({'type': 'image', 'url': 'https://img0.example.com/0.jpg'})  # 重复的URL
+
+        active = {}
+        peak = {}
+        calls = []
+        lock = threading.Lock()
+
+        def fake_download(url, skip_existing=True):
+            host = url.split('/')[2]
+            with lock:
+                calls.append(url)
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+            return None if 'fail' in url else os.path.join(self.output_dir, url.rsplit('/', 1)[1])
+
+        with patch.object(downloader, 'download_image', side_effect=fake_download):
+            result = downloader.download_all_images(images)
+
+        self.assertEqual(len(calls), 13)  # 重复的URL只下载一次
+        self.assertEqual(list(result), [image['url'] for image in images[:12]])
+        self.assertTrue(all('local_path' in image for image in images[:12]))
+        self.assertNotIn('local_path', images[12])
+        self.assertEqual(images[13]['local_path'], images[0]['local_path'])
+        self.assertLessEqual(max(peak.values()), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
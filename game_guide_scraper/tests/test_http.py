@@ -0,0 +1,79 @@
+"""
+测试HTTP会话模块的功能。
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.utils.http import build_session, pool_stats
+from game_guide_scraper.downloader.downloader import ImageDownloader
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """支持keep-alive的测试服务器，记录每个请求的Accept-Encoding"""
+
+    protocol_version = 'HTTP/1.1'
+    accept_encodings = []
+
+    def do_GET(self):
+        self.accept_encodings.append(self.headers.get('Accept-Encoding'))
+        body = b'fake image data'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    """测试build_session和pool_stats的功能"""
+
+    def setUp(self):
+        """启动本地测试服务器"""
+        KeepAliveHandler.accept_encodings = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """关闭测试服务器"""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_build_session(self):
+        """测试会话的默认请求头"""
+        session = build_session('test-agent', headers={'Referer': 'https://www.gamersky.com/'})
+        self.assertEqual(session.headers['User-Agent'], 'test-agent')
+        self.assertEqual(session.headers['Referer'], 'https://www.gamersky.com/')
+        self.assertIn('gzip', session.headers['Accept-Encoding'])
+
+    def test_downloader_reuses_connections(self):
+        """测试图片下载复用连接，并且不协商压缩"""
+        session = build_session('test-agent')
+        session.trust_env = False  # 不使用环境变量中的代理
+        downloader = ImageDownloader(self.temp_dir, delay=0, session=session)
+        images = [{'type': 'image', 'url': f"{self.base_url}/{i}.jpg"} for i in range(5)]
+
+        result = downloader.download_all_images(images, skip_existing=False)
+
+        self.assertEqual(len(result), 5)
+        self.assertEqual(KeepAliveHandler.accept_encodings, ['identity'] * 5)
+        stats = pool_stats(session)
+        self.assertEqual((stats['requests'], stats['misses'], stats['hits']), (5, 1, 4))
+        self.assertEqual(stats['hosts'][self.base_url]['requests'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
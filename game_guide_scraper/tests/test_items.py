@@ -0,0 +1,105 @@
+"""
+测试内容元素模块
+"""
+import os
+import sys
+import json
+import pickle
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.parser.items import (
+    ContentItem, TextItem, ImageItem, HeadingItem, ListItem, TableItem, CodeItem, QuoteItem,
+    content_item, content_items
+)
+
+
+def sample_items():
+    """构造每种类型各一个的内容元素列表"""
+    return [
+        TextItem('正文'),
+        ImageItem('https://img1.gamersky.com/1.jpg', '图1', thumbnail_url='https://img1.gamersky.com/1_S.jpg'),
+        HeadingItem('小标题', 2, id='h-1'),
+        ListItem(['先清理小怪', '再挑战头目'], ordered=True),
+        TableItem(['物品', '位置'], [['葫芦', '土地庙']]),
+        CodeItem('dodge -> attack', 'text'),
+        QuoteItem('踏平坎坷成大道\n斗罢艰险又出发'),
+    ]
+
+
+class TestContentItem(unittest.TestCase):
+    """测试ContentItem及其子类"""
+
+    def test_mapping_protocol(self):
+        """测试元素可以像字典一样读写，值为None的字段视为不存在"""
+        image = ImageItem('https://img1.gamersky.com/1.jpg')
+        self.assertEqual(image['type'], 'image')
+        self.assertEqual(image.get('type'), 'image')
+        self.assertNotIn('local_path', image)
+        self.assertEqual(image.get('local_path', ''), '')
+        with self.assertRaises(KeyError):
+            image['local_path']
+
+        image['local_path'] = 'output/images/1.jpg'
+        self.assertIn('local_path', image)
+        self.assertEqual(image.local_path, 'output/images/1.jpg')
+        self.assertEqual(list(image), ['type', 'url', 'alt', 'local_path'])
+        self.assertEqual(len(image), 4)
+        self.assertEqual(image, {'type': 'image', 'url': 'https://img1.gamersky.com/1.jpg', 'alt': '',
+                                 'local_path': 'output/images/1.jpg'})
+
+        del image['local_path']
+        self.assertNotIn('local_path', image)
+
+    def test_unknown_field(self):
+        """测试写入元素类型没有的字段时抛出KeyError"""
+        heading = HeadingItem('小标题')
+        with self.assertRaises(KeyError):
+            heading['local_path'] = 'output/images/1.jpg'
+        with self.assertRaises(KeyError):
+            heading['type'] = 'text'
+        self.assertFalse(hasattr(heading, '__dict__'))
+
+    def test_list_item_fields(self):
+        """测试ListItem的items字段和字典转换"""
+        item = ListItem(['一', '二'])
+        self.assertEqual(item.items, ['一', '二'])
+        self.assertEqual(item['items'], ['一', '二'])
+        self.assertEqual(item.to_dict(), {'type': 'list', 'items': ['一', '二'], 'ordered': False})
+        self.assertEqual(item, {'type': 'list', 'items': ['一', '二'], 'ordered': False})
+
+    def test_dict_round_trip(self):
+        """测试元素经过JSON和pickle后不变"""
+        items = sample_items()
+        data = json.loads(json.dumps([item.to_dict() for item in items], ensure_ascii=False))
+        self.assertEqual(content_items(data), items)
+        self.assertEqual([type(item) for item in content_items(data)], [type(item) for item in items])
+
+        restored = pickle.loads(pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(restored, items)
+        self.assertIsInstance(restored[1], ImageItem)
+
+    def test_content_item_errors(self):
+        """测试未知类型和字段不符合元素类型的字典无法转换"""
+        text = TextItem('正文')
+        self.assertIs(content_item(text), text)
+        with self.assertRaises(ValueError):
+            content_item({'type': 'ordered_list', 'value': ['一']})
+        with self.assertRaises(ValueError):
+            content_item({'type': 'table', 'value': '<table></table>'})
+        self.assertIsInstance(content_item({'type': 'text', 'value': '正文'}), ContentItem)
+
+    def test_content_item_lenient(self):
+        """测试strict为False时忽略元素类型没有的字段，未知类型仍然无法转换"""
+        data = {'type': 'list', 'items': ['一'], 'style': 'disc'}
+        with self.assertRaises(ValueError):
+            content_item(data)
+        self.assertEqual(content_item(data, strict=False), {'type': 'list', 'items': ['一'], 'ordered': False})
+        with self.assertRaises(ValueError):
+            content_item({'type': 'ordered_list', 'value': ['一']}, strict=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
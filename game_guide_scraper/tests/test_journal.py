@@ -0,0 +1,87 @@
+"""
+测试抓取日志模块的功能。
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.controller.journal import CrawlJournal
+from game_guide_scraper.parser.items import ImageItem
+
+
+START_URL = 'https://www.gamersky.com/handbook/202408/1803231.shtml'
+
+
+def page_content(page_number):
+    """构造一个包含一张图片的页面内容字典"""
+    return {
+        'title': f'第{page_number}页',
+        'url': f'https://www.gamersky.com/handbook/202408/1803231_{page_number}.shtml',
+        'page_number': page_number,
+        'content': [ImageItem(f'https://img1.gamersky.com/{page_number}.jpg')]
+    }
+
+
+class TestCrawlJournal(unittest.TestCase):
+    """测试CrawlJournal类的功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, '.crawl_journal.jsonl')
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_replay(self):
+        """测试恢复页面和图片结果，忽略写入时中断的最后一行"""
+        journal = CrawlJournal(self.path, START_URL)
+        for page_number in (1, 2):
+            content = page_content(page_number)
+            journal.record_page(content, f'next-{page_number}')
+            if page_number == 1:
+                content['content'][0]['local_path'] = 'images/1.jpg'
+                journal.record_images(content, [])
+        journal.close()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"type": "page", "page_num')
+
+        resumed = CrawlJournal(self.path, START_URL)
+        self.assertEqual([page['page_number'] for page in resumed.pages], [1, 2])
+        self.assertEqual(resumed.pages[0]['images']['local_paths'], {'https://img1.gamersky.com/1.jpg': 'images/1.jpg'})
+        self.assertIsInstance(resumed.pages[1]['content']['content'][0], ImageItem)
+        self.assertEqual(resumed.pages[1]['content']['content'], page_content(2)['content'])
+        self.assertNotIn('images', resumed.pages[1])
+        self.assertEqual(resumed.last_page['next_url'], 'next-2')
+        resumed.close()
+
+    def test_restart_when_parameters_change(self):
+        """测试起始URL、页码范围或是否下载图片不同，或者不恢复时清空日志"""
+        for kwargs in ({'start_url': START_URL, 'start_page': 3},
+                       {'start_url': 'https://www.gamersky.com/handbook/other.shtml'},
+                       {'start_url': START_URL, 'end_page': 3},
+                       {'start_url': START_URL, 'download_images': False},
+                       {'start_url': START_URL, 'resume': False}):
+            journal = CrawlJournal(self.path, START_URL, resume=False)
+            journal.record_page(page_content(1), None)
+            journal.close()
+
+            reopened = CrawlJournal(self.path, **kwargs)
+            self.assertEqual(reopened.pages, [])
+            reopened.close()
+
+    def test_discard(self):
+        """测试抓取完成后删除日志"""
+        journal = CrawlJournal(self.path, START_URL)
+        journal.discard()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+"""
+测试图片清单和图片信息模块的功能。
+"""
+import os
+import sys
+import struct
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.downloader.manifest import ImageManifest
+from game_guide_scraper.downloader.imageinfo import image_size_from_bytes
+from game_guide_scraper.downloader.downloader import ImageDownloader
+
+
+def png_bytes(width, height):
+    """构造只有文件头的PNG数据"""
+    return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + struct.pack('>II', width, height) + b'\x08\x02\x00\x00\x00'
+
+
+class TestImageInfo(unittest.TestCase):
+    """测试图片尺寸解析"""
+
+    def test_image_size_from_bytes(self):
+        """测试解析各种格式的宽高"""
+        jpeg = (b'\xff\xd8'
+                + b'\xff\xe0' + struct.pack('>H', 16) + b'JFIF\x00' + b'\x00' * 9
+                + b'\xff\xc0' + struct.pack('>HBHH', 17, 8, 480, 640) + b'\x03' + b'\x00' * 9)
+        webp_vp8x = b'RIFF' + b'\x00' * 4 + b'WEBPVP8X' + b'\x00' * 8 + (799).to_bytes(3, 'little') + (599).to_bytes(3, 'little')
+
+        self.assertEqual(image_size_from_bytes(png_bytes(1920, 1080)), (1920, 1080))
+        self.assertEqual(image_size_from_bytes(b'GIF89a' + struct.pack('<HH', 320, 200)), (320, 200))
+        self.assertEqual(image_size_from_bytes(jpeg), (640, 480))
+        self.assertEqual(image_size_from_bytes(webp_vp8x), (800, 600))
+        self.assertIsNone(image_size_from_bytes(b'not an image'))
+        self.assertIsNone(image_size_from_bytes(b'\xff\xd8\xff\xe0'))
+
+
+class TestImageManifest(unittest.TestCase):
+    """测试ImageManifest类以及下载器对清单的使用"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.image_dir = os.path.join(self.temp_dir, 'images')
+        self.db_path = os.path.join(self.image_dir, '.manifest.sqlite3')
+        self.url = 'https://img1.gamersky.com/a.png'
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def _response(self, status_code=200, data=b'', headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        response.iter_content.return_value = [data]
+        return response
+
+    def test_batched_persistence(self):
+        """测试记录在flush后批量写入，并在重新打开时一次性读取"""
+        manifest = ImageManifest(self.db_path)
+        for i in range(100):
+            manifest.record(f'https://img1.gamersky.com/{i}.jpg', f'{i}.jpg', size=i, etag=f'"{i}"')
+        self.assertEqual(len(ImageManifest(self.db_path)), 0)
+
+        self.assertEqual(manifest.flush(), 100)
+        reopened = ImageManifest(self.db_path)
+        self.assertEqual(len(reopened), 100)
+        self.assertEqual(reopened.get('https://img1.gamersky.com/42.jpg')['etag'], '"42"')
+        manifest.close()
+        reopened.close()
+
+    def test_downloader_records_and_skips(self):
+        """测试下载后记录图片信息，再次运行时查询清单，只检查一次文件是否存在"""
+        data = png_bytes(800, 600) + b'\x00' * 50
+        downloader = ImageDownloader(self.image_dir, delay=0, manifest=ImageManifest(self.db_path))
+        downloader.session.get = MagicMock(return_value=self._response(
+            data=data, headers={'Content-Length': str(len(data)), 'ETag': '"v1"'}))
+
+        images = [{'type': 'image', 'url': self.url}]
+        downloader.download_all_images(images)
+        downloader.manifest.close()
+
+        entry = ImageManifest(self.db_path).get(self.url)
+        self.assertEqual(entry['path'], downloader.image_filename(self.url))
+        self.assertEqual((entry['size'], entry['etag'], entry['width'], entry['height']), (len(data), '"v1"', 800, 600))
+        self.assertEqual(len(entry['hash']), 64)
+
+        second = ImageDownloader(self.image_dir, delay=0, manifest=ImageManifest(self.db_path))
+        second.session.get = MagicMock()
+        images = [{'type': 'image', 'url': self.url}]
+        with patch('os.path.exists') as mock_exists:
+            result = second.download_all_images(images)
+        mock_exists.assert_called_once_with(os.path.join(self.image_dir, downloader.image_filename(self.url)))
+        second.session.get.assert_not_called()
+        self.assertIn(self.url, result)
+
+    def test_redownload_deleted_image(self):
+        """测试清单中有记录但图片文件已被删除时重新下载"""
+        data = png_bytes(800, 600)
+        downloader = ImageDownloader(self.image_dir, delay=0, manifest=ImageManifest(self.db_path))
+        downloader.session.get = MagicMock(return_value=self._response(
+            data=data, headers={'Content-Length': str(len(data)), 'ETag': '"v1"'}))
+        local_path = downloader.download_image(self.url)
+        os.remove(local_path)
+
+        result = downloader.download_all_images([{'type': 'image', 'url': self.url}])
+
+        self.assertEqual(downloader.session.get.call_count, 2)
+        # 文件不存在时不发送条件请求，否则304会留下不存在的文件
+        self.assertNotIn('If-None-Match', downloader.session.get.call_args[1]['headers'])
+        self.assertEqual(result, {self.url: local_path})
+        with open(local_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+    def test_backfill_existing_files(self):
+        """测试清单中没有记录的已有图片会被补充到清单中"""
+        os.makedirs(self.image_dir)
+        downloader = ImageDownloader(self.image_dir, delay=0, manifest=ImageManifest(self.db_path))
+        local_path = os.path.join(self.image_dir, downloader.image_filename(self.url))
+        with open(local_path, 'wb') as f:
+            f.write(png_bytes(64, 32))
+
+        downloader.session.get = MagicMock()
+        downloader.download_all_images([{'type': 'image', 'url': self.url}])
+
+        downloader.session.get.assert_not_called()
+        entry = downloader.manifest.get(self.url)
+        self.assertEqual((entry['width'], entry['height']), (64, 32))
+
+    def test_conditional_revalidation(self):
+        """测试强制重新下载时用清单中的ETag发送条件请求，304时保留原文件"""
+        data = png_bytes(10, 10)
+        downloader = ImageDownloader(self.image_dir, delay=0, manifest=ImageManifest(self.db_path))
+        downloader.session.get = MagicMock(return_value=self._response(
+            data=data, headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Aug 2024 07:28:00 GMT'}))
+        local_path = downloader.download_image(self.url)
+        fetched_at = downloader.manifest.get(self.url)['fetched_at']
+
+        downloader.session.get = MagicMock(return_value=self._response(status_code=304))
+        self.assertEqual(downloader.download_image(self.url, skip_existing=False), local_path)
+
+        headers = downloader.session.get.call_args[1]['headers']
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(headers['If-Modified-Since'], 'Wed, 21 Aug 2024 07:28:00 GMT')
+        self.assertGreaterEqual(downloader.manifest.get(self.url)['fetched_at'], fetched_at)
+        with open(local_path, 'rb') as f:
+            self.assertEqual(f.read(), data)
+
+
+if __name__ == '__main__':
+    unittest.main()
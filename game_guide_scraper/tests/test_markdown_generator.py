@@ -0,0 +1,205 @@
+"""
+测试Markdown生成器模块
+"""
+import io
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.parser.parser import Parser
+from game_guide_scraper.organizer.organizer import ContentOrganizer
+from game_guide_scraper.generator.markdown_generator import MarkdownGenerator
+from game_guide_scraper.generator.renderer import ContentRenderer, register_renderer, _RENDERERS
+
+# 与Guide_A规模相当：86个页面，每页7张图片，生成120KB以上的Markdown
+GUIDE_PAGES = 86
+GUIDE_IMAGES_PER_PAGE = 7
+
+# 流式生成之前的实现对下面两个文档生成的Markdown的sha256
+GOLDEN_PAGE_TITLES_SHA256 = '13544ed09a44a330c4e6b067b734954f00dd70c4648cb958a3fa54196d72df51'
+GOLDEN_CHAPTERS_SHA256 = '0eca8a3a4c42d980c75e9c9bc7b7324b4548a4a77c6b18862d7415713eb5a8c5'
+
+
+def page_items(page_number):
+    """构造一个页面的内容元素，覆盖生成器支持的全部元素类型"""
+    items = [{'type': 'text', 'value': f'第{page_number}页：第{page_number % 6 + 1}回-区域{page_number}'}]
+    for i in range(GUIDE_IMAGES_PER_PAGE):
+        items.append({'type': 'text', 'value': f'沿着第{page_number}页的道路前进，第{i + 1}处可以找到宝箱和隐藏的收集品，'
+                                               f'拾取后返回土地庙休息并升级法宝。'})
+        items.append({'type': 'image', 'url': f'https://img1.gamersky.com/{page_number}/{i}.jpg', 'alt': ''})
+    items.extend([
+        {'type': 'heading', 'level': 3, 'value': f'第{page_number}页BOSS'},
+        {'type': 'heading', 'level': 2, 'value': f'第{page_number}页要点', 'id': f'point-{page_number}'},
+        {'type': 'list', 'ordered': page_number % 2 == 0, 'items': ['先清理小怪', '再挑战头目']},
+        {'type': 'table', 'headers': ['物品', '位置'], 'rows': [['葫芦', f'区域{page_number}'], ['丹药', '土地庙']]},
+        {'type': 'code', 'value': 'dodge -> attack', 'language': 'text' if page_number % 2 else ''},
+        {'type': 'quote', 'value': '踏平坎坷成大道\n斗罢艰险又出发'},
+        {'type': 'text', 'value': ''},
+    ])
+    return items
+
+
+def build_guide():
+    """构造Guide_A规模的页面列表和图片映射（三分之二的图片已下载）"""
+    pages = [{
+        'url': f'https://www.gamersky.com/handbook/202408/1803231_{page_number}.shtml',
+        'title': '《黑神话悟空》全探索图文攻略',
+        'page_number': page_number,
+        'content': page_items(page_number)
+    } for page_number in range(1, GUIDE_PAGES + 1)]
+    image_mapping = {
+        f'https://img1.gamersky.com/{page_number}/{i}.jpg': f'output/images/{page_number}_{i}.jpg'
+        for page_number in range(1, GUIDE_PAGES + 1) for i in range(GUIDE_IMAGES_PER_PAGE) if i % 3
+    }
+    return pages, image_mapping
+
+
+def build_page_titles_document():
+    """通过ContentOrganizer构造带页面标题目录的文档"""
+    pages, image_mapping = build_guide()
+    organizer = ContentOrganizer()
+    for page in pages:
+        organizer.add_page_content(page)
+    return organizer.organize_content(), image_mapping
+
+
+def build_chapters_document():
+    """构造没有页面标题、按章节和小节组织的文档"""
+    pages, image_mapping = build_guide()
+    chapters = []
+    for chapter_index in range(0, GUIDE_PAGES, 10):
+        chapter_pages = pages[chapter_index:chapter_index + 10]
+        chapters.append({
+            'title': f'第{chapter_index // 10 + 1}章',
+            'id': f'chapter-{chapter_index // 10 + 1}',
+            'content': chapter_pages[0]['content'][1:],
+            'sections': [{'title': f"小节{page['page_number']}", 'id': f"section-{page['page_number']}",
+                          'content': page['content'][1:]} for page in chapter_pages[1:]]
+        })
+    # 没有id和标题的小节使用默认值
+    chapters[-1]['sections'].append({'content': []})
+    document = {'title': '《黑神话悟空》全探索图文攻略', 'source_url': pages[0]['url'], 'toc': [], 'chapters': chapters}
+    return document, image_mapping
+
+
+class TestMarkdownGenerator(unittest.TestCase):
+    """测试MarkdownGenerator类"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """清理测试环境"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_golden_output(self):
+        """测试Guide_A规模的文档输出与流式生成之前的实现逐字节一致"""
+        for build, golden in ((build_page_titles_document, GOLDEN_PAGE_TITLES_SHA256),
+                              (build_chapters_document, GOLDEN_CHAPTERS_SHA256)):
+            with self.subTest(build.__name__):
+                document, image_mapping = build()
+                markdown = MarkdownGenerator(image_mapping).generate_markdown(document)
+                self.assertGreater(len(markdown.encode('utf-8')), 120 * 1024)
+                self.assertEqual(hashlib.sha256(markdown.encode('utf-8')).hexdigest(), golden)
+
+    def test_streaming_output_matches(self):
+        """测试逐块生成、写入文件和写入任意输出流的结果与generate_markdown一致"""
+        for build in (build_page_titles_document, build_chapters_document):
+            with self.subTest(build.__name__):
+                document, image_mapping = build()
+                generator = MarkdownGenerator(image_mapping)
+                expected = generator.generate_markdown(document)
+                self.assertEqual(''.join(generator.iter_markdown(document)), expected)
+
+                output_file = os.path.join(self.temp_dir, 'nested', 'guide.md')
+                self.assertTrue(generator.write_markdown(document, output_file))
+                with open(output_file, 'rb') as f:
+                    self.assertEqual(f.read(), expected.encode('utf-8'))
+                self.assertEqual(os.listdir(os.path.dirname(output_file)), ['guide.md'])
+
+                sink = io.StringIO()
+                self.assertTrue(generator.write_markdown(document, sink))
+                self.assertEqual(sink.getvalue(), expected)
+
+    def test_empty_document(self):
+        """测试空文档"""
+        generator = MarkdownGenerator()
+        self.assertEqual(generator.generate_markdown({}), "# 空文档\n\n*没有内容可显示*")
+        self.assertEqual(''.join(generator.iter_markdown({})), "# 空文档\n\n*没有内容可显示*")
+
+    def test_parsed_lists_and_tables(self):
+        """测试解析器提取的列表和表格出现在生成的Markdown中"""
+        html = ('<div class="Mid2L_con"><p>装备说明</p><ol><li>如意金箍棒</li><li>锁子黄金甲</li></ol>'
+                '<table><tr><th>技能</th><th>效果</th></tr><tr><td>筋斗云</td><td>提高移动速度</td></tr></table></div>')
+        content = Parser().parse_content(html)['content']
+        markdown = MarkdownGenerator().generate_content_markdown(content)
+        self.assertEqual(markdown, "装备说明\n\n\n\n1. 如意金箍棒\n\n2. 锁子黄金甲\n\n\n\n"
+                                   "| 技能 | 效果 |\n\n| --- | --- |\n\n| 筋斗云 | 提高移动速度 |\n\n\n")
+
+    def test_extra_keys_ignored(self):
+        """测试字典元素中元素类型没有的字段（如下载器写入的source_url）被忽略，不影响生成"""
+        content = [
+            {'type': 'image', 'url': 'u', 'alt': 'a', 'source_url': 'u_S'},
+            {'type': 'list', 'items': ['一'], 'ordered': False, 'style': 'disc'},
+        ]
+        document = {'title': '攻略', 'source_url': '', 'toc': [], 'chapters': [{'title': '正文', 'content': content}]}
+        plain = [{'type': 'image', 'url': 'u', 'alt': 'a'}, {'type': 'list', 'items': ['一'], 'ordered': False}]
+        expected = MarkdownGenerator().generate_markdown(dict(document, chapters=[{'title': '正文', 'content': plain}]))
+
+        generator = MarkdownGenerator()
+        self.assertEqual(generator.generate_markdown(document), expected)
+        self.assertIn('![a](u)', expected)
+        sink = io.StringIO()
+        self.assertTrue(generator.write_markdown(document, sink))
+        self.assertEqual(sink.getvalue(), expected)
+
+
+class TestContentRenderer(unittest.TestCase):
+    """测试ContentRenderer类"""
+
+    def test_render_builtin_types(self):
+        """测试内置元素类型的渲染结果，未注册的类型被忽略"""
+        renderer = ContentRenderer({'https://img1.gamersky.com/1.jpg': 'output/images/1.jpg'})
+        content = [
+            {'type': 'text', 'value': '正文'},
+            {'type': 'image', 'url': 'https://img1.gamersky.com/1.jpg', 'alt': '图1'},
+            {'type': 'image', 'url': 'https://img1.gamersky.com/2.jpg', 'alt': ''},
+            {'type': 'heading', 'level': 3, 'value': '小标题', 'id': 'h-1'},
+            {'type': 'list', 'ordered': True, 'items': ['一', '二']},
+            {'type': 'unknown', 'value': '忽略'},
+        ]
+        self.assertEqual(renderer.render(content),
+                         "正文\n\n![图1](images/1.jpg)\n\n![](https://img1.gamersky.com/2.jpg)\n\n"
+                         "#### 小标题 <a id=\"h-1\"></a>\n\n\n\n1. 一\n\n2. 二\n\n\n")
+        self.assertEqual(renderer.render_item({'type': 'unknown'}), [])
+        self.assertEqual(''.join(renderer.iter_markdown(content)), renderer.render(content))
+
+    def test_register_renderer(self):
+        """测试全局注册和只对单个渲染器注册渲染函数"""
+        def render_spoiler(renderer, item, emit):
+            emit(f"||{item['value']}||\n")
+
+        register_renderer('spoiler', render_spoiler)
+        try:
+            self.assertEqual(ContentRenderer().render([{'type': 'spoiler', 'value': '结局'}]), "||结局||\n")
+            self.assertEqual(MarkdownGenerator().generate_content_markdown([{'type': 'spoiler', 'value': '结局'}]),
+                             "||结局||\n")
+        finally:
+            del _RENDERERS['spoiler']
+        self.assertEqual(ContentRenderer().render([{'type': 'spoiler', 'value': '结局'}]), "")
+
+        renderer = ContentRenderer()
+        renderer.register('text', lambda renderer, item, emit: emit(item['value'].upper()))
+        self.assertEqual(renderer.render([{'type': 'text', 'value': 'boss'}]), "BOSS")
+        self.assertEqual(ContentRenderer().render([{'type': 'text', 'value': 'boss'}]), "boss\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -58,7 +58,24 @@ class TestContentOrganizer(unittest.TestCase):
         invalid_page = {'title': '无效页面'}
         self.organizer.add_page_content(invalid_page)
         self.assertEqual(len(self.organizer.pages), 2)  # 页面数量不变
-        
+
+    def test_add_page_content_out_of_order(self):
+        """测试乱序添加页面时按页码插入，并跳过重复URL"""
+        for page_number in (3, 1, 2, 1, 3):
+            self.organizer.add_page_content({
+                'url': f'https://example.com/page{page_number}',
+                'title': f'第{page_number}页',
+                'page_number': page_number,
+                'content': []
+            })
+        # 没有页码的页面排在最后
+        self.organizer.add_page_content({'url': 'https://example.com/extra', 'title': '附录', 'content': []})
+
+        self.assertEqual([page['page_number'] for page in self.organizer.pages], [1, 2, 3, 4])
+        self.assertEqual(self.organizer.pages[-1]['url'], 'https://example.com/extra')
+        self.assertEqual(self.organizer.title, '第1页')
+        self.assertEqual(self.organizer.source_url, 'https://example.com/page1')
+
     def test_organize_content_single_chapter(self):
         """测试组织单章节内容"""
         # 创建测试页面内容
@@ -0,0 +1,108 @@
+"""
+测试解析结果缓存模块的功能。
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from bs4 import BeautifulSoup
+
+from game_guide_scraper.parser.parser import Parser
+from game_guide_scraper.parser.parse_cache import ParseCache
+
+
+URL = 'https://www.gamersky.com/handbook/202408/1803231.shtml'
+HTML = """
+<html>
+<head><title>黑神话悟空攻略 - 游民星空</title></head>
+<body>
+    <div class="Mid2L_con">
+        <h1>黑神话悟空攻略</h1>
+        <p>第一回的正文内容。</p>
+        <p align="center"><img src="https://img1.gamersky.com/image001_S.jpg" alt="截图" /></p>
+        <p>本文由某某编辑，更多相关内容请关注游民星空</p>
+        <div class="share">分享到</div>
+        <a href="1803231_2.shtml">下一页</a>
+    </div>
+</body>
+</html>
+"""
+
+
+class TestParseCache(unittest.TestCase):
+    """测试ParseCache类以及解析器对缓存的使用"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ParseCache(self.temp_dir)
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def _parse(self, parser, html=HTML):
+        with patch('game_guide_scraper.parser.parser.BeautifulSoup', wraps=BeautifulSoup) as mock_soup:
+            page = parser.parse_page(html, URL, with_index=True)
+        return page, mock_soup.call_count
+
+    def test_cache_hit(self):
+        """测试相同的HTML第二次解析时直接读取缓存，结果相同且互不影响"""
+        first, soups = self._parse(Parser(parse_cache=self.cache))
+        self.assertEqual(soups, 1)
+
+        second, soups = self._parse(Parser(parse_cache=ParseCache(self.temp_dir)))
+        self.assertEqual(soups, 0)
+        self.assertEqual((second.title, second.content, second.next_url),
+                         (first.title, first.content, first.next_url))
+
+        image_index = [item['type'] for item in second.content].index('image')
+        second.content[image_index]['local_path'] = 'images/a.jpg'
+        third, _ = self._parse(Parser(parse_cache=self.cache))
+        self.assertNotIn('local_path', third.content[image_index])
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_invalidated_by_rules(self):
+        """测试HTML、选择器或过滤关键词变化时重新解析"""
+        parser = Parser(parse_cache=self.cache)
+        self._parse(parser)
+
+        _, soups = self._parse(parser, HTML.replace('第一回', '第二回'))
+        self.assertEqual(soups, 1)
+
+        parser.filter_keywords = parser.filter_keywords + ['第一回']
+        page, soups = self._parse(parser)
+        self.assertEqual(soups, 1)
+        self.assertNotIn('第一回的正文内容。', [item.get('value') for item in page.content])
+
+        parser.filter_selectors = [selector for selector in parser.filter_selectors if selector != 'div.share']
+        _, soups = self._parse(parser)
+        self.assertEqual(soups, 1)
+
+        parser.content_selectors = ['article'] + parser.content_selectors
+        _, soups = self._parse(parser)
+        self.assertEqual(soups, 1)
+        _, soups = self._parse(parser)
+        self.assertEqual(soups, 0)
+
+    def test_corrupt_entry(self):
+        """测试损坏的缓存文件被当作未命中"""
+        parser = Parser(parse_cache=self.cache)
+        self._parse(parser)
+        key = ParseCache.key(URL, HTML, True)
+        with open(os.path.join(self.temp_dir, key[:2], f"{key}.pkl.z"), 'wb') as f:
+            f.write(b'broken')
+
+        page, soups = self._parse(parser)
+        self.assertEqual(soups, 1)
+        self.assertTrue(page.ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,12 +4,14 @@
 import os
 import sys
 import unittest
+from unittest.mock import patch
 from bs4 import BeautifulSoup
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from game_guide_scraper.parser.parser import Parser
+from game_guide_scraper.parser.backends import available_backends, select_backend
 
 
 class TestParser(unittest.TestCase):
@@ -111,9 +113,79 @@ class TestParser(unittest.TestCase):
         heading_items = [item for item in content if item['type'] == 'heading']
         self.assertGreater(len(heading_items), 0)
         
-        # 检查是否包含列表内容
-        list_items = [item for item in content if item['type'] in ['ordered_list', 'unordered_list']]
-        self.assertGreater(len(list_items), 0)
+        # 检查列表和表格使用生成器的字段
+        list_items = [item for item in content if item['type'] == 'list']
+        self.assertEqual(list_items, [{'type': 'list', 'ordered': False,
+                                       'items': ['装备1：如意金箍棒', '装备2：凤翅紫金冠', '装备3：锁子黄金甲']}])
+        tables = [item for item in content if item['type'] == 'table']
+        self.assertEqual(tables, [{'type': 'table', 'headers': ['技能名称', '技能效果'],
+                                   'rows': [['火眼金睛', '提高侦察能力'], ['筋斗云', '提高移动速度']]}])
+        
+    def test_extract_table(self):
+        """测试表格单元格的空白合并、竖线转义和补齐，只有一行时表头为空"""
+        soup = BeautifulSoup('<table><tr><td>物品</td><td>位置</td></tr>'
+                             '<tr><td> 葫芦\n(大) </td></tr><tr><td></td><td></td></tr>'
+                             '<tr><td>a|b</td><td>土地庙</td></tr></table>'
+                             '<table><tr><td>单行</td></tr></table><table><tr><td> </td></tr></table>',
+                             'html.parser')
+        tables = [self.parser._extract_table(table) for table in soup.find_all('table')]
+        
+        self.assertEqual(tables[0].headers, ['物品', '位置'])
+        self.assertEqual(tables[0].rows, [['葫芦 (大)', ''], ['a\\|b', '土地庙']])
+        self.assertEqual(tables[1].to_dict(), {'type': 'table', 'headers': [''], 'rows': [['单行']]})
+        self.assertIsNone(tables[2])
+        
+    def test_extract_content_emits_each_block_once(self):
+        """测试嵌套结构中每个文本块和图片只输出一次，并保持文档顺序"""
+        html = """
+        <div class="Mid2L_con">
+            <div>
+                <div><img src="https://example.com/a.jpg" alt="A" /></div>
+                <p>段落一</p>
+                <div>
+                    <p>段落二<img src="https://example.com/b.jpg" alt="B" /></p>
+                </div>
+            </div>
+            <ul><li><p>列表项</p></li></ul>
+        </div>
+        """
+        content = self.parser.extract_content(BeautifulSoup(html, 'html.parser'))
+        
+        self.assertEqual(content, [
+            {'type': 'image', 'url': 'https://example.com/a.jpg', 'alt': 'A'},
+            {'type': 'text', 'value': '段落一'},
+            {'type': 'image', 'url': 'https://example.com/b.jpg', 'alt': 'B'},
+            {'type': 'text', 'value': '段落二'},
+            {'type': 'list', 'items': ['列表项'], 'ordered': False},
+        ])
+        
+    def test_extract_content_div_wrapped_blocks(self):
+        """测试只包含标题、列表或表格的div作为容器遍历，不合并成一段文本"""
+        html = """
+        <div class="Mid2L_con">
+            <div><h2>第一章</h2></div>
+            <div><ul><li>a</li><li>b</li></ul></div>
+            <div><span><table><tr><th>h1</th><th>h2</th></tr><tr><td>x</td><td>y</td></tr></table></span></div>
+        </div>
+        """
+        content = self.parser.extract_content(BeautifulSoup(html, 'html.parser'))
+        
+        self.assertEqual(content, [
+            {'type': 'heading', 'value': '第一章', 'level': 2},
+            {'type': 'list', 'items': ['a', 'b'], 'ordered': False},
+            {'type': 'table', 'headers': ['h1', 'h2'], 'rows': [['x', 'y']]},
+        ])
+        
+    def test_extract_content_deep_nesting(self):
+        """测试深层嵌套的页面"""
+        depth = 500
+        html = ('<div class="Mid2L_con">' + ''.join(f'<div><p>第{i}层</p>' for i in range(depth))
+                + '<img src="https://example.com/deep.jpg" />' + '</div>' * depth + '</div>')
+        content = self.parser.extract_content(BeautifulSoup(html, 'html.parser'))
+        
+        self.assertEqual(len([item for item in content if item['type'] == 'text']), depth)
+        self.assertEqual(len([item for item in content if item['type'] == 'image']), 1)
+        self.assertEqual(content[-1]['url'], 'https://example.com/deep.jpg')
         
     def test_extract_images(self):
         """测试图片提取功能"""
@@ -131,6 +203,16 @@ class TestParser(unittest.TestCase):
         self.assertEqual(images[0]['alt'], '游戏截图1')
         self.assertEqual(images[1]['alt'], '游戏截图2')
         
+    def test_extract_image_thumbnail_url(self):
+        """测试游民星空的缩略图地址改写为原图，同时保留缩略图地址"""
+        soup = BeautifulSoup('<img src="https://img1.gamersky.com/image001_S.jpg" alt="截图">'
+                             '<img src="https://example.com/image2.jpg">', 'html.parser')
+        thumbnail, plain = [self.parser._extract_image_info(img) for img in soup.find_all('img')]
+        
+        self.assertEqual(thumbnail['url'], 'https://img1.gamersky.com/image001.jpg')
+        self.assertEqual(thumbnail['thumbnail_url'], 'https://img1.gamersky.com/image001_S.jpg')
+        self.assertNotIn('thumbnail_url', plain)
+        
     def test_parse_content(self):
         """测试整体解析功能"""
         result = self.parser.parse_content(self.test_html)
@@ -148,6 +230,126 @@ class TestParser(unittest.TestCase):
         # 检查内容列表长度
         self.assertGreater(len(result['content']), 0)
 
+        
+    def test_parse_page(self):
+        """测试一次解析得到标题、内容和下一页URL"""
+        html = self.test_html.replace('</ul>', '</ul>\n<a href="page2.html">下一页</a>')
+        
+        with patch('game_guide_scraper.parser.parser.BeautifulSoup', wraps=BeautifulSoup) as mock_soup:
+            page = self.parser.parse_page(html, 'https://example.com/page1.html')
+            
+        # 整个页面只构建一次DOM
+        self.assertEqual(mock_soup.call_count, 1)
+        
+        # 检查解析结果
+        self.assertTrue(page.ok)
+        self.assertEqual(page.title, '黑神话悟空攻略 - 第一章')
+        self.assertEqual(page.next_url, 'https://example.com/page2.html')
+        self.assertEqual(page.content, self.parser.parse_content(html)['content'])
+        
+        # 检查转换为页面内容字典
+        page_content = page.to_dict(3)
+        self.assertEqual(page_content['url'], 'https://example.com/page1.html')
+        self.assertEqual(page_content['page_number'], 3)
+        
+    def test_parse_page_empty_html(self):
+        """测试解析空HTML的情况"""
+        self.assertIsNone(self.parser.parse_page('', 'https://example.com/page1.html'))
+        self.assertIsNone(self.parser.parse_page(None, 'https://example.com/page1.html'))
+
+        
+    def test_should_filter_text(self):
+        """测试文本过滤规则"""
+        # 包含过滤关键词
+        self.assertTrue(self.parser._should_filter_text('更多相关内容请关注：黑神话悟空专区'))
+        self.assertTrue(self.parser._should_filter_text('责任编辑：某某'))
+        
+        # 单独的页面标题保留，多个页码的导航列表过滤
+        self.assertFalse(self.parser._should_filter_text('第1页：小妖-第一回-狼斥候'))
+        self.assertTrue(self.parser._should_filter_text('第1页：小妖第2页：头目'))
+        
+        # 只包含数字的页码
+        self.assertTrue(self.parser._should_filter_text('1 2 3 4 5'))
+        self.assertFalse(self.parser._should_filter_text('这是正常的正文内容。'))
+        
+        # 统计每次调用
+        stats = self.parser.text_filter.stats()
+        self.assertEqual(stats['calls'], 6)
+        self.assertEqual(stats['filtered'], 4)
+        
+    def test_extra_filter_keywords(self):
+        """测试通过配置追加过滤关键词"""
+        keywords = [f'活动{i}' for i in range(500)] + ['a.b(c']
+        parser = Parser(extra_filter_keywords=keywords)
+        
+        self.assertTrue(parser._should_filter_text('参加活动499可以获得奖励'))
+        self.assertTrue(parser._should_filter_text('特殊字符a.b(c不会被当作正则'))
+        self.assertFalse(parser._should_filter_text('特殊字符axb(c'))
+        
+        # 重新赋值关键词后重新编译过滤器
+        parser.filter_keywords = parser.filter_keywords + ['新关键词']
+        self.assertTrue(parser._should_filter_text('包含新关键词的文本'))
+
+    def test_remove_unwanted_elements(self):
+        """测试一次遍历移除无用元素，结果与逐个选择器select一致"""
+        html = """
+        <html><body>
+            <div class="header"><div class="nav">导航</div><script>var a;</script></div>
+            <div class="Mid2L_con">
+                <p>正文</p>
+                <div class="ad share"><iframe src="x"></iframe></div>
+                <span class="share">保留（不是div）</span>
+                <style>p {}</style>
+            </div>
+            <div class="footer">版权</div>
+            <script>var b;</script>
+            <section id="promo"><p>推广</p></section>
+        </body></html>
+        """
+        parser = Parser()
+        parser.filter_selectors = parser.filter_selectors + ['section#promo']
+
+        expected = BeautifulSoup(html, 'html.parser')
+        for selector in parser.filter_selectors:
+            for element in expected.select(selector):
+                element.decompose()
+
+        soup = BeautifulSoup(html, 'html.parser')
+        counts = parser._remove_unwanted_elements(soup)
+
+        self.assertEqual(str(soup), str(expected))
+        # 匹配的子树整体摘除，其中的元素不再单独计数
+        self.assertEqual(counts, {
+            'div.header': 1,
+            'div.share': 1,
+            'style': 1,
+            'div.footer': 1,
+            'script': 1,
+            'section#promo': 1
+        })
+        self.assertEqual(parser.boilerplate.removed['script'], 1)
+
+    def test_backend_conformance(self):
+        """测试所有可用解析后端生成相同的内容元素列表"""
+        expected = self.parser.parse_content(self.test_html)['content']
+        
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                parser = Parser(backend=backend)
+                self.assertEqual(parser.backend, backend)
+                self.assertEqual(parser.parse_content(self.test_html)['content'], expected)
+                
+    def test_select_backend(self):
+        """测试解析后端的选择"""
+        self.assertEqual(select_backend(None), 'html.parser')
+        self.assertEqual(select_backend('html.parser'), 'html.parser')
+        
+        # 不可用的后端回退到默认后端
+        self.assertEqual(select_backend('not-installed'), 'html.parser')
+        
+        # 自动选择的结果必须是可用后端之一
+        self.assertIn(select_backend('auto'), available_backends())
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+测试限速器模块的功能。
+"""
+import os
+import sys
+import asyncio
+import threading
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.utils.rate_limiter import TokenBucket, RateLimiter, rate_from_delay
+
+
+class TestRateLimiter(unittest.TestCase):
+    """测试TokenBucket和RateLimiter类的功能"""
+
+    def test_token_bucket_burst(self):
+        """测试令牌桶允许burst个请求立即发送，之后按速率依次预约"""
+        with patch('game_guide_scraper.utils.rate_limiter.time.monotonic', return_value=100.0):
+            bucket = TokenBucket(rate=2.0, burst=3)
+            waits = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(waits, [0.0, 0.0, 0.0, 0.5, 1.0])
+
+    def test_token_bucket_refill(self):
+        """测试令牌按速率补充，且不超过桶容量"""
+        clock = [0.0]
+        with patch('game_guide_scraper.utils.rate_limiter.time.monotonic', side_effect=lambda: clock[0]):
+            bucket = TokenBucket(rate=1.0, burst=2)
+            self.assertEqual(bucket.reserve(), 0.0)
+            self.assertEqual(bucket.reserve(), 0.0)
+            clock[0] = 10.0  # 长时间空闲后最多积累burst个令牌
+            self.assertEqual([bucket.reserve() for _ in range(3)], [0.0, 0.0, 1.0])
+
+    def test_unlimited(self):
+        """测试速率为None时不限速"""
+        limiter = RateLimiter()
+        self.assertEqual(limiter.reserve('https://example.com/a', rate=rate_from_delay(0)), 0.0)
+        self.assertEqual(limiter.reserve('https://example.com/b', rate=None), 0.0)
+
+    def test_host_rules(self):
+        """测试按主机名匹配限速规则，通配符规则下的主机共享令牌桶"""
+        limiter = RateLimiter({
+            'www.gamersky.com': {'rate': 1.0, 'burst': 1},
+            'img*.gamersky.com': (10.0, 4),
+        })
+        page_bucket = limiter.bucket_for('https://www.gamersky.com/handbook/1.shtml', rate=100.0)
+        self.assertEqual((page_bucket.rate, page_bucket.burst), (1.0, 1))
+
+        img1 = limiter.bucket_for('https://img1.gamersky.com/a.jpg')
+        img2 = limiter.bucket_for('https://IMG2.gamersky.com/b.jpg')
+        self.assertIs(img1, img2)
+        self.assertEqual((img1.rate, img1.burst), (10.0, 4))
+
+        # 没有匹配规则的主机使用调用者提供的默认值，各自一个令牌桶
+        other = limiter.bucket_for('https://example.com/', rate=2.0)
+        self.assertEqual(other.rate, 2.0)
+        self.assertIsNot(other, limiter.bucket_for('https://example.org/', rate=2.0))
+
+        # 页面主机用完令牌不影响图片主机
+        self.assertEqual(limiter.reserve('https://www.gamersky.com/1.shtml'), 0.0)
+        self.assertGreater(limiter.reserve('https://www.gamersky.com/2.shtml'), 0.0)
+        self.assertEqual(limiter.reserve('https://img1.gamersky.com/c.jpg'), 0.0)
+
+    def test_thread_safety(self):
+        """测试多个线程同时预约时每个令牌只被预约一次"""
+        bucket = TokenBucket(rate=1.0, burst=1)
+        waits = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(50):
+                wait = bucket.reserve()
+                with lock:
+                    waits.append(wait)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 400次预约依次排队，最后一次需要等待约399秒
+        self.assertEqual(len(waits), 400)
+        self.assertEqual(sum(1 for wait in waits if wait == 0.0), 1)
+        self.assertAlmostEqual(max(waits), 399.0, delta=1.0)
+
+    def test_acquire_async(self):
+        """测试协程版本的acquire"""
+        limiter = RateLimiter({'example.com': {'rate': 50.0, 'burst': 1}})
+
+        async def run():
+            return [await limiter.acquire_async('https://example.com/') for _ in range(2)]
+
+        waits = asyncio.run(run())
+        self.assertEqual(waits[0], 0.0)
+        self.assertGreater(waits[1], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -278,6 +278,54 @@ class TestScraper(unittest.TestCase):
         # 验证结果
         self.assertEqual(next_url, 'https://example.com/page3.html')
 
+    
+    def test_get_page_index(self):
+        """测试从文章内容导航中提取页面列表"""
+        html_with_index = """
+        <!DOCTYPE html>
+        <html>
+        <body>
+            <div class="Mid2L_con">
+                <p>第1页：小妖-第一回-狼斥候</p>
+                <a href="1803231_2.shtml">下一页</a>
+            </div>
+            <div class="page_css">
+                <p>文章内容导航</p>
+                <ul>
+                    <li>第1页：小妖-第一回-狼斥候</li>
+                    <li><a href="1803231_2.shtml">第2页：小妖-第一回-狼校卒</a></li>
+                    <li><a href="https://example.com/1803231_3.shtml">第3页：头目-第一回-广智</a></li>
+                </ul>
+            </div>
+        </body>
+        </html>
+        """
+        
+        base_url = 'https://example.com/1803231.shtml'
+        page_index = self.scraper.get_page_index(html_with_index, base_url)
+        
+        # 验证结果
+        self.assertEqual([entry['url'] for entry in page_index], [
+            'https://example.com/1803231.shtml',
+            'https://example.com/1803231_2.shtml',
+            'https://example.com/1803231_3.shtml'
+        ])
+        self.assertEqual([entry['page_number'] for entry in page_index], [1, 2, 3])
+        self.assertEqual(page_index[1]['title'], '小妖-第一回-狼校卒')
+        
+        # 从中间页面开始时，只返回当前页面及之后的页面
+        page_index = self.scraper.get_page_index(html_with_index, 'https://example.com/1803231_2.shtml')
+        self.assertEqual([entry['page_number'] for entry in page_index], [2, 3])
+    
+    def test_get_page_index_without_index(self):
+        """测试没有页面索引的情况"""
+        base_url = 'https://example.com/page1.html'
+        
+        # 验证结果
+        self.assertEqual(self.scraper.get_page_index(self.test_html, base_url), [])
+        self.assertEqual(self.scraper.get_page_index('', base_url), [])
+        self.assertEqual(self.scraper.get_page_index(None, base_url), [])
+
 
 if __name__ == '__main__':
     # 导入requests模块用于测试
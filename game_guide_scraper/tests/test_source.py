@@ -0,0 +1,144 @@
+"""
+测试图片来源选择模块的功能。
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.downloader.source import ImageSourceSelector
+from game_guide_scraper.downloader.downloader import ImageDownloader
+from game_guide_scraper.parser.items import ImageItem
+from game_guide_scraper.tests.test_manifest import png_bytes
+
+
+ORIGINAL = 'https://img1.gamersky.com/image001.jpg'
+THUMBNAIL = 'https://img1.gamersky.com/image001_S.jpg'
+
+
+class TestImageSourceSelector(unittest.TestCase):
+    """测试ImageSourceSelector类的功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.image_info = {'type': 'image', 'url': ORIGINAL, 'thumbnail_url': THUMBNAIL}
+        # URL -> 探测结果
+        self.probes = {
+            ORIGINAL: {'size': 900000, 'dimensions': (1920, 1080)},
+            THUMBNAIL: {'size': 60000, 'dimensions': (550, 309)},
+        }
+        self.probed = []
+
+    def _probe(self, url, head=False):
+        self.probed.append((url, head))
+        return self.probes[url]
+
+    def test_quality_tiers(self):
+        """测试original/high下载原图且不探测，medium/low下载缩略图"""
+        for quality in ('original', 'high'):
+            self.assertEqual(ImageSourceSelector(quality).select(self.image_info, self._probe), ORIGINAL)
+        self.assertEqual(self.probed, [])
+
+        selector = ImageSourceSelector('low')
+        self.assertEqual(selector.select(self.image_info, self._probe), THUMBNAIL)
+        self.assertEqual(self.probed, [(THUMBNAIL, False)])
+        self.assertEqual(selector.spent, 60000)
+
+        self.assertEqual(selector.select({'type': 'image', 'url': 'https://example.com/a.jpg'}, self._probe),
+                         'https://example.com/a.jpg')
+
+    def test_small_thumbnail_upgraded(self):
+        """测试缩略图太小时改为下载原图"""
+        self.probes[THUMBNAIL]['dimensions'] = (200, 150)
+        selector = ImageSourceSelector('medium', min_dimension=480)
+
+        self.assertEqual(selector.select(self.image_info, self._probe), ORIGINAL)
+        self.assertEqual(selector.upgraded, 1)
+
+    def test_byte_budget(self):
+        """测试超出流量预算的原图改为下载缩略图"""
+        selector = ImageSourceSelector('high', byte_budget=1000000)
+
+        self.assertEqual(selector.select(self.image_info, self._probe), ORIGINAL)
+        self.assertEqual(selector.select(self.image_info, self._probe), THUMBNAIL)
+        self.assertEqual((selector.originals, selector.thumbnails, selector.budget_limited), (1, 1, 1))
+        self.assertEqual(self.probed, [(ORIGINAL, True), (ORIGINAL, True)])
+
+    def test_local_image_not_probed(self):
+        """测试已在本地的图片直接使用，不发送探测请求"""
+        selector = ImageSourceSelector('low', byte_budget=0)
+        self.assertEqual(selector.select(self.image_info, self._probe, lambda url: url == ORIGINAL), ORIGINAL)
+        self.assertEqual(selector.select(self.image_info, self._probe, lambda url: url == THUMBNAIL), THUMBNAIL)
+        self.assertEqual(self.probed, [])
+
+
+class TestDownloaderSourceSelection(unittest.TestCase):
+    """测试下载器按来源选择器下载缩略图"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def _thumbnail_downloader(self, data, thumbnails):
+        """
+        创建选择缩略图的下载器，只允许下载给定的缩略图
+
+        参数:
+            data: 缩略图内容
+            thumbnails: 允许下载的缩略图URL集合
+        """
+        downloader = ImageDownloader(self.temp_dir, delay=0, source_selector=ImageSourceSelector('low'))
+
+        def fake_get(url, **kwargs):
+            response = MagicMock()
+            if url not in thumbnails:
+                raise AssertionError(f'不应下载 {url}')
+            if kwargs['headers'].get('Range', '').startswith('bytes=0-'):  # 探测文件头
+                response.status_code = 206
+                response.headers = {'Content-Range': f'bytes 0-{len(data) - 1}/{len(data)}'}
+            else:
+                response.status_code = 200
+                response.headers = {'Content-Length': str(len(data))}
+            response.iter_content.return_value = [data]
+            return response
+
+        downloader.session.get = MagicMock(side_effect=fake_get)
+        return downloader
+
+    def test_download_thumbnail(self):
+        """测试下载缩略图后，映射仍以原图URL为键，并记录实际下载地址"""
+        data = png_bytes(550, 309) + b'\x00' * 100
+        downloader = self._thumbnail_downloader(data, {THUMBNAIL})
+        images = [{'type': 'image', 'url': ORIGINAL, 'thumbnail_url': THUMBNAIL}]
+        result = downloader.download_all_images(images)
+
+        self.assertEqual(list(result), [ORIGINAL])
+        self.assertEqual(os.path.basename(result[ORIGINAL]), downloader.image_filename(THUMBNAIL))
+        self.assertEqual(images[0]['source_url'], THUMBNAIL)
+        self.assertEqual(downloader.source_selector.spent, len(data))
+
+    def test_download_thumbnail_typed_items(self):
+        """测试解析器产生的ImageItem选择缩略图时记录实际下载地址，同一页面的每张图片都得到local_path"""
+        data = png_bytes(550, 309) + b'\x00' * 100
+        second_thumbnail = THUMBNAIL.replace('image001', 'image002')
+        downloader = self._thumbnail_downloader(data, {THUMBNAIL, second_thumbnail})
+        images = [ImageItem(ORIGINAL, thumbnail_url=THUMBNAIL),
+                  ImageItem(second_thumbnail.replace('_S.jpg', '.jpg'), thumbnail_url=second_thumbnail)]
+        result = downloader.download_all_images(images)
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual([image.source_url for image in images], [THUMBNAIL, second_thumbnail])
+        self.assertEqual([image['local_path'] for image in images], [result[image.url] for image in images])
+
+
+if __name__ == '__main__':
+    unittest.main()
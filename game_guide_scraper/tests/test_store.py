@@ -0,0 +1,127 @@
+"""
+测试图片库模块的功能。
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.downloader.store import ImageStore
+from game_guide_scraper.downloader.downloader import ImageDownloader
+
+
+class TestImageStore(unittest.TestCase):
+    """测试ImageStore类的功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store_dir = os.path.join(self.temp_dir, 'store')
+        self.images = {
+            'https://img1.gamersky.com/a.jpg': b'image A',
+            'https://img2.gamersky.com/a.jpg': b'image A',  # CDN镜像，内容相同
+            'https://img1.gamersky.com/b.png': b'image B',
+        }
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def _downloader(self, guide):
+        downloader = ImageDownloader(os.path.join(self.temp_dir, guide, 'images'), delay=0,
+                                     store=ImageStore(self.store_dir))
+        downloader.session.get = MagicMock(side_effect=self._fake_get)
+        return downloader
+
+    def _fake_get(self, url, **kwargs):
+        response = MagicMock()
+        response.iter_content.return_value = [self.images[url]]
+        return response
+
+    def test_deduplicate_content(self):
+        """测试相同内容只保存一份，图片目录中是指向图片库的链接"""
+        downloader = self._downloader('Guide_A')
+        images = [{'type': 'image', 'url': url} for url in self.images]
+        result = downloader.download_all_images(images)
+
+        self.assertEqual(len(result), 3)
+        for url, path in result.items():
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), self.images[url])
+
+        objects = [name for _, _, files in os.walk(downloader.store.objects_dir) for name in files]
+        self.assertEqual(len(objects), 2)
+        self.assertEqual(downloader.store.dedup_hits, 1)
+
+        path_a = result['https://img1.gamersky.com/a.jpg']
+        mirror_a = result['https://img2.gamersky.com/a.jpg']
+        self.assertNotEqual(path_a, mirror_a)  # 文件名仍然按URL生成
+        self.assertTrue(os.path.samefile(path_a, mirror_a))
+
+    def test_known_url_is_not_fetched_again(self):
+        """测试另一个攻略中已知的URL直接从图片库链接，不再下载"""
+        first = self._downloader('Guide_A')
+        first.download_all_images([{'type': 'image', 'url': url} for url in self.images])
+
+        second = self._downloader('Guide_B')
+        images = [{'type': 'image', 'url': url} for url in self.images]
+        result = second.download_all_images(images)
+
+        second.session.get.assert_not_called()
+        self.assertEqual(second.store.url_hits, 3)
+        self.assertTrue(all(os.path.dirname(path) == second.output_dir for path in result.values()))
+
+    def test_force_download_keeps_store_intact(self):
+        """测试强制重新下载时不会改写与图片库共享的文件"""
+        downloader = self._downloader('Guide_A')
+        url = 'https://img1.gamersky.com/b.png'
+        path = downloader.download_image(url)
+        object_path = downloader.store.lookup(url)
+
+        self.images[url] = b'image B v2'
+        downloader.store._index.clear()
+        downloader.download_image(url, skip_existing=False)
+
+        with open(object_path, 'rb') as f:
+            self.assertEqual(f.read(), b'image B')
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'image B v2')
+
+    def test_link_fallback(self):
+        """测试不能建立硬链接时退回为相对路径的符号链接"""
+        store = ImageStore(self.store_dir)
+        source = os.path.join(self.temp_dir, 'download')
+        with open(source, 'wb') as f:
+            f.write(b'image C')
+        object_path = store.add('https://img1.gamersky.com/c.jpg', source)
+        dest = os.path.join(self.temp_dir, 'Guide_C', 'images', 'c.jpg')
+
+        with patch('os.link', side_effect=OSError('cross-device link')):
+            method = store.link(object_path, dest)
+
+        self.assertEqual(method, 'symlink')
+        self.assertFalse(os.path.isabs(os.readlink(dest)))
+        with open(dest, 'rb') as f:
+            self.assertEqual(f.read(), b'image C')
+
+    def test_index_persistence(self):
+        """测试URL索引保存后可被其他实例读取"""
+        store = ImageStore(self.store_dir)
+        source = os.path.join(self.temp_dir, 'download')
+        with open(source, 'wb') as f:
+            f.write(b'image D')
+        object_path = store.add('https://img1.gamersky.com/d.jpg', source)
+        store.save()
+
+        reopened = ImageStore(self.store_dir)
+        self.assertEqual(reopened.lookup('https://img1.gamersky.com/d.jpg'), object_path)
+        self.assertIsNone(reopened.lookup('https://img1.gamersky.com/unknown.jpg'))
+
+
+if __name__ == '__main__':
+    unittest.main()
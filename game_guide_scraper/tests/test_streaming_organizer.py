@@ -0,0 +1,86 @@
+"""
+测试流式内容组织器模块
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.organizer.organizer import ContentOrganizer
+from game_guide_scraper.organizer.streaming import StreamingContentOrganizer
+from game_guide_scraper.generator.markdown_generator import MarkdownGenerator
+
+
+def page_content(page_number):
+    """构造一个包含页面标题、正文和图片的页面内容字典"""
+    return {
+        'url': f'https://www.gamersky.com/handbook/202408/1803231_{page_number}.shtml',
+        'title': f'黑神话悟空攻略 第{page_number}页',
+        'page_number': page_number,
+        'content': [
+            {'type': 'text', 'value': f'第{page_number}页：第{page_number}回'},
+            {'type': 'text', 'value': f'这是第{page_number}页的正文。'},
+            {'type': 'image', 'url': f'https://img1.gamersky.com/{page_number}.jpg', 'alt': f'图{page_number}'},
+            {'type': 'heading', 'level': 3, 'value': f'第{page_number}页小标题'}
+        ]
+    }
+
+
+class TestStreamingContentOrganizer(unittest.TestCase):
+    """测试StreamingContentOrganizer类"""
+
+    def setUp(self):
+        """设置测试环境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.organizer = StreamingContentOrganizer(self.temp_dir)
+
+    def tearDown(self):
+        """清理测试环境"""
+        self.organizer.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_in_memory_organizer(self):
+        """测试乱序添加时组织结果和生成的Markdown与内存组织器一致"""
+        organizer = ContentOrganizer()
+        for page_number in (2, 1, 3, 2):
+            organizer.add_page_content(page_content(page_number))
+            self.organizer.add_page_content(page_content(page_number))
+
+        expected = organizer.organize_content()
+        document = self.organizer.organize_content()
+        self.assertEqual(document['title'], expected['title'])
+        self.assertEqual(document['toc'], expected['toc'])
+        self.assertEqual(document['page_titles'], expected['page_titles'])
+        self.assertEqual(list(document['chapters'][0]['content']), expected['chapters'][0]['content'])
+        # 可以多次遍历
+        self.assertEqual(list(document['chapters'][0]['content']), expected['chapters'][0]['content'])
+
+        image_mapping = {'https://img1.gamersky.com/2.jpg': 'output/images/2.jpg'}
+        self.assertEqual(MarkdownGenerator(image_mapping).generate_markdown(document),
+                         MarkdownGenerator(image_mapping).generate_markdown(expected))
+
+    def test_pages_do_not_keep_text(self):
+        """测试页面内容写入磁盘后，内存中只保留页面信息和图片元素"""
+        self.organizer.add_page_content(page_content(1))
+        page = self.organizer.pages[0]
+        self.assertNotIn('content', page)
+        self.assertEqual([item['url'] for item in page['images']], ['https://img1.gamersky.com/1.jpg'])
+        self.assertGreater(self.organizer.spilled_bytes, 0)
+
+    def test_image_results_after_add(self):
+        """测试页面添加之后（后台下载完成时）写入的local_path在读取结果中可见"""
+        content = page_content(1)
+        self.organizer.add_page_content(content)
+        content['content'][2]['local_path'] = 'output/images/1.jpg'
+
+        document = self.organizer.organize_content()
+        images = [item for item in document['chapters'][0]['content'] if item['type'] == 'image']
+        self.assertEqual(images[0]['local_path'], 'output/images/1.jpg')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+测试图片转码模块的功能。
+"""
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from game_guide_scraper.downloader.transcoder import ImageTranscoder, pillow_available
+from game_guide_scraper.downloader.imageinfo import image_size
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+@unittest.skipIf(Image is None, '未安装Pillow')
+class TestImageTranscoder(unittest.TestCase):
+    """测试ImageTranscoder类的功能"""
+
+    def setUp(self):
+        """测试前的准备工作"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """测试后的清理工作"""
+        shutil.rmtree(self.temp_dir)
+
+    def _write_image(self, name, size, mode='RGB'):
+        path = os.path.join(self.temp_dir, name)
+        image = Image.linear_gradient('L').resize(size).convert(mode)
+        if name.endswith('.png'):
+            image.save(path, 'PNG', optimize=True)
+        else:
+            image.save(path, 'JPEG', quality=100)
+        return path
+
+    def test_transcode_tiers(self):
+        """测试按质量等级缩放图片，并更新所有引用该图片的图片项"""
+        source = self._write_image('a.jpg', (3000, 1500))
+        items = [
+            {'type': 'image', 'url': 'https://img1.gamersky.com/a.jpg', 'local_path': source},
+            {'type': 'image', 'url': 'https://img2.gamersky.com/a.jpg', 'local_path': source},
+        ]
+
+        stats = ImageTranscoder('medium', workers=2).transcode(items)
+
+        variant = os.path.join(self.temp_dir, 'a_medium.jpg')
+        self.assertEqual([item['local_path'] for item in items], [variant, variant])
+        self.assertEqual(image_size(variant), (1280, 640))
+        self.assertTrue(os.path.exists(source))
+        self.assertEqual(stats['transcoded'], 1)
+        self.assertLess(stats['bytes_after'], stats['bytes_before'])
+
+        # 再次运行时复用已有的转码结果
+        items = [{'type': 'image', 'url': 'https://img1.gamersky.com/a.jpg', 'local_path': source}]
+        transcoder = ImageTranscoder('medium', workers=2)
+        with patch('game_guide_scraper.downloader.transcoder.ProcessPoolExecutor') as mock_pool:
+            stats = transcoder.transcode(items)
+        mock_pool.assert_not_called()
+        self.assertEqual((stats['reused'], items[0]['local_path']), (1, variant))
+
+    def test_webp_output(self):
+        """测试输出WebP格式"""
+        source = self._write_image('b.png', (1000, 1000), mode='RGBA')
+        items = [{'type': 'image', 'url': 'https://img1.gamersky.com/b.png', 'local_path': source}]
+
+        ImageTranscoder('low', webp=True, workers=1).transcode(items)
+
+        self.assertEqual(items[0]['local_path'], os.path.join(self.temp_dir, 'b_low.webp'))
+        self.assertEqual(image_size(items[0]['local_path']), (800, 800))
+
+    def test_keep_original_when_not_smaller(self):
+        """测试转码后没有变小或无法识别的图片保留原图"""
+        small = self._write_image('c.png', (16, 16), mode='RGBA')
+        broken = os.path.join(self.temp_dir, 'd.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'not an image')
+        items = [
+            {'type': 'image', 'url': 'https://img1.gamersky.com/c.png', 'local_path': small},
+            {'type': 'image', 'url': 'https://img1.gamersky.com/d.jpg', 'local_path': broken},
+        ]
+
+        stats = ImageTranscoder('high', workers=1).transcode(items)
+
+        self.assertEqual([item['local_path'] for item in items], [small, broken])
+        self.assertEqual((stats['transcoded'], stats['kept']), (0, 2))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'c_high.png')))
+
+        # 再次运行时没有变小的图片不再转码，原图更新后重新转码
+        items = [{'type': 'image', 'url': 'https://img1.gamersky.com/c.png', 'local_path': small}]
+        with patch('game_guide_scraper.downloader.transcoder.ProcessPoolExecutor') as mock_pool:
+            stats = ImageTranscoder('high', workers=1).transcode(items)
+        mock_pool.assert_not_called()
+        self.assertEqual((stats['kept'], items[0]['local_path']), (1, small))
+
+        marker = ImageTranscoder('high').kept_marker_path(small)
+        os.utime(marker, (os.path.getmtime(small) - 10,) * 2)
+        stats = ImageTranscoder('high', workers=1).transcode(items)
+        self.assertEqual((stats['kept'], items[0]['local_path']), (1, small))
+        self.assertGreaterEqual(os.path.getmtime(marker), os.path.getmtime(small))
+
+    def test_original_and_missing_pillow(self):
+        """测试original等级和未安装Pillow时不修改图片项"""
+        source = self._write_image('e.jpg', (2000, 2000))
+        items = [{'type': 'image', 'url': 'https://img1.gamersky.com/e.jpg', 'local_path': source}]
+
+        ImageTranscoder('original').transcode(items)
+        with patch('game_guide_scraper.downloader.transcoder.pillow_available', return_value=False):
+            ImageTranscoder('low').transcode(items)
+
+        self.assertEqual(items[0]['local_path'], source)
+        self.assertTrue(pillow_available())
+        with self.assertRaises(ValueError):
+            ImageTranscoder('ultra')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -167,8 +167,15 @@ class InteractiveController:
             message: 进度消息
             percentage: 完成百分比（0-100）
         """
+        # 如果发现了页面索引，记录总页数
+        if "发现页面索引" in message and "共" in message:
+            try:
+                self.total_pages = int(message.split("共")[1].split("页")[0].strip())
+            except:
+                pass
+                
         # 如果是页面进度更新
-        if "正在抓取第" in message and "页" in message:
+        elif "正在抓取第" in message and "页" in message:
             try:
                 self.current_page = int(message.split("第")[1].split("页")[0].strip())
                 if self.progress_bar is None and self.config.get('show_progress_bar', True):
@@ -0,0 +1,93 @@
+"""
+HTTP会话模块，构建页面抓取和图片下载共享的requests会话，并统计连接池的复用情况。
+"""
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# 页面请求协商压缩（urllib3支持的编码，安装brotli/zstandard后会自动包含br/zstd）
+HTML_HEADERS = {'Accept-Encoding': ACCEPT_ENCODING}
+
+# 图片本身已经压缩，请求原始字节，保证Content-Length与写入文件的大小一致
+IMAGE_HEADERS = {'Accept-Encoding': 'identity'}
+
+# 默认缓存的主机连接池数量和每个主机保持的连接数
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+def build_session(user_agent: Optional[str] = None, headers: Optional[Dict[str, str]] = None,
+                  pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                  proxies: Optional[Dict[str, str]] = None) -> requests.Session:
+    """
+    构建带有连接池的requests会话
+
+    同一主机的请求复用keep-alive连接，省去重复的TCP和TLS握手。会话可以在多个线程之间共享，
+    pool_maxsize应不小于同时访问同一主机的线程数，否则多出的连接用完即关闭，无法复用。
+
+    参数:
+        user_agent: 请求头中的User-Agent
+        headers: 额外的默认请求头
+        pool_connections: 缓存的主机连接池数量
+        pool_maxsize: 每个主机连接池保持的最大连接数
+        proxies: 代理设置
+
+    返回:
+        requests.Session对象
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max(1, int(pool_connections)), pool_maxsize=max(1, int(pool_maxsize)))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    session.headers.update(HTML_HEADERS)
+    if user_agent:
+        session.headers['User-Agent'] = user_agent
+    if headers:
+        session.headers.update(headers)
+    if proxies:
+        session.proxies.update(proxies)
+    return session
+
+
+def pool_stats(session: requests.Session) -> Dict[str, Any]:
+    """
+    统计会话连接池的复用情况
+
+    每个主机连接池记录发出的请求数和新建的连接数：新建连接视为未命中，其余请求复用了已有连接，视为命中。
+    已被淘汰的主机连接池不计入统计。
+
+    参数:
+        session: requests.Session对象
+
+    返回:
+        包含requests、hits、misses和hosts（主机到{requests, hits, misses}的映射）的字典
+    """
+    hosts = {}
+    seen = set()
+    for adapter in session.adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is None or id(pool_manager) in seen:
+            continue
+        seen.add(id(pool_manager))
+
+        for key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+            host = f"{pool.scheme}://{pool.host}:{pool.port}"
+            requests_count = pool.num_requests
+            misses = pool.num_connections
+            entry = hosts.setdefault(host, {'requests': 0, 'hits': 0, 'misses': 0})
+            entry['requests'] += requests_count
+            entry['misses'] += misses
+            entry['hits'] += max(0, requests_count - misses)
+
+    return {
+        'requests': sum(entry['requests'] for entry in hosts.values()),
+        'hits': sum(entry['hits'] for entry in hosts.values()),
+        'misses': sum(entry['misses'] for entry in hosts.values()),
+        'hosts': hosts
+    }
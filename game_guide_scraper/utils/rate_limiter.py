@@ -0,0 +1,204 @@
+"""
+限速器模块，按主机名使用令牌桶控制请求频率，可在多个线程、协程和组件之间共享。
+"""
+import time
+import asyncio
+import threading
+from fnmatch import fnmatch
+from urllib.parse import urlparse
+from typing import Any, Dict, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    令牌以rate个/秒的速度补充，最多积累burst个。每次请求消耗一个令牌；
+    没有令牌时预约下一个令牌，调用者等待到预约的时间再发送请求，
+    因此多个线程同时请求时按预约顺序依次放行。
+
+    属性:
+        rate: 每秒补充的令牌数，为None或0表示不限速
+        burst: 桶容量，即允许连续发送的最大请求数
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        """
+        初始化令牌桶，初始时桶是满的
+
+        参数:
+            rate: 每秒补充的令牌数，为None或0表示不限速
+            burst: 桶容量
+        """
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        预约一个令牌
+
+        返回:
+            调用者发送请求前需要等待的秒数，0表示可以立即发送
+        """
+        if not self.rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 令牌数可以为负，表示已被预约的令牌
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """
+    按主机名限速的限速器
+
+    限速规则以主机名或通配符模式（如'img*.gamersky.com'）为键，匹配同一条规则的主机共享一个令牌桶；
+    没有匹配规则的主机各自使用一个令牌桶，速率由调用者提供的默认值决定。
+
+    属性:
+        limits: 主机名模式到(rate, burst)的映射，按配置顺序匹配
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Any]] = None):
+        """
+        初始化限速器
+
+        参数:
+            limits: 主机名模式到限速规则的映射（或(模式, 规则)对的列表）。规则可以是
+                    {'rate': 每秒请求数, 'burst': 突发数量}字典、(rate, burst)元组或单个数字（每秒请求数，burst为1）
+        """
+        self.limits = {}
+        for pattern, rule in dict(limits or {}).items():
+            self.limits[pattern.lower()] = self._parse_rule(rule)
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_rule(rule: Any) -> Tuple[Optional[float], int]:
+        """
+        将限速规则转换为(rate, burst)
+
+        参数:
+            rule: 字典、元组或数字形式的限速规则
+        """
+        if isinstance(rule, dict):
+            return rule.get('rate'), rule.get('burst', 1)
+        if isinstance(rule, (list, tuple)):
+            rate, burst = rule
+            return rate, burst
+        return rule, 1
+
+    def _match(self, host: str) -> Optional[str]:
+        """
+        查找主机名匹配的限速规则
+
+        参数:
+            host: 主机名
+
+        返回:
+            匹配的模式，精确匹配优先，没有匹配时返回None
+        """
+        if host in self.limits:
+            return host
+        for pattern in self.limits:
+            if fnmatch(host, pattern):
+                return pattern
+        return None
+
+    def bucket_for(self, url: str, rate: Optional[float] = None, burst: int = 1) -> TokenBucket:
+        """
+        返回URL所属主机的令牌桶，不存在时创建
+
+        参数:
+            url: 请求的URL
+            rate: 没有匹配规则时使用的默认速率（每秒请求数）
+            burst: 没有匹配规则时使用的默认桶容量
+
+        返回:
+            TokenBucket对象
+        """
+        host = (urlparse(url).hostname or '').lower()
+        pattern = self._match(host)
+        key = pattern if pattern is not None else host
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if pattern is not None:
+                    rate, burst = self.limits[pattern]
+                bucket = TokenBucket(rate, burst)
+                self._buckets[key] = bucket
+            return bucket
+
+    def reserve(self, url: str, rate: Optional[float] = None, burst: int = 1) -> float:
+        """
+        为请求预约一个令牌，不等待
+
+        参数:
+            url: 请求的URL
+            rate: 没有匹配规则时使用的默认速率（每秒请求数）
+            burst: 没有匹配规则时使用的默认桶容量
+
+        返回:
+            发送请求前需要等待的秒数
+        """
+        return self.bucket_for(url, rate, burst).reserve()
+
+    def acquire(self, url: str, rate: Optional[float] = None, burst: int = 1) -> float:
+        """
+        等待直到可以向URL所属主机发送请求（线程安全）
+
+        参数:
+            url: 请求的URL
+            rate: 没有匹配规则时使用的默认速率（每秒请求数）
+            burst: 没有匹配规则时使用的默认桶容量
+
+        返回:
+            实际等待的秒数
+        """
+        wait = self.reserve(url, rate, burst)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url: str, rate: Optional[float] = None, burst: int = 1) -> float:
+        """
+        acquire的协程版本，等待期间不阻塞事件循环
+
+        参数:
+            url: 请求的URL
+            rate: 没有匹配规则时使用的默认速率（每秒请求数）
+            burst: 没有匹配规则时使用的默认桶容量
+
+        返回:
+            实际等待的秒数
+        """
+        wait = self.reserve(url, rate, burst)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def rate_from_delay(delay: Optional[float]) -> Optional[float]:
+    """
+    将请求间隔时间（秒）换算为速率（每秒请求数）
+
+    参数:
+        delay: 请求间隔时间，为None或不大于0表示不限速
+
+    返回:
+        每秒请求数，不限速时返回None
+    """
+    if not delay or delay <= 0:
+        return None
+    return 1.0 / delay